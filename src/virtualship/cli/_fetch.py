@@ -8,15 +8,17 @@ from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
 
-from virtualship.errors import IncompleteDownloadError
+from virtualship.errors import IncompleteDownloadError, ScheduleError
 from virtualship.utils import (
     _dump_yaml,
     _generic_load_yaml,
     _get_schedule,
     _get_ship_config,
+    _get_timeline,
 )
 
 if TYPE_CHECKING:
+    from virtualship.expedition.land_mask import LandMask
     from virtualship.models import SpaceTimeRegion
 
 import click
@@ -39,7 +41,9 @@ def _fetch(path: str | Path, username: str | None, password: str | None) -> None
     be provided on prompt, via command line arguments, or via a YAML config file. Run
     `virtualship fetch` on an expedition for more info.
     """
+    from virtualship.expedition.land_mask import LandMask
     from virtualship.models import InstrumentType
+    from virtualship.models.schedule import projection
 
     if sum([username is None, password is None]) == 1:
         raise ValueError("Both username and password must be provided when using CLI.")
@@ -52,11 +56,14 @@ def _fetch(path: str | Path, username: str | None, password: str | None) -> None
     schedule = _get_schedule(path)
     ship_config = _get_ship_config(path)
 
+    # the route is checked for land after downloading the bathymetry, if it is needed
+    timeline = _get_timeline(path, projection, ship_config, schedule)
     schedule.verify(
-        ship_config.ship_speed_knots,
+        ship_config,
         input_data=None,
         check_space_time_region=True,
         ignore_missing_fieldsets=True,
+        timeline=timeline,
     )
 
     space_time_region_hash = get_space_time_region_hash(schedule.space_time_region)
@@ -86,23 +93,53 @@ def _fetch(path: str | Path, username: str | None, password: str | None) -> None
     )
     shutil.copyfile(path / SCHEDULE, download_folder / SCHEDULE)
 
-    if (
+    ship_data_needed = (
         (
             {"XBT", "CTD", "CDT_BGC", "SHIP_UNDERWATER_ST"}
             & set(instrument.name for instrument in instruments_in_schedule)
         )
         or ship_config.ship_underwater_st_config is not None
         or ship_config.adcp_config is not None
-    ):
+    )
+
+    # Download bathymetry first if any instrument uses it, it is small and used to check
+    # the route for land before downloading everything else
+    if ship_data_needed or InstrumentType.CTD_BGC in instruments_in_schedule:
+        print("Bathymetry will be downloaded. Please wait...")
+        try:
+            copernicusmarine.subset(
+                dataset_id="cmems_mod_glo_phy_my_0.083deg_static",
+                variables=["deptho"],
+                minimum_longitude=spatial_range.minimum_longitude,
+                maximum_longitude=spatial_range.maximum_longitude,
+                minimum_latitude=spatial_range.minimum_latitude,
+                maximum_latitude=spatial_range.maximum_latitude,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                minimum_depth=abs(spatial_range.minimum_depth),
+                maximum_depth=abs(spatial_range.maximum_depth),
+                output_filename="bathymetry.nc",
+                output_directory=download_folder,
+                username=username,
+                password=password,
+                overwrite=True,
+                coordinates_selection_method="outside",
+            )
+        except InvalidUsernameOrPassword as e:
+            shutil.rmtree(download_folder)
+            raise e
+
+        try:
+            schedule.verify_in_water(LandMask.load(download_folder), timeline)
+        except ScheduleError:
+            shutil.rmtree(download_folder)
+            raise
+
+    if ship_data_needed:
         print("Ship data will be downloaded. Please wait...")
 
-        # Define all ship datasets to download, including bathymetry
+        # Define all ship datasets to download, bathymetry has been downloaded already
         download_dict = {
-            "Bathymetry": {
-                "dataset_id": "cmems_mod_glo_phy_my_0.083deg_static",
-                "variables": ["deptho"],
-                "output_filename": "bathymetry.nc",
-            },
             "UVdata": {
                 "dataset_id": "cmems_mod_glo_phy-cur_anfc_0.083deg_PT6H-i",
                 "variables": ["uo", "vo"],
@@ -405,6 +442,34 @@ def assert_complete_download(download_path: Path) -> None:
     return
 
 
+def get_existing_land_mask(
+    data_folder: Path, space_time_region: SpaceTimeRegion | None
+) -> LandMask | None:
+    """
+    Load the land mask of an existing download for a space-time region.
+
+    :param data_folder: Folder containing the downloads.
+    :param space_time_region: The space-time region, or None if not specified.
+    :returns: The land mask, or None if there is no completed download to build it from.
+    """
+    from virtualship.expedition.land_mask import LandMask
+
+    if space_time_region is None:
+        return None
+    try:
+        existing_download = get_existing_download(
+            data_folder, get_space_time_region_hash(space_time_region)
+        )
+    except IncompleteDownloadError:
+        return None
+    if existing_download is None:
+        return None
+    try:
+        return LandMask.load(existing_download)
+    except FileNotFoundError:
+        return None
+
+
 def complete_download(download_path: Path) -> None:
     """Mark a download as complete."""
     download_metadata = download_path / DOWNLOAD_METADATA
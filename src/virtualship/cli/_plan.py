@@ -1,6 +1,7 @@
 import datetime
 import os
 import traceback
+from pathlib import Path
 from typing import ClassVar
 
 from textual import on
@@ -20,6 +21,7 @@ from textual.widgets import (
     Switch,
 )
 
+from virtualship.cli._fetch import get_existing_land_mask
 from virtualship.cli.validator_utils import (
     get_field_type,
     group_validators,
@@ -31,7 +33,7 @@ from virtualship.cli.validator_utils import (
 )
 from virtualship.errors import UnexpectedError, UserError
 from virtualship.models.location import Location
-from virtualship.models.schedule import Schedule, Waypoint
+from virtualship.models.schedule import Schedule, Waypoint, projection
 from virtualship.models.ship_config import (
     ADCPConfig,
     ArgoFloatConfig,
@@ -47,6 +49,7 @@ from virtualship.models.space_time_region import (
     SpatialRange,
     TimeRange,
 )
+from virtualship.utils import _get_timeline
 
 UNEXPECTED_MSG_ONSAVE = (
     "Please ensure that:\n"
@@ -1084,11 +1087,20 @@ class PlanScreen(Screen):
             self.sync_ui_waypoints()  # call to ensure waypoint inputs are synced
 
             # verify schedule
+            ship_config = config_editor.config.model_copy(
+                update={"ship_speed_knots": ship_speed_value}
+            )
             schedule_editor.schedule.verify(
-                ship_speed_value,
+                ship_config,
                 input_data=None,
                 check_space_time_region=True,
                 ignore_missing_fieldsets=True,
+                timeline=_get_timeline(
+                    Path(self.path), projection, ship_config, schedule_editor.schedule
+                ),
+                land_mask=get_existing_land_mask(
+                    Path(self.path) / "data", schedule_editor.schedule.space_time_region
+                ),
             )
 
             config_saved = config_editor.save_changes()
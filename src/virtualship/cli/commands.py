@@ -120,6 +120,90 @@ def fetch(path: str | Path, username: str | None, password: str | None) -> None:
     "path",
     type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True),
 )
-def run(path):
+@click.option(
+    "--chunk-memory",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Read input data in chunks of at most this many MiB, only once they are needed. "
+    "Use this to limit memory use for large regions. By default input data is read whole.",
+)
+@click.option(
+    "--fill-land",
+    is_flag=True,
+    default=False,
+    help="Fill land in temperature, salinity and biogeochemical input data once, from the nearest ocean, "
+    "and interpolate them linearly. This is faster than leaving out land at every sample, "
+    "but gives slightly different values near the coast.",
+)
+@click.option(
+    "--compact-input",
+    is_flag=True,
+    default=False,
+    help="Store the preprocessed copies of input data with reduced precision: velocities as 32-bit floats, "
+    "other variables as 16-bit integers, off by at most 1/65534 of their largest magnitude, "
+    "and bathymetry in whole meters. This takes half or less of the disk space and read time.",
+)
+@click.option(
+    "--map-input",
+    is_flag=True,
+    default=False,
+    help="Memory-map the input data sampled around the ship instead of reading it, "
+    "so expeditions running at the same time on the same input data share one copy of it in memory. "
+    "Input data is then not cropped to the ship track or split in chunks.",
+)
+@click.option(
+    "--sampler",
+    type=click.Choice(["parcels", "direct"]),
+    default="parcels",
+    help="How the ADCP, underway temperature and salinity, CTDs, BGC CTDs and XBTs sample the input data. "
+    "'direct' interpolates the input data directly instead of executing Parcels, which is much faster; "
+    "casts then work out their depth over time up front. "
+    "Results agree with 'parcels' up to float32 rounding.",
+)
+@click.option(
+    "--cache-input",
+    is_flag=True,
+    default=False,
+    help="Keep preprocessed copies of the input data in the download folder and read from those: "
+    "decoded, uncompressed and with depths as Parcels expects them, so they are quick to read in later runs. "
+    "The copies take extra disk space and are remade when the downloaded files change.",
+)
+@click.option(
+    "--prefetch-input",
+    is_flag=True,
+    default=False,
+    help="Split drifter and Argo float input data in one file per time step in the download folder, "
+    "and read the next time step in the background while simulating the current one. "
+    "This hides read time for long deployments, but the split files take as much disk space as the input data.",
+)
+@click.option(
+    "--batch-adcp",
+    is_flag=True,
+    default=False,
+    help="Sample the ADCP at all points in one execution of Parcels, instead of one execution per point. "
+    "This is much faster, but velocities can differ in the last bit of float32. "
+    "Has no effect with '--sampler direct'.",
+)
+def run(
+    path,
+    chunk_memory,
+    fill_land,
+    compact_input,
+    map_input,
+    sampler,
+    cache_input,
+    prefetch_input,
+    batch_adcp,
+):
     """Run the expedition."""
-    do_expedition(Path(path))
+    do_expedition(
+        Path(path),
+        chunk_memory=None if chunk_memory is None else chunk_memory * 1024 * 1024,
+        fill_land=fill_land,
+        compact_input=compact_input,
+        map_input=map_input,
+        direct_sampling=sampler == "direct",
+        cache_input=cache_input,
+        prefetch_input=prefetch_input,
+        batched_adcp=batch_adcp,
+    )
@@ -1,9 +1,11 @@
 """Everything for simulating an expedition."""
 
 from .do_expedition import do_expedition
+from .evaluate_schedules import evaluate_schedules
 from .input_data import InputData
 
 __all__ = [
     "InputData",
     "do_expedition",
+    "evaluate_schedules",
 ]
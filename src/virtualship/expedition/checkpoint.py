@@ -10,6 +10,8 @@ import yaml
 from virtualship.errors import CheckpointError
 from virtualship.models import InstrumentType, Schedule
 
+from .simulate_schedule import ScheduleState
+
 
 class _YamlDumper(yaml.SafeDumper):
     pass
@@ -24,30 +26,48 @@ class Checkpoint(pydantic.BaseModel):
     """
     A checkpoint of schedule simulation.
 
-    Copy of the schedule until where the simulation proceeded without troubles.
+    Copy of the schedule until where the simulation proceeded without troubles,
+    optionally with the state of the simulation at that point so it can be resumed.
     """
 
     past_schedule: Schedule
+    schedule_state: ScheduleState | None = pydantic.Field(default=None, exclude=True)
+    """State of schedule simulation at the end of the past schedule. Stored in a separate npz file next to the yaml file."""
+    ship_config_hash: str | None = None
+    """Hash of the ship configuration the schedule state was simulated with."""
+
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
 
     def to_yaml(self, file_path: str | Path) -> None:
         """
-        Write checkpoint to yaml file.
+        Write checkpoint to yaml file, and the schedule state, if any, to an npz file with the same name.
 
         :param file_path: Path to the file to write to.
         """
         with open(file_path, "w") as file:
             yaml.dump(self.model_dump(by_alias=True), file, Dumper=_YamlDumper)
 
+        state_path = _state_path(file_path)
+        if self.schedule_state is None:
+            state_path.unlink(missing_ok=True)
+        else:
+            self.schedule_state.to_npz(state_path)
+
     @classmethod
     def from_yaml(cls, file_path: str | Path) -> Checkpoint:
         """
-        Load checkpoint from yaml file.
+        Load checkpoint from yaml file, and the schedule state from the npz file with the same name if it exists.
 
         :param file_path: Path to the file to load from.
         :returns: The checkpoint.
         """
         with open(file_path) as file:
             data = yaml.safe_load(file)
+
+        state_path = _state_path(file_path)
+        if state_path.exists():
+            data["schedule_state"] = ScheduleState.from_npz(state_path)
+
         return Checkpoint(**data)
 
     def verify(self, schedule: Schedule) -> None:
@@ -71,3 +91,22 @@ class Checkpoint(pydantic.BaseModel):
             raise CheckpointError(
                 "Past waypoints in schedule have been changed! Restore past schedule and only change future waypoints."
             )
+
+    def resume_state(self, ship_config_hash: str) -> ScheduleState | None:
+        """
+        Get the schedule state to resume simulation from.
+
+        :param ship_config_hash: Hash of the ship configuration that will be simulated.
+        :returns: The schedule state, or None if there is none or it was simulated with another ship configuration or schedule.
+        """
+        if (
+            self.schedule_state is None
+            or self.ship_config_hash != ship_config_hash
+            or self.schedule_state.waypoint_i != len(self.past_schedule.waypoints)
+        ):
+            return None
+        return self.schedule_state
+
+
+def _state_path(file_path: str | Path) -> Path:
+    return Path(file_path).with_suffix(".npz")
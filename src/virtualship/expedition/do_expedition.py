@@ -6,17 +6,23 @@ from pathlib import Path
 
 import pyproj
 
-from virtualship.cli._fetch import get_existing_download, get_space_time_region_hash
-from virtualship.models import Schedule, ShipConfig
+from virtualship.cli._fetch import (
+    get_existing_download,
+    get_space_time_region_hash,
+    hash_model,
+)
+from virtualship.models import InstrumentType, Schedule, ShipConfig, Timeline
 from virtualship.utils import (
     CHECKPOINT,
     _get_schedule,
     _get_ship_config,
+    _get_timeline,
 )
 
 from .checkpoint import Checkpoint
 from .expedition_cost import expedition_cost
 from .input_data import InputData
+from .land_mask import LandMask
 from .simulate_measurements import simulate_measurements
 from .simulate_schedule import ScheduleProblem, simulate_schedule
 
@@ -24,12 +30,31 @@ from .simulate_schedule import ScheduleProblem, simulate_schedule
 projection = pyproj.Geod(ellps="WGS84")
 
 
-def do_expedition(expedition_dir: str | Path, input_data: Path | None = None) -> None:
+def do_expedition(
+    expedition_dir: str | Path,
+    input_data: Path | None = None,
+    chunk_memory: int | None = None,
+    fill_land: bool = False,
+    compact_input: bool = False,
+    map_input: bool = False,
+    direct_sampling: bool = False,
+    cache_input: bool = False,
+    prefetch_input: bool = False,
+    batched_adcp: bool = False,
+) -> None:
     """
     Perform an expedition, providing terminal feedback and file output.
 
     :param expedition_dir: The base directory for the expedition.
     :param input_data: Input data folder (override used for testing).
+    :param chunk_memory: Maximum size in bytes of a chunk of input data held in memory. If None, input data is not split in chunks.
+    :param fill_land: Whether to fill land in tracer input data once and interpolate tracers linearly, instead of leaving out land at every sample.
+    :param compact_input: Whether to read input data from copies stored with reduced precision.
+    :param map_input: Whether to memory-map input data, so expeditions running at the same time on the same input data share it in memory.
+    :param direct_sampling: Whether the ADCP, underway temperature and salinity, CTDs, BGC CTDs and XBTs interpolate input data directly instead of executing Parcels.
+    :param cache_input: Whether to read input data from preprocessed copies kept next to it, making them on first use.
+    :param prefetch_input: Whether to read the next time step of drifter and argo float input data while simulating the current one.
+    :param batched_adcp: Whether the ADCP samples all points in one execution of Parcels instead of one execution per point.
     """
     print("\n╔═════════════════════════════════════════════════╗")
     print("║          VIRTUALSHIP EXPEDITION STATUS          ║")
@@ -41,6 +66,9 @@ def do_expedition(expedition_dir: str | Path, input_data: Path | None = None) ->
     ship_config = _get_ship_config(expedition_dir)
     schedule = _get_schedule(expedition_dir)
 
+    # hash ship config as written by the user, before verification drops unused instruments
+    ship_config_hash = hash_model(ship_config)
+
     # Verify ship_config file is consistent with schedule
     ship_config.verify(schedule)
 
@@ -52,22 +80,37 @@ def do_expedition(expedition_dir: str | Path, input_data: Path | None = None) ->
     # verify that schedule and checkpoint match
     checkpoint.verify(schedule)
 
-    # load fieldsets
-    loaded_input_data = _load_input_data(
-        expedition_dir=expedition_dir,
-        schedule=schedule,
-        ship_config=ship_config,
-        input_data=input_data,
-    )
+    input_data = _find_input_data(expedition_dir, schedule, input_data)
 
     print("\n---- WAYPOINT VERIFICATION ----")
 
-    # verify schedule is valid
-    schedule.verify(ship_config.ship_speed_knots, loaded_input_data)
+    # compute when the ship is where, used by both verification and simulation
+    timeline = _get_timeline(expedition_dir, projection, ship_config, schedule)
+
+    # verify and simulate the schedule, before spending time on loading fieldsets
+    try:
+        land_mask = LandMask.load(input_data)
+    except FileNotFoundError:
+        land_mask = None
+    # arrival times are left to the simulation, which checkpoints where the schedule became infeasible
+    schedule.verify(
+        ship_config,
+        input_data=None,
+        timeline=timeline,
+        land_mask=land_mask,
+        check_arrival_times=False,
+    )
 
-    # simulate the schedule
+    # simulate the schedule, resuming from the checkpoint if possible
+    resume_state = checkpoint.resume_state(ship_config_hash)
+    if resume_state is not None:
+        print(f"\nResuming from the checkpoint at waypoint {resume_state.waypoint_i}.")
     schedule_results = simulate_schedule(
-        projection=projection, ship_config=ship_config, schedule=schedule
+        projection=projection,
+        ship_config=ship_config,
+        schedule=schedule,
+        resume_from=resume_state,
+        timeline=timeline,
     )
     if isinstance(schedule_results, ScheduleProblem):
         print(
@@ -77,12 +120,29 @@ def do_expedition(expedition_dir: str | Path, input_data: Path | None = None) ->
             Checkpoint(
                 past_schedule=Schedule(
                     waypoints=schedule.waypoints[: schedule_results.failed_waypoint_i]
-                )
+                ),
+                schedule_state=schedule_results.resume_state,
+                ship_config_hash=ship_config_hash,
             ),
             expedition_dir,
         )
         return
 
+    # load fieldsets
+    loaded_input_data = _load_input_data(
+        expedition_dir=expedition_dir,
+        schedule=schedule,
+        ship_config=ship_config,
+        input_data=input_data,
+        chunk_memory=chunk_memory,
+        track=timeline,
+        fill_land=fill_land,
+        compact=compact_input,
+        mapped=map_input,
+        use_cache=cache_input,
+        prefetch=prefetch_input,
+    )
+
     # delete and create results directory
     if os.path.exists(expedition_dir.joinpath("results")):
         shutil.rmtree(expedition_dir.joinpath("results"))
@@ -104,11 +164,16 @@ def do_expedition(expedition_dir: str | Path, input_data: Path | None = None) ->
 
     # simulate measurements
     print("\nSimulating measurements. This may take a while...\n")
+    # reading all input data ahead defeats the purpose of reading it in chunks
+    if chunk_memory is None:
+        loaded_input_data.preload()
     simulate_measurements(
         expedition_dir,
         ship_config,
         loaded_input_data,
         schedule_results.measurements_to_simulate,
+        direct_sampling=direct_sampling,
+        batched_adcp=batched_adcp,
     )
     print("\nAll measurement simulations are complete.")
 
@@ -125,9 +190,16 @@ def _load_input_data(
     schedule: Schedule,
     ship_config: ShipConfig,
     input_data: Path | None,
+    chunk_memory: int | None = None,
+    track: Timeline | None = None,
+    fill_land: bool = False,
+    compact: bool = False,
+    mapped: bool = False,
+    use_cache: bool = False,
+    prefetch: bool = False,
 ) -> InputData:
     """
-    Load the input data.
+    Load the input data for the configured underway instruments and the instruments used in the schedule.
 
     :param expedition_dir: Directory of the expedition.
     :type expedition_dir: Path
@@ -137,9 +209,58 @@ def _load_input_data(
     :type ship_config: ShipConfig
     :param input_data: Folder containing input data.
     :type input_data: Path | None
+    :param chunk_memory: Maximum size in bytes of a chunk of input data held in memory, or None to not split input data in chunks.
+    :type chunk_memory: int | None
+    :param track: Timeline of the expedition, to crop the input data around the track to, or None to not crop.
+    :type track: Timeline | None
+    :param fill_land: Whether to fill land in tracer input data and interpolate tracers linearly.
+    :type fill_land: bool
+    :param compact: Whether to read input data from copies stored with reduced precision.
+    :type compact: bool
+    :param mapped: Whether to memory-map input data, so processes share it.
+    :type mapped: bool
+    :param use_cache: Whether to read input data from preprocessed copies kept in the input data folder, making them if needed.
+    :type use_cache: bool
+    :param prefetch: Whether to read the drifter and argo float input data from files per time step, so they can be prefetched while simulating.
+    :type prefetch: bool
     :return: InputData object.
     :rtype: InputData
     """
+    input_data = _find_input_data(expedition_dir, schedule, input_data)
+
+    # underway instruments measure whenever they are configured,
+    # other instruments only where the schedule deploys them
+    instruments = schedule.get_instruments()
+    return InputData.load(
+        directory=input_data,
+        load_adcp=ship_config.adcp_config is not None,
+        load_argo_float=InstrumentType.ARGO_FLOAT in instruments,
+        load_ctd=InstrumentType.CTD in instruments,
+        load_ctd_bgc=InstrumentType.CTD_BGC in instruments,
+        load_drifter=InstrumentType.DRIFTER in instruments,
+        load_xbt=InstrumentType.XBT in instruments,
+        load_ship_underwater_st=ship_config.ship_underwater_st_config is not None,
+        chunk_memory=chunk_memory,
+        use_cache=use_cache,
+        track=track,
+        fill_land=fill_land,
+        compact=compact,
+        mapped=mapped,
+        prefetch=prefetch,
+    )
+
+
+def _find_input_data(
+    expedition_dir: Path, schedule: Schedule, input_data: Path | None
+) -> Path:
+    """
+    Find the input data folder.
+
+    :param expedition_dir: Directory of the expedition.
+    :param schedule: Schedule object.
+    :param input_data: Folder containing input data, or None to find the download for the schedule's space-time region.
+    :return: Folder containing input data.
+    """
     if input_data is None:
         space_time_region_hash = get_space_time_region_hash(schedule.space_time_region)
         input_data = get_existing_download(expedition_dir, space_time_region_hash)
@@ -147,17 +268,7 @@ def _load_input_data(
     assert input_data is not None, (
         "Input data hasn't been found. Have you run the `virtualship fetch` command?"
     )
-
-    return InputData.load(
-        directory=input_data,
-        load_adcp=ship_config.adcp_config is not None,
-        load_argo_float=ship_config.argo_float_config is not None,
-        load_ctd=ship_config.ctd_config is not None,
-        load_ctd_bgc=ship_config.ctd_bgc_config is not None,
-        load_drifter=ship_config.drifter_config is not None,
-        load_xbt=ship_config.xbt_config is not None,
-        load_ship_underwater_st=ship_config.ship_underwater_st_config is not None,
-    )
+    return input_data
 
 
 def _load_checkpoint(expedition_dir: Path) -> Checkpoint | None:
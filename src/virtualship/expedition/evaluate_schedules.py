@@ -0,0 +1,70 @@
+"""evaluate_schedules function."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+import pyproj
+
+from virtualship.errors import ConfigError, ScheduleError
+from virtualship.models import Schedule, ShipConfig, Timeline
+
+from .simulate_schedule import ScheduleOk, ScheduleProblem, simulate_schedule
+
+# projection used to sail between waypoints
+projection = pyproj.Geod(ellps="WGS84")
+
+
+def evaluate_schedules(
+    expeditions: Iterable[tuple[ShipConfig, Schedule]],
+    max_workers: int | None = None,
+) -> list[ScheduleOk | ScheduleProblem | ScheduleError | ConfigError]:
+    """
+    Verify and simulate many schedules, spread over a pool of processes.
+
+    Each ship configuration is verified against its schedule, the schedule is verified and then simulated.
+    Arrival times are checked by the simulation, so a schedule with a late waypoint gives a ScheduleProblem.
+    Waypoints are not checked for being on land, as no input data is loaded.
+    The given ship configurations and schedules are not modified.
+
+    :param expeditions: Pairs of ship configuration and schedule to evaluate.
+    :param max_workers: Maximum number of processes to use. If None, the number of processors is used. If 1, everything is evaluated in the current process.
+    :returns: Per pair, in input order, either the result of simulating the schedule, or the error found while verifying it.
+    """
+    expeditions = list(expeditions)
+
+    if max_workers == 1:
+        return [_evaluate_schedule(expedition) for expedition in expeditions]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_evaluate_schedule, expeditions))
+
+
+def _evaluate_schedule(
+    expedition: tuple[ShipConfig, Schedule],
+) -> ScheduleOk | ScheduleProblem | ScheduleError | ConfigError:
+    ship_config, schedule = expedition
+
+    # verification modifies the ship config, so work on a copy
+    ship_config = ship_config.model_copy(deep=True)
+
+    try:
+        ship_config.verify(schedule)
+        timeline = Timeline.compile(projection, ship_config, schedule)
+        schedule.verify(
+            ship_config,
+            input_data=None,
+            ignore_missing_fieldsets=True,
+            timeline=timeline,
+            check_arrival_times=False,
+        )
+    except (ScheduleError, ConfigError) as e:
+        return e
+
+    return simulate_schedule(
+        projection=projection,
+        ship_config=ship_config,
+        schedule=schedule,
+        timeline=timeline,
+    )
@@ -2,23 +2,89 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 
+import numpy as np
+import xarray as xr
 from parcels import Field, FieldSet
 
+from virtualship.instruments import ship_underwater_st
+from virtualship.models import Timeline
+
+PREPROCESSED = "preprocessed"
+"""Directory within the input data directory holding preprocessed copies of the input files."""
+
+TIME_STEPS = "time_steps"
+"""Directory within the preprocessed directory holding input files split in one file per time step."""
+
+# change when preprocessing changes, to remake existing preprocessed files
+_PREPROCESSING_VERSION = 1
+
+# maximum distance in meters between points along the track used to find the area to crop to
+_CROP_SPACING = 10_000
+
+_BGC_VARIABLES = ["o2", "chl", "no3", "po4", "ph", "phyc", "zooc", "nppv"]
+
+# files holding tracers, which are interpolated taking land into account
+_TRACER_FILENAMES = {
+    "ship_s.nc",
+    "ship_t.nc",
+    "drifter_t.nc",
+    "argo_float_s.nc",
+    "argo_float_t.nc",
+    *(f"ctd_bgc_{variable}.nc" for variable in _BGC_VARIABLES),
+}
+
+# variables stored as float32 in compact preprocessed copies, other than bathymetry which is stored in whole meters
+_VELOCITY_VARIABLES = {"uo", "vo"}
+_BATHYMETRY_VARIABLE = "deptho"
+
 
 @dataclass
 class InputData:
-    """A collection of fieldsets that function as input data for simulation."""
-
-    adcp_fieldset: FieldSet | None
-    argo_float_fieldset: FieldSet | None
-    ctd_fieldset: FieldSet | None
-    ctd_bgc_fieldset: FieldSet | None
-    drifter_fieldset: FieldSet | None
-    xbt_fieldset: FieldSet | None
-    ship_underwater_st_fieldset: FieldSet | None
+    """
+    A collection of fieldsets that function as input data for simulation.
+
+    Fieldsets are loaded from the input data directory the first time they are accessed,
+    so only the fieldsets that are actually used are ever read. Fieldsets that are not loaded at all are None.
+    Fields read from the same file are loaded once and shared between fieldsets.
+    """
+
+    directory: Path
+    """Input data directory."""
+    load_adcp: bool
+    load_argo_float: bool
+    load_ctd: bool
+    load_ctd_bgc: bool
+    load_drifter: bool
+    load_xbt: bool
+    load_ship_underwater_st: bool
+    chunk_memory: int | None = None
+    """Maximum size in bytes of a chunk of field data, or None to not split fields in chunks."""
+    use_cache: bool = False
+    """Whether to read input data from preprocessed copies of the downloaded files."""
+    track: Timeline | None = None
+    """Timeline of the expedition, to crop the ship and CTD BGC fields to. If None, fields are not cropped."""
+    fill_land: bool = False
+    """Whether to read tracers from preprocessed copies with land filled, and interpolate them linearly."""
+    compact: bool = False
+    """Whether to read input data from preprocessed copies stored with reduced precision."""
+    mapped: bool = False
+    """Whether to memory-map the ship and CTD BGC fields, so processes share them."""
+    prefetch: bool = False
+    """Whether to read the drifter and argo float fieldsets from files per time step that can be prefetched."""
+
+    _fields: dict[tuple[str, str, str, float | None], Field] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    """Fields loaded so far, by name, file, variable and depth they are loaded around, shared between fieldsets."""
 
     @classmethod
     def load(
@@ -31,11 +97,19 @@ class InputData:
         load_drifter: bool,
         load_xbt: bool,
         load_ship_underwater_st: bool,
+        chunk_memory: int | None = None,
+        use_cache: bool = False,
+        track: Timeline | None = None,
+        fill_land: bool = False,
+        compact: bool = False,
+        mapped: bool = False,
+        prefetch: bool = False,
     ) -> InputData:
         """
         Create an instance of this class from netCDF files.
 
         For now this function makes a lot of assumption about file location and contents.
+        Nothing is read yet; each fieldset is read the first time it is accessed.
 
         :param directory: Input data directory.
         :param load_adcp: Whether to load the ADCP fieldset.
@@ -43,165 +117,465 @@ class InputData:
         :param load_ctd: Whether to load the CTD fieldset.
         :param load_ctd_bgc: Whether to load the CTD BGC fieldset.
         :param load_drifter: Whether to load the drifter fieldset.
+        :param load_xbt: Whether to load the XBT fieldset.
         :param load_ship_underwater_st: Whether to load the ship underwater ST fieldset.
-        :returns: An instance of this class with loaded fieldsets.
+        :param chunk_memory: Maximum size in bytes of a chunk of field data held in memory. If None, fields are not split in chunks.
+        :param use_cache: Whether to read input data from preprocessed copies of the downloaded files, making them if needed.
+        :param track: Timeline of the expedition. If given, the ship and CTD BGC fields are cropped to the area around its track.
+        :param fill_land: Whether to fill land in tracers once when preprocessing, making copies of tracer files even if the cache is not used, and interpolate them linearly.
+        :param compact: Whether to read input data from preprocessed copies stored with reduced precision, making them even if the cache is not used.
+        :param mapped: Whether to memory-map the ship and CTD BGC fields whole, so processes using the same input data share them. Makes preprocessed copies even if the cache is not used.
+        :param prefetch: Whether to read the drifter and argo float fieldsets from files per time step, so they can be prefetched while simulating.
+        :returns: An instance of this class that loads fieldsets on access.
         """
-        directory = Path(directory)
-        if load_drifter:
-            drifter_fieldset = cls._load_drifter_fieldset(directory)
-        else:
-            drifter_fieldset = None
-        if load_argo_float:
-            argo_float_fieldset = cls._load_argo_float_fieldset(directory)
-        else:
-            argo_float_fieldset = None
-        if load_ctd_bgc:
-            ctd_bgc_fieldset = cls._load_ctd_bgc_fieldset(directory)
-        else:
-            ctd_bgc_fieldset = None
-        if load_adcp or load_ctd or load_ship_underwater_st or load_xbt:
-            ship_fieldset = cls._load_ship_fieldset(directory)
-        if load_adcp:
-            adcp_fieldset = ship_fieldset
-        else:
-            adcp_fieldset = None
-        if load_ctd:
-            ctd_fieldset = ship_fieldset
-        else:
-            ctd_fieldset = None
-        if load_ship_underwater_st:
-            ship_underwater_st_fieldset = ship_fieldset
-        else:
-            ship_underwater_st_fieldset = None
-        if load_xbt:
-            xbt_fieldset = ship_fieldset
-        else:
-            xbt_fieldset = None
-
         return InputData(
-            adcp_fieldset=adcp_fieldset,
-            argo_float_fieldset=argo_float_fieldset,
-            ctd_fieldset=ctd_fieldset,
-            ctd_bgc_fieldset=ctd_bgc_fieldset,
-            drifter_fieldset=drifter_fieldset,
-            xbt_fieldset=xbt_fieldset,
-            ship_underwater_st_fieldset=ship_underwater_st_fieldset,
+            directory=Path(directory),
+            load_adcp=load_adcp,
+            load_argo_float=load_argo_float,
+            load_ctd=load_ctd,
+            load_ctd_bgc=load_ctd_bgc,
+            load_drifter=load_drifter,
+            load_xbt=load_xbt,
+            load_ship_underwater_st=load_ship_underwater_st,
+            chunk_memory=chunk_memory,
+            use_cache=use_cache,
+            track=track,
+            fill_land=fill_land,
+            compact=compact,
+            mapped=mapped,
+            prefetch=prefetch,
         )
 
-    @classmethod
-    def _load_ship_fieldset(cls, directory: Path) -> FieldSet:
-        filenames = {
-            "U": directory.joinpath("ship_uv.nc"),
-            "V": directory.joinpath("ship_uv.nc"),
-            "S": directory.joinpath("ship_s.nc"),
-            "T": directory.joinpath("ship_t.nc"),
-        }
-        variables = {"U": "uo", "V": "vo", "S": "so", "T": "thetao"}
-        dimensions = {
-            "lon": "longitude",
-            "lat": "latitude",
-            "time": "time",
-            "depth": "depth",
-        }
+    def preload(self, max_workers: int | None = None) -> None:
+        """
+        Load all fieldsets that are to be loaded, reading their files concurrently first.
 
-        # create the fieldset and set interpolation methods
-        fieldset = FieldSet.from_netcdf(
-            filenames, variables, dimensions, allow_time_extrapolation=True
+        Fieldsets are built one after another, as the netCDF library Parcels reads with is not thread-safe.
+        Before that, all their files are read ahead in a pool of threads so they are in the operating system's file cache.
+        This overlaps the file access that dominates loading on slow or network file systems.
+
+        :param max_workers: Maximum number of threads reading files. If None, one per file.
+        """
+        file_paths = list(
+            dict.fromkeys(self._input_file(filename) for filename in self._filenames())
         )
-        fieldset.T.interp_method = "linear_invdist_land_tracer"
-        fieldset.S.interp_method = "linear_invdist_land_tracer"
+        if len(file_paths) > 0:
+            with ThreadPoolExecutor(
+                max_workers=max_workers or len(file_paths)
+            ) as executor:
+                # consume the results so errors are raised here
+                list(executor.map(_read_ahead, file_paths))
+
+        for fieldset in [
+            "adcp_fieldset",
+            "argo_float_fieldset",
+            "ctd_fieldset",
+            "ctd_bgc_fieldset",
+            "drifter_fieldset",
+            "xbt_fieldset",
+            "ship_underwater_st_fieldset",
+        ]:
+            getattr(self, fieldset)
+
+    def _filenames(self) -> list[str]:
+        """
+        Names of the files in the input data directory that the fieldsets to be loaded are read from.
 
-        # make depth negative
-        for g in fieldset.gridset.grids:
-            g.negate_depth()
+        Files of fieldsets that are prefetched while simulating are left out, as they are not read whole.
+        """
+        filenames = []
+        # the ship underwater ST on its own reads only two depth levels, not the files whole
+        if self._load_ship:
+            filenames += ["ship_uv.nc", "ship_s.nc", "ship_t.nc", "bathymetry.nc"]
+        if self.load_ctd_bgc:
+            filenames += [
+                "ship_uv.nc",
+                *(f"ctd_bgc_{variable}.nc" for variable in _BGC_VARIABLES),
+                "bathymetry.nc",
+            ]
+        if self.load_drifter and not self.prefetch:
+            filenames += ["drifter_uv.nc", "drifter_t.nc"]
+        if self.load_argo_float and not self.prefetch:
+            filenames += ["argo_float_uv.nc", "argo_float_s.nc", "argo_float_t.nc"]
+        return filenames
+
+    @cached_property
+    def adcp_fieldset(self) -> FieldSet | None:
+        """Fieldset for the ADCP, or None if not loaded."""
+        return self._ship_fieldset if self.load_adcp else None
+
+    @cached_property
+    def argo_float_fieldset(self) -> FieldSet | None:
+        """Fieldset for argo floats, or None if not loaded."""
+        if not self.load_argo_float:
+            return None
+        return self._load_argo_float_fieldset()
+
+    @cached_property
+    def ctd_fieldset(self) -> FieldSet | None:
+        """Fieldset for CTDs, or None if not loaded."""
+        return self._ship_fieldset if self.load_ctd else None
+
+    @cached_property
+    def ctd_bgc_fieldset(self) -> FieldSet | None:
+        """Fieldset for BGC CTDs, or None if not loaded."""
+        if not self.load_ctd_bgc:
+            return None
+        return self._load_ctd_bgc_fieldset()
+
+    @cached_property
+    def drifter_fieldset(self) -> FieldSet | None:
+        """Fieldset for drifters, or None if not loaded."""
+        if not self.load_drifter:
+            return None
+        return self._load_drifter_fieldset()
+
+    @cached_property
+    def xbt_fieldset(self) -> FieldSet | None:
+        """Fieldset for XBTs, or None if not loaded."""
+        return self._ship_fieldset if self.load_xbt else None
+
+    @cached_property
+    def ship_underwater_st_fieldset(self) -> FieldSet | None:
+        """
+        Fieldset for the ship underwater ST, or None if not loaded.
 
-        # add bathymetry data
-        bathymetry_file = directory.joinpath("bathymetry.nc")
-        bathymetry_variables = ("bathymetry", "deptho")
-        bathymetry_dimensions = {"lon": "longitude", "lat": "latitude"}
-        bathymetry_field = Field.from_netcdf(
-            bathymetry_file, bathymetry_variables, bathymetry_dimensions
+        If no other ship instrument is loaded, it holds only the two depth levels around the depth it measures at,
+        which is all that interpolating at that depth reads. Otherwise it shares the ship fieldset.
+        """
+        if not self.load_ship_underwater_st:
+            return None
+        if self._load_ship:
+            return self._ship_fieldset
+        return self._load_ship_underwater_st_fieldset()
+
+    @property
+    def _load_ship(self) -> bool:
+        """Whether the ship fieldset, with all depth levels, is loaded for any instrument."""
+        return self.load_adcp or self.load_ctd or self.load_xbt
+
+    @cached_property
+    def drifter_prefetcher(self) -> TimeStepPrefetcher | None:
+        """Prefetcher for the drifter fieldset, or None if not loaded or not prefetching."""
+        if not (self.load_drifter and self.prefetch):
+            return None
+        return TimeStepPrefetcher(
+            self.drifter_fieldset,
+            self._time_step_files(["drifter_uv.nc", "drifter_t.nc"]),
+        )
+
+    @cached_property
+    def argo_float_prefetcher(self) -> TimeStepPrefetcher | None:
+        """Prefetcher for the argo float fieldset, or None if not loaded or not prefetching."""
+        if not (self.load_argo_float and self.prefetch):
+            return None
+        return TimeStepPrefetcher(
+            self.argo_float_fieldset,
+            self._time_step_files(
+                ["argo_float_uv.nc", "argo_float_s.nc", "argo_float_t.nc"]
+            ),
+        )
+
+    @cached_property
+    def _ship_fieldset(self) -> FieldSet:
+        """Fieldset shared by all instruments that sample around the ship."""
+        fieldset = FieldSet(
+            U=self._field("U", "ship_uv.nc", "uo"),
+            V=self._field("V", "ship_uv.nc", "vo"),
+            fields={
+                "S": self._field("S", "ship_s.nc", "so", tracer=True),
+                "T": self._field("T", "ship_t.nc", "thetao", tracer=True),
+                "bathymetry": self._bathymetry_field,
+            },
         )
-        # make depth negative
-        bathymetry_field.data = -bathymetry_field.data
-        fieldset.add_field(bathymetry_field)
 
         # read in data already
         fieldset.computeTimeChunk(0, 1)
 
         return fieldset
 
-    @classmethod
-    def _load_ctd_bgc_fieldset(cls, directory: Path) -> FieldSet:
-        filenames = {
-            "U": directory.joinpath("ship_uv.nc"),
-            "V": directory.joinpath("ship_uv.nc"),
-            "o2": directory.joinpath("ctd_bgc_o2.nc"),
-            "chl": directory.joinpath("ctd_bgc_chl.nc"),
-            "no3": directory.joinpath("ctd_bgc_no3.nc"),
-            "po4": directory.joinpath("ctd_bgc_po4.nc"),
-            "ph": directory.joinpath("ctd_bgc_ph.nc"),
-            "phyc": directory.joinpath("ctd_bgc_phyc.nc"),
-            "zooc": directory.joinpath("ctd_bgc_zooc.nc"),
-            "nppv": directory.joinpath("ctd_bgc_nppv.nc"),
-        }
-        variables = {
-            "U": "uo",
-            "V": "vo",
-            "o2": "o2",
-            "chl": "chl",
-            "no3": "no3",
-            "po4": "po4",
-            "ph": "ph",
-            "phyc": "phyc",
-            "zooc": "zooc",
-            "nppv": "nppv",
-        }
-        dimensions = {
-            "lon": "longitude",
-            "lat": "latitude",
-            "time": "time",
-            "depth": "depth",
-        }
+    def _load_ship_underwater_st_fieldset(self) -> FieldSet:
+        depth = ship_underwater_st.DEPTH
+        fieldset = FieldSet(
+            U=self._field("U", "ship_uv.nc", "uo", depth=depth),
+            V=self._field("V", "ship_uv.nc", "vo", depth=depth),
+            fields={
+                "S": self._field("S", "ship_s.nc", "so", tracer=True, depth=depth),
+                "T": self._field("T", "ship_t.nc", "thetao", tracer=True, depth=depth),
+            },
+        )
 
-        fieldset = FieldSet.from_netcdf(
-            filenames, variables, dimensions, allow_time_extrapolation=True
+        # read in data already
+        fieldset.computeTimeChunk(0, 1)
+
+        return fieldset
+
+    def _load_ctd_bgc_fieldset(self) -> FieldSet:
+        fieldset = FieldSet(
+            U=self._field("U", "ship_uv.nc", "uo"),
+            V=self._field("V", "ship_uv.nc", "vo"),
+            fields={
+                **{
+                    variable: self._field(
+                        variable, f"ctd_bgc_{variable}.nc", variable, tracer=True
+                    )
+                    for variable in _BGC_VARIABLES
+                },
+                "bathymetry": self._bathymetry_field,
+            },
         )
-        fieldset.o2.interp_method = "linear_invdist_land_tracer"
-        fieldset.chl.interp_method = "linear_invdist_land_tracer"
-        fieldset.no3.interp_method = "linear_invdist_land_tracer"
-        fieldset.po4.interp_method = "linear_invdist_land_tracer"
-        fieldset.ph.interp_method = "linear_invdist_land_tracer"
-        fieldset.phyc.interp_method = "linear_invdist_land_tracer"
-        fieldset.zooc.interp_method = "linear_invdist_land_tracer"
-        fieldset.nppv.interp_method = "linear_invdist_land_tracer"
 
-        # make depth negative
-        for g in fieldset.gridset.grids:
-            g.negate_depth()
+        # read in data already
+        fieldset.computeTimeChunk(0, 1)
+
+        return fieldset
+
+    def _field(
+        self,
+        name: str,
+        filename: str,
+        variable: str,
+        tracer: bool = False,
+        depth: float | None = None,
+    ) -> Field:
+        """
+        Get a field of the ship, ship underwater ST and CTD BGC fieldsets, loading it only if no fieldset loaded it before.
+
+        Fieldsets that use the same variable from the same file share one Field object, so its data is in memory once.
+        Depth is made negative when the field is loaded, if it is not yet, so a shared grid is never negated twice.
+
+        :param name: Name of the field in the fieldsets.
+        :param filename: Name of the netCDF file in the input data directory.
+        :param variable: Name of the variable in the netCDF file.
+        :param tracer: Whether the field is a tracer, which is interpolated taking land into account unless land is filled.
+        :param depth: Depth to sample the field at only, so only the depth levels around it are loaded. If None, all depth levels are loaded.
+        :returns: The field.
+        """
+        key = (name, filename, variable, depth)
+        if key not in self._fields and self.mapped:
+            self._fields[key] = self._mapped_field(
+                name, filename, variable, tracer, depth
+            )
+        if key not in self._fields:
+            file_path = self._input_file(filename)
+            depth_indices = self._depth_indices(file_path, depth)
+            indices = self._crop_indices(file_path) or {}
+            if depth_indices is not None:
+                indices["depth"] = depth_indices
+            loaded = Field.from_netcdf(
+                file_path,
+                (name, variable),
+                {
+                    "lon": "longitude",
+                    "lat": "latitude",
+                    "time": "time",
+                    "depth": "depth",
+                },
+                allow_time_extrapolation=True,
+                interp_method=self._tracer_interp_method if tracer else "linear",
+                chunksize=self._chunksize(file_path, depth_indices),
+                indices=indices or None,
+            )
+            if max(loaded.grid.depth) > 0:
+                loaded.grid.negate_depth()
+            self._fields[key] = loaded
+        return self._fields[key]
+
+    def _mapped_field(
+        self,
+        name: str,
+        filename: str,
+        variable: str,
+        tracer: bool,
+        depth: float | None,
+    ) -> Field:
+        """
+        Load a field whole from a memory-mapped array, making the array first if it does not exist or is outdated.
+
+        Processes mapping the same input data share one copy of it in memory, through the operating system's file cache,
+        so mapped fields are neither cropped nor split in chunks.
+        The array is mapped copy-on-write, as Parcels writes to field data in place.
+        It never writes to it here, since land is already zero, so the memory stays shared.
+
+        :param name: Name of the field in the fieldsets.
+        :param filename: Name of the netCDF file in the input data directory.
+        :param variable: Name of the variable in the netCDF file.
+        :param tracer: Whether the field is a tracer.
+        :param depth: Depth to sample the field at only, so only the depth levels around it are used. If None, all depth levels are used.
+        :returns: The field.
+        """
+        file_path = self._input_file(filename)
+        depth_indices = self._depth_indices(file_path, depth)
+        # a slice of the mapped array is a view, so it is still shared
+        levels = (
+            slice(None)
+            if depth_indices is None
+            else slice(depth_indices[0], depth_indices[-1] + 1)
+        )
+        with xr.open_dataset(file_path) as ds:
+            data = _mapped_array(
+                ds[variable].transpose("time", "depth", "latitude", "longitude"),
+                file_path,
+                file_path.with_name(f"{file_path.stem}_{variable}.npy"),
+            )[:, levels]
+            grid_depths = ds["depth"].values[levels]
+            return Field(
+                (name, variable),
+                data,
+                lon=ds["longitude"].values,
+                lat=ds["latitude"].values,
+                depth=-grid_depths if max(grid_depths) > 0 else grid_depths,
+                time=ds["time"].values,
+                mesh="spherical",
+                allow_time_extrapolation=True,
+                interp_method=self._tracer_interp_method if tracer else "linear",
+            )
+
+    def _input_file(self, filename: str) -> Path:
+        """
+        Get the file to read input data from, which is the preprocessed copy if the cache is used, land is filled in it, it is compact or fields are mapped.
+
+        :param filename: Name of the downloaded netCDF file in the input data directory.
+        :returns: Path to the file to read.
+        """
+        file_path = self.directory.joinpath(filename)
+        fill_land = self.fill_land and filename in _TRACER_FILENAMES
+        if not (self.use_cache or fill_land or self.compact or self.mapped):
+            return file_path
+        return _preprocessed(
+            file_path,
+            self.directory.joinpath(PREPROCESSED, filename),
+            fill_land=fill_land,
+            compact=self.compact,
+        )
 
-        # add bathymetry data
-        bathymetry_file = directory.joinpath("bathymetry.nc")
+    def _fieldset_files(self, filename: str) -> Path | list[Path]:
+        """
+        Get the files to read a drifter or argo float field from, which is one file per time step if prefetching.
+
+        :param filename: Name of the downloaded netCDF file in the input data directory.
+        :returns: Path to the file to read, or paths to the files per time step.
+        """
+        file_path = self._input_file(filename)
+        if not self.prefetch:
+            return file_path
+        return _time_steps(file_path, self.directory.joinpath(PREPROCESSED, TIME_STEPS))
+
+    def _time_step_files(self, filenames: list[str]) -> list[list[Path]]:
+        """
+        Get the files per time step of input files.
+
+        :param filenames: Names of the downloaded netCDF files in the input data directory.
+        :returns: Per time step, the files holding it.
+        """
+        # downloaded files cover the same times, if not the extra time steps are left out
+        return [
+            list(files)
+            for files in zip(
+                *(self._fieldset_files(filename) for filename in filenames),
+                strict=False,
+            )
+        ]
+
+    @property
+    def _tracer_interp_method(self) -> str:
+        """Interpolation method for tracers. Filled land needs no special treatment."""
+        return "linear" if self.fill_land else "linear_invdist_land_tracer"
+
+    def _crop_indices(self, file_path: Path) -> dict[str, list[int]] | None:
+        """
+        Get the grid indices of a netCDF file that cover the track, with one extra grid point on every side for interpolation.
+
+        :param file_path: Path to the netCDF file.
+        :returns: Indices per horizontal dimension, as Parcels expects them, or None if the file is not cropped.
+        """
+        if self.track is None or self.mapped:
+            return None
+
+        with xr.open_dataset(file_path) as ds:
+            grid_lons = ds["longitude"].values
+            grid_lats = ds["latitude"].values
+
+        _, lons, lats = self.track.leg_points(_CROP_SPACING)
+        lons = np.concatenate([self.track.waypoint_lons, lons])
+        lats = np.concatenate([self.track.waypoint_lats, lats])
+
+        indices = {"lat": _index_range(grid_lats, lats.min(), lats.max())}
+        # a track crossing the antimeridian is not cropped in longitude
+        if lons.max() - lons.min() <= 180:
+            indices["lon"] = _index_range(grid_lons, lons.min(), lons.max())
+        return indices
+
+    def _depth_indices(self, file_path: Path, depth: float | None) -> list[int] | None:
+        """
+        Get the depth indices of a netCDF file needed to interpolate at a single depth.
+
+        :param file_path: Path to the netCDF file.
+        :param depth: Depth to interpolate at, negative into the water, or None for all depths.
+        :returns: Indices of the depth levels around the depth, as Parcels expects them, or None for all depths.
+        """
+        if depth is None:
+            return None
+
+        # depths are positive in downloaded files and negative in preprocessed copies, so compare magnitudes
+        with xr.open_dataset(file_path) as ds:
+            grid_depths = np.abs(ds["depth"].values)
+        return _index_range(grid_depths, abs(depth), abs(depth))
+
+    def _chunksize(
+        self, file_path: Path, depth_indices: list[int] | None = None
+    ) -> dict[str, tuple[str, int]] | None:
+        """
+        Get how to split the fields in a netCDF file in chunks no larger than the chunk memory.
+
+        A chunk holds all depths loaded of a square tile of the horizontal grid, at a single time.
+
+        :param file_path: Path to the netCDF file.
+        :param depth_indices: Indices of the depth levels loaded, or None if all are loaded.
+        :returns: Chunk size per dimension, as Parcels expects it, or None if fields are not split in chunks.
+        """
+        if self.chunk_memory is None or self.mapped:
+            return None
+
+        with xr.open_dataset(file_path) as ds:
+            sizes = dict(ds.sizes)
+        # Parcels cannot chunk fields with a horizontal dimension of length one, which are small anyway
+        if sizes["latitude"] == 1 or sizes["longitude"] == 1:
+            return None
+
+        depths = sizes.get("depth", 1) if depth_indices is None else len(depth_indices)
+        # data is read as float64 before Parcels converts it, unless compact copies are decoded to float32
+        itemsize = np.dtype(np.float32 if self.compact else np.float64).itemsize
+        tile = math.isqrt(self.chunk_memory // (itemsize * depths))
+        # Parcels does not split a dimension in chunks of one
+        return {
+            "time": ("time", 1),
+            "depth": ("depth", depths),
+            "lat": ("latitude", max(tile, 2)),
+            "lon": ("longitude", max(tile, 2)),
+        }
+
+    @cached_property
+    def _bathymetry_field(self) -> Field:
+        """Bathymetry field shared by the ship and CTD BGC fieldsets, with negative depth."""
+        bathymetry_file = self._input_file("bathymetry.nc")
         bathymetry_variables = ("bathymetry", "deptho")
         bathymetry_dimensions = {"lon": "longitude", "lat": "latitude"}
         bathymetry_field = Field.from_netcdf(
-            bathymetry_file, bathymetry_variables, bathymetry_dimensions
+            bathymetry_file,
+            bathymetry_variables,
+            bathymetry_dimensions,
+            indices=self._crop_indices(bathymetry_file),
         )
         # make depth negative
         bathymetry_field.data = -bathymetry_field.data
-        fieldset.add_field(bathymetry_field)
-
-        # read in data already
-        fieldset.computeTimeChunk(0, 1)
-
-        return fieldset
+        return bathymetry_field
 
-    @classmethod
-    def _load_drifter_fieldset(cls, directory: Path) -> FieldSet:
+    def _load_drifter_fieldset(self) -> FieldSet:
         filenames = {
-            "U": directory.joinpath("drifter_uv.nc"),
-            "V": directory.joinpath("drifter_uv.nc"),
-            "T": directory.joinpath("drifter_t.nc"),
+            "U": self._fieldset_files("drifter_uv.nc"),
+            "V": self._fieldset_files("drifter_uv.nc"),
+            "T": self._fieldset_files("drifter_t.nc"),
         }
         variables = {"U": "uo", "V": "vo", "T": "thetao"}
         dimensions = {
@@ -212,26 +586,30 @@ class InputData:
         }
 
         fieldset = FieldSet.from_netcdf(
-            filenames, variables, dimensions, allow_time_extrapolation=False
+            filenames,
+            variables,
+            dimensions,
+            allow_time_extrapolation=False,
+            chunksize=self._chunksize(self._input_file("drifter_uv.nc")),
         )
-        fieldset.T.interp_method = "linear_invdist_land_tracer"
+        fieldset.T.interp_method = self._tracer_interp_method
 
         # make depth negative
         for g in fieldset.gridset.grids:
-            g.negate_depth()
+            if max(g.depth) > 0:
+                g.negate_depth()
 
         # read in data already
         fieldset.computeTimeChunk(0, 1)
 
         return fieldset
 
-    @classmethod
-    def _load_argo_float_fieldset(cls, directory: Path) -> FieldSet:
+    def _load_argo_float_fieldset(self) -> FieldSet:
         filenames = {
-            "U": directory.joinpath("argo_float_uv.nc"),
-            "V": directory.joinpath("argo_float_uv.nc"),
-            "S": directory.joinpath("argo_float_s.nc"),
-            "T": directory.joinpath("argo_float_t.nc"),
+            "U": self._fieldset_files("argo_float_uv.nc"),
+            "V": self._fieldset_files("argo_float_uv.nc"),
+            "S": self._fieldset_files("argo_float_s.nc"),
+            "T": self._fieldset_files("argo_float_t.nc"),
         }
         variables = {"U": "uo", "V": "vo", "S": "so", "T": "thetao"}
         dimensions = {
@@ -242,10 +620,14 @@ class InputData:
         }
 
         fieldset = FieldSet.from_netcdf(
-            filenames, variables, dimensions, allow_time_extrapolation=False
+            filenames,
+            variables,
+            dimensions,
+            allow_time_extrapolation=False,
+            chunksize=self._chunksize(self._input_file("argo_float_uv.nc")),
         )
-        fieldset.T.interp_method = "linear_invdist_land_tracer"
-        fieldset.S.interp_method = "linear_invdist_land_tracer"
+        fieldset.T.interp_method = self._tracer_interp_method
+        fieldset.S.interp_method = self._tracer_interp_method
 
         # make depth negative
         for g in fieldset.gridset.grids:
@@ -256,3 +638,324 @@ class InputData:
         fieldset.computeTimeChunk(0, 1)
 
         return fieldset
+
+
+class TimeStepPrefetcher:
+    """
+    Reads the files of the next time step of a fieldset ahead on a background thread, while Parcels simulates.
+
+    Parcels loads the time steps of a fieldset from file one at a time while simulating, and waits for every load.
+    Called after every iteration of a simulation, this reads the files of the time step Parcels loads next
+    into the operating system's file cache, so the load does not wait for the disk.
+    Only plain file reads happen in the background, as the netCDF library Parcels reads with is not thread-safe.
+    """
+
+    def __init__(self, fieldset: FieldSet, time_step_files: list[list[Path]]):
+        """
+        Create a prefetcher.
+
+        :param fieldset: The fieldset, read from one file per time step.
+        :param time_step_files: Per time step of the fieldset, the files holding it.
+        """
+        self._fieldset = fieldset
+        self._time_step_files = time_step_files
+        self._prefetched_i: int | None = None
+        self._thread: threading.Thread | None = None
+
+    def __call__(self) -> None:
+        """Start reading the files of the time step after the loaded ones, if not done yet."""
+        grid = self._fieldset.U.grid
+        next_i = int(np.searchsorted(grid.time_full, grid.time[-1])) + 1
+        if next_i == self._prefetched_i or next_i >= len(self._time_step_files):
+            return
+
+        # the previous time step is loaded already, so its read has long finished
+        if self._thread is not None:
+            self._thread.join()
+        self._prefetched_i = next_i
+        self._thread = threading.Thread(
+            target=lambda files: [_read_ahead(file) for file in files],
+            args=(self._time_step_files[next_i],),
+            daemon=True,
+        )
+        self._thread.start()
+
+
+def _index_range(grid: np.ndarray, low: float, high: float) -> list[int]:
+    """
+    Get the indices of the grid points needed to interpolate anywhere between two values.
+
+    :param grid: Grid coordinates, in ascending order.
+    :param low: Lowest value to interpolate at.
+    :param high: Highest value to interpolate at.
+    :returns: Consecutive indices from the last grid point at or below low to the first at or above high, at least two if the grid has them. All indices if the grid is not ascending.
+    """
+    last = len(grid) - 1
+    if np.any(np.diff(grid) <= 0):
+        return list(range(len(grid)))
+    start = int(
+        np.clip(np.searchsorted(grid, low, side="right") - 1, 0, max(last - 1, 0))
+    )
+    end = int(
+        np.clip(np.searchsorted(grid, high, side="left"), min(start + 1, last), last)
+    )
+    return list(range(start, end + 1))
+
+
+def _read_ahead(file_path: Path) -> None:
+    """Read a file without keeping its contents, so it is in the operating system's file cache when it is read for real."""
+    with open(file_path, "rb") as file:
+        while file.read(16 * 1024 * 1024):
+            pass
+
+
+def _preprocessed(
+    source: Path, target: Path, fill_land: bool = False, compact: bool = False
+) -> Path:
+    """
+    Get a preprocessed copy of an input file, making it if it does not exist or is outdated.
+
+    The copy has negative depths and is stored decoded, uncompressed and contiguous, so it is quick to read.
+    It records which version of the source file it was made from, whether land was filled and whether it is compact.
+
+    :param source: Path to the downloaded netCDF file.
+    :param target: Path to store the copy at.
+    :param fill_land: Whether to fill land in all variables, see `_fill_land`.
+    :param compact: Whether to store variables with reduced precision, see `_compact_encoding`.
+    :returns: Path to the copy.
+    """
+    stat = source.stat()
+    made_from = f"{_PREPROCESSING_VERSION} {stat.st_size} {stat.st_mtime_ns}"
+    if fill_land:
+        made_from += " land filled"
+    if compact:
+        made_from += " compact"
+
+    if target.exists():
+        with xr.open_dataset(target) as ds:
+            if ds.attrs.get("preprocessed_from") == made_from:
+                return target
+
+    # write to a temporary file first, so other runs never see a partially written file
+    target.parent.mkdir(exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=target.parent, suffix=".nc", delete=False
+    ) as file:
+        temporary = Path(file.name)
+
+    # copy one time step at a time, so large files are never in memory whole
+    with xr.open_dataset(source, chunks={}) as ds:
+        if "time" in ds.dims:
+            ds = ds.chunk({"time": 1})
+        if "depth" in ds.coords and ds["depth"].max() > 0:
+            ds = ds.assign_coords(depth=-ds["depth"])
+            ds["depth"].attrs["positive"] = "up"
+        if fill_land:
+            ds = ds.map(_fill_land_variable, keep_attrs=True)
+        for variable in ds.variables.values():
+            variable.encoding = {}
+        ds.attrs["preprocessed_from"] = made_from
+
+        ds.to_netcdf(
+            temporary,
+            encoding={
+                name: {
+                    "zlib": False,
+                    "contiguous": True,
+                    **(_compact_encoding(variable) if compact else {}),
+                }
+                for name, variable in ds.data_vars.items()
+            },
+        )
+    os.replace(temporary, target)
+    return target
+
+
+def _mapped_array(variable: xr.DataArray, source: Path, target: Path) -> np.ndarray:
+    """
+    Get a variable as a float32 array memory-mapped from a numpy file, making the file if it is older than its source.
+
+    Missing values are stored as zero, as Parcels needs them.
+
+    :param variable: The variable, with dimensions in the order to store them in.
+    :param source: Path to the netCDF file the variable is read from.
+    :param target: Path to store the array at.
+    :returns: The array, mapped copy-on-write.
+    """
+    if not target.exists() or target.stat().st_mtime_ns < source.stat().st_mtime_ns:
+        # write to a temporary file first, so other processes never map a partially written file
+        with tempfile.NamedTemporaryFile(
+            dir=target.parent, suffix=".npy", delete=False
+        ) as file:
+            temporary = Path(file.name)
+        array = np.lib.format.open_memmap(
+            temporary, mode="w+", dtype=np.float32, shape=variable.shape
+        )
+        # copy one time step at a time, so large files are never in memory whole
+        for time_i in range(variable.shape[0]):
+            array[time_i] = np.nan_to_num(variable[time_i].values, nan=0.0)
+        array.flush()
+        del array
+        os.replace(temporary, target)
+    return np.load(target, mmap_mode="c")
+
+
+def _time_steps(source: Path, target_directory: Path) -> list[Path]:
+    """
+    Split an input file in one file per time step, making them if they do not exist or are outdated.
+
+    The files are stored uncompressed and contiguous, so they are quick to read, with the same data types as the source.
+    Every file records which version of the source file it was made from.
+
+    :param source: Path to the netCDF file to split.
+    :param target_directory: Directory to store the files in.
+    :returns: Paths to the files, in time order.
+    """
+    stat = source.stat()
+    made_from = (
+        f"{_PREPROCESSING_VERSION} {source.name} {stat.st_size} {stat.st_mtime_ns}"
+    )
+
+    with xr.open_dataset(source) as ds:
+        targets = [
+            target_directory.joinpath(f"{source.stem}_{time_i:05d}.nc")
+            for time_i in range(ds.sizes["time"])
+        ]
+
+    def is_current(target: Path) -> bool:
+        if not target.exists():
+            return False
+        with xr.open_dataset(target) as ds:
+            return ds.attrs.get("split_from") == made_from
+
+    if all(is_current(target) for target in targets):
+        return targets
+
+    target_directory.mkdir(parents=True, exist_ok=True)
+    with xr.open_dataset(source, chunks={}) as ds:
+        for time_i, target in enumerate(targets):
+            time_step = ds.isel(time=slice(time_i, time_i + 1))
+            time_step.attrs["split_from"] = made_from
+
+            # write to a temporary file first, so other runs never see a partially written file
+            with tempfile.NamedTemporaryFile(
+                dir=target_directory, suffix=".nc", delete=False
+            ) as file:
+                temporary = Path(file.name)
+            time_step.to_netcdf(
+                temporary,
+                encoding={
+                    name: {
+                        **{
+                            key: value
+                            for key, value in variable.encoding.items()
+                            if key
+                            in ["dtype", "scale_factor", "add_offset", "_FillValue"]
+                        },
+                        "zlib": False,
+                        "contiguous": True,
+                    }
+                    for name, variable in time_step.data_vars.items()
+                },
+            )
+            os.replace(temporary, target)
+    return targets
+
+
+def _compact_encoding(variable: xr.DataArray) -> dict:
+    """
+    Get the netCDF encoding that stores a variable with reduced precision, decoded again as float32.
+
+    Velocities are stored as float32, as rounding errors would add up while advecting.
+    Bathymetry is stored as 16-bit integers in whole meters, off by at most half a meter.
+    Other variables are tracers, stored as 16-bit integers scaled to their largest magnitude,
+    off by at most that magnitude divided by 65534. Zero stays exactly zero, so land stays land.
+    Missing values stay missing. Parcels holds all fields as float32 either way,
+    so variables are decoded straight to float32 instead of via float64.
+
+    :param variable: The variable to store.
+    :returns: Encoding of the variable, for `xarray.Dataset.to_netcdf`.
+    """
+    if variable.name in _VELOCITY_VARIABLES:
+        return {"dtype": "float32"}
+    if variable.name == _BATHYMETRY_VARIABLE:
+        return {"dtype": "int16", "_FillValue": np.int16(-32768)}
+
+    largest = float(np.abs(variable).max())
+    return {
+        "dtype": "int16",
+        "scale_factor": np.float32(largest / 32767 if largest > 0 else 1),
+        "add_offset": np.float32(0),
+        "_FillValue": np.int16(-32768),
+    }
+
+
+def _fill_land_variable(variable: xr.DataArray) -> xr.DataArray:
+    """Fill land in a variable one time step at a time, see `_fill_land`."""
+    core_dims = [
+        dim for dim in ["depth", "latitude", "longitude"] if dim in variable.dims
+    ]
+    if "latitude" not in core_dims or "longitude" not in core_dims:
+        return variable
+    # filling spreads over the whole horizontal grid and down the depths
+    variable = variable.chunk({dim: -1 for dim in core_dims})
+    return xr.apply_ufunc(
+        _fill_land,
+        variable,
+        input_core_dims=[core_dims],
+        output_core_dims=[core_dims],
+        kwargs={"vertical": "depth" in core_dims},
+        dask="parallelized",
+        output_dtypes=[variable.dtype],
+        keep_attrs=True,
+    ).transpose(*variable.dims)
+
+
+def _fill_land(data: np.ndarray, vertical: bool) -> np.ndarray:
+    """
+    Fill land by repeatedly extrapolating from the nearest ocean.
+
+    Land is where data is missing or zero, as Parcels sees it.
+    Land next to ocean gets the mean of its ocean neighbours, until no land next to ocean is left.
+    Depth levels without any ocean then get the level above.
+    Tracers filled this way are interpolated linearly, instead of with `linear_invdist_land_tracer`,
+    which leaves out land at every sample.
+
+    :param data: Data with latitude and longitude as the last two axes, and depth before them if vertical.
+    :param vertical: Whether the third to last axis is depth, surface first.
+    :returns: The filled data, with land left only where there is no ocean to fill it from.
+    """
+    data = np.where(np.isnan(data), 0, data)
+    land = data == 0
+
+    while True:
+        ocean = ~land
+        value = np.where(ocean, data, 0)
+        total = np.zeros(data.shape, dtype=np.float64)
+        count = np.zeros(data.shape, dtype=np.int8)
+        for axis in [-1, -2]:
+            for target, neighbour in [
+                (slice(1, None), slice(None, -1)),
+                (slice(None, -1), slice(1, None)),
+            ]:
+                target_index = [slice(None)] * data.ndim
+                target_index[axis] = target
+                neighbour_index = [slice(None)] * data.ndim
+                neighbour_index[axis] = neighbour
+                total[tuple(target_index)] += value[tuple(neighbour_index)]
+                count[tuple(target_index)] += ocean[tuple(neighbour_index)]
+
+        fill = land & (count > 0)
+        if not np.any(fill):
+            break
+        data[fill] = total[fill] / count[fill]
+        land &= ~fill
+
+    if vertical:
+        for depth_i in range(1, data.shape[-3]):
+            level_land = land[..., depth_i, :, :]
+            data[..., depth_i, :, :] = np.where(
+                level_land, data[..., depth_i - 1, :, :], data[..., depth_i, :, :]
+            )
+            land[..., depth_i, :, :] = level_land & land[..., depth_i - 1, :, :]
+    return data
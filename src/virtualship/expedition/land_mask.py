@@ -0,0 +1,273 @@
+"""LandMask class."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+from parcels import FieldSet
+
+from virtualship.models import Timeline
+
+LAND_MASK = "land_mask.npz"
+
+# change when building or storing land masks changes, to rebuild stored land masks
+_LAND_MASK_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LandMask:
+    """
+    Where there is land, on a regular longitude-latitude grid.
+
+    A location is on land if every grid point it would be interpolated from is land,
+    which is where interpolating the velocity field gives exactly zero.
+    """
+
+    lons: np.ndarray
+    """Longitudes of the grid, in ascending order."""
+    lats: np.ndarray
+    """Latitudes of the grid, in ascending order."""
+    is_land: np.ndarray
+    """Whether each grid point is land, indexed as [lat, lon]."""
+    made_from: str = ""
+    """Name, size and modification time of the file the land mask was built from, empty if not built from a file."""
+
+    @classmethod
+    def load(cls, directory: str | Path) -> LandMask:
+        """
+        Load the land mask stored in an input data directory, building and storing it first if it does not exist yet.
+
+        The land mask is built from the bathymetry if available, otherwise from the first available velocity field.
+        A stored land mask is rebuilt when that file has changed since, or when it was stored in another format.
+
+        :param directory: Input data directory.
+        :returns: The land mask.
+        :raises FileNotFoundError: If there is neither a stored land mask nor data to build it from.
+        """
+        directory = Path(directory)
+        file_path = directory.joinpath(LAND_MASK)
+
+        sources = [
+            directory.joinpath(filename)
+            for filename in [
+                "bathymetry.nc",
+                "ship_uv.nc",
+                "drifter_uv.nc",
+                "argo_float_uv.nc",
+            ]
+            if directory.joinpath(filename).exists()
+        ]
+
+        # reuse the stored land mask if it was built from the file it would be built from now
+        try:
+            stored = cls.from_npz(file_path)
+        except (FileNotFoundError, KeyError, ValueError):
+            # not stored, or stored by a version of virtualship with another format
+            stored = None
+        if stored is not None and (
+            len(sources) == 0 or stored.made_from == _made_from(sources[0])
+        ):
+            return stored
+
+        if len(sources) == 0:
+            raise FileNotFoundError(
+                f"No bathymetry or velocity data found in '{directory}' to build a land mask from."
+            )
+        if sources[0].name == "bathymetry.nc":
+            land_mask = cls.from_bathymetry(sources[0])
+        else:
+            land_mask = cls.from_uv(sources[0])
+        land_mask.to_npz(file_path)
+        return land_mask
+
+    @classmethod
+    def from_bathymetry(cls, file_path: str | Path) -> LandMask:
+        """
+        Build a land mask from a bathymetry netCDF file. Grid points without positive depth are land.
+
+        :param file_path: Path to the bathymetry file.
+        :returns: The land mask.
+        """
+        with xr.open_dataset(file_path) as ds:
+            depth = ds["deptho"].transpose("latitude", "longitude")
+            return cls._from_grid(
+                ds["longitude"].values,
+                ds["latitude"].values,
+                ~(depth.values > 0),
+                made_from=_made_from(Path(file_path)),
+            )
+
+    @classmethod
+    def from_uv(cls, file_path: str | Path) -> LandMask:
+        """
+        Build a land mask from a velocity netCDF file. Grid points with zero or missing velocity at the first time and depth are land.
+
+        :param file_path: Path to the velocity file.
+        :returns: The land mask.
+        """
+        with xr.open_dataset(file_path) as ds:
+            surface = ds.isel(time=0, depth=0)
+            u = surface["uo"].transpose("latitude", "longitude").fillna(0).values
+            v = surface["vo"].transpose("latitude", "longitude").fillna(0).values
+            return cls._from_grid(
+                ds["longitude"].values,
+                ds["latitude"].values,
+                (u == 0) & (v == 0),
+                made_from=_made_from(Path(file_path)),
+            )
+
+    @classmethod
+    def from_fieldset(cls, fieldset: FieldSet) -> LandMask:
+        """
+        Build a land mask from a loaded fieldset. Grid points with zero velocity at the first loaded time and depth are land.
+
+        :param fieldset: The fieldset to take the velocity from.
+        :returns: The land mask.
+        """
+        return cls._from_grid(
+            fieldset.U.grid.lon,
+            fieldset.U.grid.lat,
+            (fieldset.U.data[0, 0] == 0) & (fieldset.V.data[0, 0] == 0),
+        )
+
+    @classmethod
+    def _from_grid(
+        cls,
+        lons: np.ndarray,
+        lats: np.ndarray,
+        is_land: np.ndarray,
+        made_from: str = "",
+    ) -> LandMask:
+        """Create a land mask from grid data in any order, sorting it to ascending longitude and latitude."""
+        lon_order = np.argsort(lons)
+        lat_order = np.argsort(lats)
+        return cls(
+            lons=np.asarray(lons, dtype=np.float64)[lon_order],
+            lats=np.asarray(lats, dtype=np.float64)[lat_order],
+            is_land=np.asarray(is_land, dtype=bool)[np.ix_(lat_order, lon_order)],
+            made_from=made_from,
+        )
+
+    def to_npz(self, file_path: str | Path) -> None:
+        """
+        Write land mask to a numpy npz file.
+
+        :param file_path: Path to the file to write to.
+        """
+        with open(file_path, "wb") as file:
+            np.savez(
+                file,
+                version=_LAND_MASK_VERSION,
+                lons=self.lons,
+                lats=self.lats,
+                is_land=self.is_land,
+                made_from=self.made_from,
+            )
+
+    @classmethod
+    def from_npz(cls, file_path: str | Path) -> LandMask:
+        """
+        Load land mask from a numpy npz file.
+
+        :param file_path: Path to the file to load from.
+        :returns: The land mask.
+        :raises ValueError: If the file was written in another format.
+        """
+        with np.load(file_path) as data:
+            if "version" not in data or data["version"].item() != _LAND_MASK_VERSION:
+                raise ValueError(
+                    f"Land mask '{file_path}' is stored in another format."
+                )
+            return cls(
+                lons=data["lons"],
+                lats=data["lats"],
+                is_land=data["is_land"],
+                made_from=data["made_from"].item(),
+            )
+
+    def is_on_land(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """
+        Check for many locations at once whether they are on land.
+
+        Locations outside the grid are not on land, as nothing is known about them.
+
+        :param lons: Longitudes of the locations.
+        :param lats: Latitudes of the locations.
+        :returns: Whether each location is on land.
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+
+        lon_i, lon_weight, lon_outside = _cell(self.lons, lons)
+        lat_i, lat_weight, lat_outside = _cell(self.lats, lats)
+        lon_i_next = np.minimum(lon_i + 1, len(self.lons) - 1)
+        lat_i_next = np.minimum(lat_i + 1, len(self.lats) - 1)
+
+        # a corner only matters if it has weight in the interpolation
+        on_land = np.ones(lons.shape, dtype=bool)
+        for corner_lat_i, corner_lat_weight in [
+            (lat_i, 1 - lat_weight),
+            (lat_i_next, lat_weight),
+        ]:
+            for corner_lon_i, corner_lon_weight in [
+                (lon_i, 1 - lon_weight),
+                (lon_i_next, lon_weight),
+            ]:
+                on_land &= self.is_land[corner_lat_i, corner_lon_i] | (
+                    corner_lat_weight * corner_lon_weight == 0
+                )
+        return on_land & ~lon_outside & ~lat_outside
+
+    def legs_on_land(self, timeline: Timeline) -> list[int]:
+        """
+        Find the legs of a timeline that cross land.
+
+        Every leg is sampled along its geodesic at least every half grid cell, all legs in one batch.
+
+        :param timeline: Timeline to check the legs of.
+        :returns: Indices of the legs that cross land, where leg i goes from waypoint i to waypoint i + 1.
+        """
+        leg_i, lons, lats = timeline.leg_points(self._sample_spacing())
+        return np.unique(leg_i[self.is_on_land(lons, lats)]).tolist()
+
+    def _sample_spacing(self) -> float:
+        """Distance in meters between samples along a leg, half the smallest grid step."""
+        meter_per_degree = 111_000
+        # longitude steps get shorter towards the poles, don't let that get out of hand
+        lon_scale = max(np.cos(np.deg2rad(np.abs(self.lats).max())), 0.1)
+        steps = np.concatenate(
+            [
+                np.diff(self.lons) * meter_per_degree * lon_scale,
+                np.diff(self.lats) * meter_per_degree,
+            ]
+        )
+        steps = steps[steps > 0]
+        if len(steps) == 0:
+            return np.inf
+        return steps.min() / 2
+
+
+def _made_from(source: Path) -> str:
+    """Identify the version of a file by its name, size and modification time."""
+    stat = source.stat()
+    return f"{source.name} {stat.st_size} {stat.st_mtime_ns}"
+
+
+def _cell(grid: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the grid cell containing each value.
+
+    :param grid: Grid coordinates in ascending order.
+    :param x: Values to find the cell of.
+    :returns: Index of the lower grid point of the cell, relative position within the cell between 0 and 1, and whether the value is outside the grid. A grid of one point is a single cell containing everything.
+    """
+    if len(grid) == 1:
+        return np.zeros(x.shape, dtype=int), np.zeros(x.shape), np.zeros(x.shape, bool)
+
+    i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+    weight = np.clip((x - grid[i]) / (grid[i + 1] - grid[i]), 0, 1)
+    outside = (x < grid[0]) | (x > grid[-1])
+    return i, weight, outside
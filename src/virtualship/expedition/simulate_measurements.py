@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 
 from yaspin import yaspin
 
+from virtualship.instruments import ship_underwater_st
 from virtualship.instruments.adcp import simulate_adcp
 from virtualship.instruments.argo_float import simulate_argo_floats
 from virtualship.instruments.ctd import simulate_ctd
@@ -34,6 +35,8 @@ def simulate_measurements(
     ship_config: ShipConfig,
     input_data: InputData,
     measurements: MeasurementsToSimulate,
+    direct_sampling: bool = False,
+    batched_adcp: bool = False,
 ) -> None:
     """
     Simulate measurements using Parcels.
@@ -44,6 +47,8 @@ def simulate_measurements(
     :param ship_config: Ship configuration.
     :param input_data: Input data for simulation.
     :param measurements: The measurements to simulate.
+    :param direct_sampling: Whether the ADCP, underway temperature and salinity, CTDs, BGC CTDs and XBTs interpolate input data directly instead of executing Parcels.
+    :param batched_adcp: Whether the ADCP samples all points in one execution of Parcels instead of one execution per point.
     :raises RuntimeError: In case fieldsets of configuration is not provided. Make sure to check this before calling this function.
     """
     if isinstance(expedition_dir, str):
@@ -62,8 +67,9 @@ def simulate_measurements(
             simulate_ship_underwater_st(
                 fieldset=input_data.ship_underwater_st_fieldset,
                 out_path=expedition_dir.joinpath("results", "ship_underwater_st.zarr"),
-                depth=-2,
+                depth=ship_underwater_st.DEPTH,
                 sample_points=measurements.ship_underwater_sts,
+                direct=direct_sampling,
             )
             spinner.ok("✅")
 
@@ -82,6 +88,8 @@ def simulate_measurements(
                 min_depth=-5,
                 num_bins=ship_config.adcp_config.num_bins,
                 sample_points=measurements.adcps,
+                batched=batched_adcp,
+                direct=direct_sampling,
             )
             spinner.ok("✅")
 
@@ -97,7 +105,10 @@ def simulate_measurements(
                 out_path=expedition_dir.joinpath("results", "ctd.zarr"),
                 fieldset=input_data.ctd_fieldset,
                 ctds=measurements.ctds,
+                min_depth=ship_config.ctd_config.min_depth_meter,
+                max_depth=ship_config.ctd_config.max_depth_meter,
                 outputdt=timedelta(seconds=10),
+                direct=direct_sampling,
             )
             spinner.ok("✅")
 
@@ -113,7 +124,10 @@ def simulate_measurements(
                 out_path=expedition_dir.joinpath("results", "ctd_bgc.zarr"),
                 fieldset=input_data.ctd_bgc_fieldset,
                 ctd_bgcs=measurements.ctd_bgcs,
+                min_depth=ship_config.ctd_bgc_config.min_depth_meter,
+                max_depth=ship_config.ctd_bgc_config.max_depth_meter,
                 outputdt=timedelta(seconds=10),
+                direct=direct_sampling,
             )
             spinner.ok("✅")
 
@@ -129,7 +143,12 @@ def simulate_measurements(
                 out_path=expedition_dir.joinpath("results", "xbts.zarr"),
                 fieldset=input_data.xbt_fieldset,
                 xbts=measurements.xbts,
+                min_depth=ship_config.xbt_config.min_depth_meter,
+                max_depth=ship_config.xbt_config.max_depth_meter,
+                fall_speed=ship_config.xbt_config.fall_speed_meter_per_second,
+                deceleration_coefficient=ship_config.xbt_config.deceleration_coefficient,
                 outputdt=timedelta(seconds=1),
+                direct=direct_sampling,
             )
             spinner.ok("✅")
 
@@ -143,9 +162,15 @@ def simulate_measurements(
             out_path=expedition_dir.joinpath("results", "drifters.zarr"),
             fieldset=input_data.drifter_fieldset,
             drifters=measurements.drifters,
+            depth=ship_config.drifter_config.depth_meter,
+            lifetime=ship_config.drifter_config.lifetime,
             outputdt=timedelta(hours=5),
             dt=timedelta(minutes=5),
             endtime=None,
+            # prefetch input data while simulating, if the input data supports it
+            callbacks=None
+            if input_data.drifter_prefetcher is None
+            else [input_data.drifter_prefetcher],
         )
 
     if len(measurements.argo_floats) > 0:
@@ -157,7 +182,17 @@ def simulate_measurements(
         simulate_argo_floats(
             out_path=expedition_dir.joinpath("results", "argo_floats.zarr"),
             argo_floats=measurements.argo_floats,
+            min_depth=ship_config.argo_float_config.min_depth_meter,
+            max_depth=ship_config.argo_float_config.max_depth_meter,
+            drift_depth=ship_config.argo_float_config.drift_depth_meter,
+            vertical_speed=ship_config.argo_float_config.vertical_speed_meter_per_second,
+            cycle_days=ship_config.argo_float_config.cycle_days,
+            drift_days=ship_config.argo_float_config.drift_days,
             fieldset=input_data.argo_float_fieldset,
             outputdt=timedelta(minutes=5),
             endtime=None,
+            # prefetch input data while simulating, if the input data supports it
+            callbacks=None
+            if input_data.argo_float_prefetcher is None
+            else [input_data.argo_float_prefetcher],
         )
@@ -2,22 +2,20 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
+from pathlib import Path
 
+import numpy as np
 import pyproj
 
-from virtualship.instruments.argo_float import ArgoFloat
-from virtualship.instruments.ctd import CTD
-from virtualship.instruments.ctd_bgc import CTD_BGC
-from virtualship.instruments.drifter import Drifter
-from virtualship.instruments.xbt import XBT
 from virtualship.models import (
     InstrumentType,
     Location,
     Schedule,
     ShipConfig,
-    Spacetime,
+    SpacetimeArray,
+    Timeline,
     Waypoint,
 )
 
@@ -36,23 +34,110 @@ class ScheduleProblem:
 
     time: datetime
     failed_waypoint_i: int
+    resume_state: ScheduleState
+    """State right before sailing to the failed waypoint, to resume simulation from once the schedule is fixed."""
 
 
 @dataclass
 class MeasurementsToSimulate:
-    """The measurements to simulate, as concluded from schedule simulation."""
+    """
+    The measurements to simulate, as concluded from schedule simulation.
+
+    For underway instruments these are the sample points, for the other instruments the deployments.
+    Instrument settings are not repeated per measurement; they are taken from the ship configuration.
+    """
 
-    adcps: list[Spacetime] = field(default_factory=list, init=False)
-    ship_underwater_sts: list[Spacetime] = field(default_factory=list, init=False)
-    argo_floats: list[ArgoFloat] = field(default_factory=list, init=False)
-    drifters: list[Drifter] = field(default_factory=list, init=False)
-    ctds: list[CTD] = field(default_factory=list, init=False)
-    ctd_bgcs: list[CTD_BGC] = field(default_factory=list, init=False)
-    xbts: list[XBT] = field(default_factory=list, init=False)
+    adcps: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+    ship_underwater_sts: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+    argo_floats: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+    drifters: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+    ctds: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+    ctd_bgcs: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+    xbts: SpacetimeArray = field(default_factory=SpacetimeArray.empty)
+
+
+@dataclass
+class ScheduleState:
+    """
+    State of schedule simulation right before sailing to a waypoint.
+
+    Simulation can be resumed from this state instead of starting over at the first waypoint,
+    as long as the waypoints before it and the ship configuration did not change.
+    """
+
+    waypoint_i: int
+    """Index of the waypoint the ship is about to sail to."""
+    time: datetime
+    location: Location
+    next_underway_times: dict[str, datetime]
+    """Next moment every underway instrument takes a sample, per field of MeasurementsToSimulate."""
+    measurements_to_simulate: MeasurementsToSimulate
+    """Measurements noted before sailing to the waypoint."""
+
+    def to_npz(self, file_path: str | Path) -> None:
+        """
+        Write state to a numpy npz file.
+
+        :param file_path: Path to the file to write to.
+        """
+        measurements = {}
+        for measurement in fields(MeasurementsToSimulate):
+            array = getattr(self.measurements_to_simulate, measurement.name)
+            measurements[f"{measurement.name}_lons"] = array.lons
+            measurements[f"{measurement.name}_lats"] = array.lats
+            measurements[f"{measurement.name}_times"] = array.times
+        with open(file_path, "wb") as file:
+            np.savez(
+                file,
+                waypoint_i=self.waypoint_i,
+                time=np.datetime64(self.time, "us"),
+                location=[self.location.lat, self.location.lon],
+                underway_names=np.array(list(self.next_underway_times), dtype=str),
+                next_underway_times=np.array(
+                    list(self.next_underway_times.values()), dtype="datetime64[us]"
+                ),
+                **measurements,
+            )
+
+    @classmethod
+    def from_npz(cls, file_path: str | Path) -> ScheduleState:
+        """
+        Load state from a numpy npz file.
+
+        :param file_path: Path to the file to load from.
+        :returns: The state.
+        """
+        with np.load(file_path) as data:
+            return ScheduleState(
+                waypoint_i=data["waypoint_i"].item(),
+                time=data["time"].item(),
+                location=Location(*data["location"].tolist()),
+                next_underway_times=dict(
+                    zip(
+                        data["underway_names"].tolist(),
+                        data["next_underway_times"].tolist(),
+                        strict=True,
+                    )
+                ),
+                measurements_to_simulate=MeasurementsToSimulate(
+                    **{
+                        measurement.name: SpacetimeArray(
+                            lons=data[f"{measurement.name}_lons"],
+                            lats=data[f"{measurement.name}_lats"],
+                            times=data[f"{measurement.name}_times"],
+                        )
+                        for measurement in fields(MeasurementsToSimulate)
+                    }
+                ),
+            )
 
 
 def simulate_schedule(
-    projection: pyproj.Geod, ship_config: ShipConfig, schedule: Schedule
+    projection: pyproj.Geod,
+    ship_config: ShipConfig,
+    schedule: Schedule,
+    resume_from: ScheduleState | None = None,
+    timeline: Timeline | None = None,
 ) -> ScheduleOk | ScheduleProblem:
     """
     Simulate a schedule.
@@ -60,171 +145,180 @@ def simulate_schedule(
     :param projection: The projection to use for sailing.
     :param ship_config: Ship configuration.
     :param schedule: The schedule to simulate.
+    :param resume_from: State to resume simulation from, as found by an earlier simulation of the same ship configuration and past waypoints. If None, simulation starts at the first waypoint.
+    :param timeline: Timeline of the schedule, if already compiled. Otherwise it is compiled from the ship configuration.
     :returns: Either the results of a successfully simulated schedule, or information on where the schedule became infeasible.
     """
-    return _ScheduleSimulator(projection, ship_config, schedule).simulate()
+    if timeline is None:
+        timeline = Timeline.compile(projection, ship_config, schedule)
+    return _ScheduleSimulator(ship_config, schedule, timeline, resume_from).simulate()
 
 
 class _ScheduleSimulator:
-    _projection: pyproj.Geod
     _ship_config: ShipConfig
     _schedule: Schedule
+    _timeline: Timeline
 
-    _time: datetime
-    """Current time."""
+    _time: np.datetime64
+    """Current time, as datetime64[us] like all times in the simulation."""
     _location: Location
     """Current ship location."""
 
-    _measurements_to_simulate: MeasurementsToSimulate
+    _measurements: dict[str, list[SpacetimeArray]]
+    """Measurements noted so far, per field of MeasurementsToSimulate, in chunks."""
 
-    _next_adcp_time: datetime
-    """Next moment ADCP measurement will be done."""
-    _next_ship_underwater_st_time: datetime
-    """Next moment ship underwater ST measurement will be done."""
+    _underway_periods: dict[str, np.timedelta64]
+    """Sampling period of every configured underway instrument, per field of MeasurementsToSimulate."""
+    _next_underway_times: dict[str, np.datetime64]
+    """Next moment every underway instrument takes a sample, per field of MeasurementsToSimulate."""
+
+    _first_waypoint_i: int
+    """Index of the waypoint to start sailing to."""
 
     def __init__(
-        self, projection: pyproj.Geod, ship_config: ShipConfig, schedule: Schedule
+        self,
+        ship_config: ShipConfig,
+        schedule: Schedule,
+        timeline: Timeline,
+        resume_from: ScheduleState | None,
     ) -> None:
-        self._projection = projection
         self._ship_config = ship_config
         self._schedule = schedule
+        self._timeline = timeline
+        self._underway_periods = {
+            name: np.timedelta64(period, "us")
+            for name, period in _underway_periods(ship_config).items()
+        }
+
+        if resume_from is not None:
+            self._restore(resume_from)
+            return
 
         assert self._schedule.waypoints[0].time is not None, (
             "First waypoint must have a time. This should have been verified before calling this function."
         )
-        self._time = schedule.waypoints[0].time
+        self._time = timeline.arrival_times[0]
         self._location = schedule.waypoints[0].location
 
-        self._measurements_to_simulate = MeasurementsToSimulate()
+        self._measurements = {
+            measurement.name: [] for measurement in fields(MeasurementsToSimulate)
+        }
+
+        self._next_underway_times = dict.fromkeys(self._underway_periods, self._time)
+
+        self._first_waypoint_i = 0
 
-        self._next_adcp_time = self._time
-        self._next_ship_underwater_st_time = self._time
+    def _restore(self, state: ScheduleState) -> None:
+        assert state.waypoint_i <= len(self._schedule.waypoints), (
+            "State to resume from is beyond the end of the schedule."
+        )
+        self._time = np.datetime64(state.time, "us")
+        self._location = state.location
+        self._measurements = {
+            measurement.name: [
+                getattr(state.measurements_to_simulate, measurement.name)
+            ]
+            for measurement in fields(MeasurementsToSimulate)
+        }
+        self._next_underway_times = {
+            name: np.datetime64(time, "us")
+            for name, time in state.next_underway_times.items()
+        }
+        self._first_waypoint_i = state.waypoint_i
+
+    def _state(self, waypoint_i: int) -> ScheduleState:
+        """
+        Get the current state of simulation.
+
+        :param waypoint_i: Index of the waypoint the ship is about to sail to.
+        :returns: The state.
+        """
+        return ScheduleState(
+            waypoint_i=waypoint_i,
+            time=self._time.item(),
+            location=self._location,
+            next_underway_times={
+                name: time.item() for name, time in self._next_underway_times.items()
+            },
+            measurements_to_simulate=MeasurementsToSimulate(
+                **{
+                    name: SpacetimeArray.concatenate(chunks)
+                    for name, chunks in self._measurements.items()
+                }
+            ),
+        )
 
     def simulate(self) -> ScheduleOk | ScheduleProblem:
-        for wp_i, waypoint in enumerate(self._schedule.waypoints):
-            # sail towards waypoint
-            self._progress_time_traveling_towards(waypoint.location)
+        # underway measurements only depend on the track, so they are all noted at once after the waypoints
+        for wp_i in range(self._first_waypoint_i, len(self._schedule.waypoints)):
+            waypoint = self._schedule.waypoints[wp_i]
+            arrival_time = self._timeline.arrival_times[wp_i].item()
 
-            # check if waypoint was reached in time
-            if waypoint.time is not None and self._time > waypoint.time:
+            # check if waypoint can be reached in time
+            if waypoint.time is not None and arrival_time > waypoint.time:
                 print(
                     # TODO: I think this should be wp_i + 1, not wp_i; otherwise it will be off by one
-                    f"Waypoint {wp_i} could not be reached in time. Current time: {self._time}. Waypoint time: {waypoint.time}."
+                    f"Waypoint {wp_i} could not be reached in time. Current time: {arrival_time}. Waypoint time: {waypoint.time}."
                 )
-                return ScheduleProblem(self._time, wp_i)
-            else:
-                self._time = (
-                    waypoint.time
-                )  # wait at the waypoint until ship is schedules to be there
+                self._sample_underway(self._time)
+                return ScheduleProblem(arrival_time, wp_i, self._state(wp_i))
 
-            # note measurements made at waypoint
-            time_passed = self._make_measurements(waypoint)
-
-            # wait while measurements are being done
-            self._progress_time_stationary(time_passed)
-        return ScheduleOk(self._time, self._measurements_to_simulate)
-
-    def _progress_time_traveling_towards(self, location: Location) -> None:
-        geodinv: tuple[float, float, float] = self._projection.inv(
-            lons1=self._location.lon,
-            lats1=self._location.lat,
-            lons2=location.lon,
-            lats2=location.lat,
-        )
-        ship_speed_meter_per_second = self._ship_config.ship_speed_knots * 1852 / 3600
-        azimuth1 = geodinv[0]
-        distance_to_next_waypoint = geodinv[2]
-        time_to_reach = timedelta(
-            seconds=distance_to_next_waypoint / ship_speed_meter_per_second
-        )
-        end_time = self._time + time_to_reach
-
-        # note all ADCP measurements
-        if self._ship_config.adcp_config is not None:
-            location = self._location
-            time = self._time
-            while self._next_adcp_time <= end_time:
-                time_to_sail = self._next_adcp_time - time
-                distance_to_move = (
-                    ship_speed_meter_per_second * time_to_sail.total_seconds()
-                )
-                geodfwd: tuple[float, float, float] = self._projection.fwd(
-                    lons=location.lon,
-                    lats=location.lat,
-                    az=azimuth1,
-                    dist=distance_to_move,
-                )
-                location = Location(latitude=geodfwd[1], longitude=geodfwd[0])
-                time = time + time_to_sail
-
-                self._measurements_to_simulate.adcps.append(
-                    Spacetime(location=location, time=time)
-                )
+            # sail towards waypoint
+            self._location = waypoint.location
 
-                self._next_adcp_time = (
-                    self._next_adcp_time + self._ship_config.adcp_config.period
-                )
+            # wait at the waypoint until ship is scheduled to be there
+            self._time = self._timeline.start_times[wp_i]
 
-        # note all ship underwater ST measurements
-        if self._ship_config.ship_underwater_st_config is not None:
-            location = self._location
-            time = self._time
-            while self._next_ship_underwater_st_time <= end_time:
-                time_to_sail = self._next_ship_underwater_st_time - time
-                distance_to_move = (
-                    ship_speed_meter_per_second * time_to_sail.total_seconds()
-                )
-                geodfwd: tuple[float, float, float] = self._projection.fwd(
-                    lons=location.lon,
-                    lats=location.lat,
-                    az=azimuth1,
-                    dist=distance_to_move,
-                )
-                location = Location(latitude=geodfwd[1], longitude=geodfwd[0])
-                time = time + time_to_sail
+            # note measurements made at waypoint
+            self._make_measurements(waypoint)
 
-                self._measurements_to_simulate.ship_underwater_sts.append(
-                    Spacetime(location=location, time=time)
-                )
+            # wait while measurements are being done
+            self._time = self._timeline.departure_times[wp_i]
 
-                self._next_ship_underwater_st_time = (
-                    self._next_ship_underwater_st_time
-                    + self._ship_config.ship_underwater_st_config.period
-                )
+        self._sample_underway(self._time)
+        return ScheduleOk(
+            self._time.item(),
+            self._state(len(self._schedule.waypoints)).measurements_to_simulate,
+        )
 
-        self._time = end_time
-        self._location = location
+    def _sample_underway(self, end_time: np.datetime64) -> None:
+        """
+        Note the samples of all underway instruments until and including the end time.
 
-    def _progress_time_stationary(self, time_passed: timedelta) -> None:
-        end_time = self._time + time_passed
+        The sample times of all instruments are merged so the ship locations are found in a single batch,
+        making the cost grow with the total number of samples rather than with the number of instruments and legs.
 
-        # note all ADCP measurements
-        if self._ship_config.adcp_config is not None:
-            while self._next_adcp_time <= end_time:
-                self._measurements_to_simulate.adcps.append(
-                    Spacetime(self._location, self._next_adcp_time)
-                )
-                self._next_adcp_time = (
-                    self._next_adcp_time + self._ship_config.adcp_config.period
-                )
+        :param end_time: Time of the last possible sample.
+        """
+        sample_times = {
+            name: _sample_times(self._next_underway_times[name], period, end_time)
+            for name, period in self._underway_periods.items()
+        }
+        if len(sample_times) == 0:
+            return
 
-        # note all ship underwater ST measurements
-        if self._ship_config.ship_underwater_st_config is not None:
-            while self._next_ship_underwater_st_time <= end_time:
-                self._measurements_to_simulate.ship_underwater_sts.append(
-                    Spacetime(self._location, self._next_ship_underwater_st_time)
-                )
-                self._next_ship_underwater_st_time = (
-                    self._next_ship_underwater_st_time
-                    + self._ship_config.ship_underwater_st_config.period
+        lons, lats = self._timeline.locations_at(
+            np.concatenate(list(sample_times.values()))
+        )
+        splits = np.cumsum([len(times) for times in sample_times.values()])[:-1]
+        for (name, times), instrument_lons, instrument_lats in zip(
+            sample_times.items(),
+            np.split(lons, splits),
+            np.split(lats, splits),
+            strict=True,
+        ):
+            self._measurements[name].append(
+                SpacetimeArray(lons=instrument_lons, lats=instrument_lats, times=times)
+            )
+            if len(times) > 0:
+                self._next_underway_times[name] = (
+                    times[-1] + self._underway_periods[name]
                 )
 
-        self._time = end_time
-
-    def _make_measurements(self, waypoint: Waypoint) -> timedelta:
-        # if there are no instruments, there is no time cost
+    def _make_measurements(self, waypoint: Waypoint) -> None:
+        # if there are no instruments, nothing is deployed
         if waypoint.instrument is None:
-            return timedelta()
+            return
 
         # make instruments a list even if it's only a single one
         instruments = (
@@ -233,60 +327,55 @@ class _ScheduleSimulator:
             else [waypoint.instrument]
         )
 
-        # time costs of each measurement
-        time_costs = [timedelta()]
-
         for instrument in instruments:
             if instrument is InstrumentType.ARGO_FLOAT:
-                self._measurements_to_simulate.argo_floats.append(
-                    ArgoFloat(
-                        spacetime=Spacetime(self._location, self._time),
-                        min_depth=self._ship_config.argo_float_config.min_depth_meter,
-                        max_depth=self._ship_config.argo_float_config.max_depth_meter,
-                        drift_depth=self._ship_config.argo_float_config.drift_depth_meter,
-                        vertical_speed=self._ship_config.argo_float_config.vertical_speed_meter_per_second,
-                        cycle_days=self._ship_config.argo_float_config.cycle_days,
-                        drift_days=self._ship_config.argo_float_config.drift_days,
-                    )
-                )
+                self._measurements["argo_floats"].append(self._deployment())
             elif instrument is InstrumentType.CTD:
-                self._measurements_to_simulate.ctds.append(
-                    CTD(
-                        spacetime=Spacetime(self._location, self._time),
-                        min_depth=self._ship_config.ctd_config.min_depth_meter,
-                        max_depth=self._ship_config.ctd_config.max_depth_meter,
-                    )
-                )
-                time_costs.append(self._ship_config.ctd_config.stationkeeping_time)
+                self._measurements["ctds"].append(self._deployment())
             elif instrument is InstrumentType.CTD_BGC:
-                self._measurements_to_simulate.ctd_bgcs.append(
-                    CTD_BGC(
-                        spacetime=Spacetime(self._location, self._time),
-                        min_depth=self._ship_config.ctd_bgc_config.min_depth_meter,
-                        max_depth=self._ship_config.ctd_bgc_config.max_depth_meter,
-                    )
-                )
-                time_costs.append(self._ship_config.ctd_bgc_config.stationkeeping_time)
+                self._measurements["ctd_bgcs"].append(self._deployment())
             elif instrument is InstrumentType.DRIFTER:
-                self._measurements_to_simulate.drifters.append(
-                    Drifter(
-                        spacetime=Spacetime(self._location, self._time),
-                        depth=self._ship_config.drifter_config.depth_meter,
-                        lifetime=self._ship_config.drifter_config.lifetime,
-                    )
-                )
+                self._measurements["drifters"].append(self._deployment())
             elif instrument is InstrumentType.XBT:
-                self._measurements_to_simulate.xbts.append(
-                    XBT(
-                        spacetime=Spacetime(self._location, self._time),
-                        min_depth=self._ship_config.xbt_config.min_depth_meter,
-                        max_depth=self._ship_config.xbt_config.max_depth_meter,
-                        fall_speed=self._ship_config.xbt_config.fall_speed_meter_per_second,
-                        deceleration_coefficient=self._ship_config.xbt_config.deceleration_coefficient,
-                    )
-                )
+                self._measurements["xbts"].append(self._deployment())
             else:
                 raise NotImplementedError("Instrument type not supported.")
 
-        # measurements are done in parallel, so return time of longest one
-        return max(time_costs)
+    def _deployment(self) -> SpacetimeArray:
+        """Location and time of an instrument deployed at the current location and time."""
+        return SpacetimeArray(
+            lons=[self._location.lon],
+            lats=[self._location.lat],
+            times=[self._time],
+        )
+
+
+def _underway_periods(ship_config: ShipConfig) -> dict[str, timedelta]:
+    """
+    Get the sampling period of every configured underway instrument.
+
+    An underway instrument is added by giving it a field in MeasurementsToSimulate and a period here.
+
+    :param ship_config: Ship configuration.
+    :returns: Sampling period per field of MeasurementsToSimulate.
+    """
+    periods = {}
+    if ship_config.adcp_config is not None:
+        periods["adcps"] = ship_config.adcp_config.period
+    if ship_config.ship_underwater_st_config is not None:
+        periods["ship_underwater_sts"] = ship_config.ship_underwater_st_config.period
+    return periods
+
+
+def _sample_times(
+    next_time: np.datetime64, period: np.timedelta64, end_time: np.datetime64
+) -> np.ndarray:
+    """
+    Get all sample times of a periodic instrument up to and including an end time.
+
+    :param next_time: Time of the next sample.
+    :param period: Time between samples.
+    :param end_time: Time after which no more samples are taken.
+    :returns: The sample times as datetime64[us], in ascending order. Empty if next_time is after end_time.
+    """
+    return np.arange(next_time, end_time + np.timedelta64(1, "us"), period)
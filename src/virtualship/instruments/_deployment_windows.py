@@ -0,0 +1,28 @@
+"""deployment_windows function."""
+
+import numpy as np
+
+
+def deployment_windows(
+    times: np.ndarray, durations: np.ndarray, endtime: float
+) -> np.ndarray:
+    """
+    Group deployments that are active at the same time, and find until when every group is active.
+
+    In order of deployment time, a deployment joins the group before it if it is deployed before that group has ended.
+    Executing a particle set up to the end of every group in turn lets Parcels skip the time between groups,
+    as every execution starts at the earliest time of the particles left.
+
+    :param times: Deployment times, as seconds since the time origin of the fieldset.
+    :param durations: Time every deployment is expected to be active in seconds, which may be infinite.
+    :param endtime: Time at which the simulation ends, as seconds since the time origin of the fieldset.
+    :returns: End of every group in order of time, capped at `endtime`. The last group always ends at `endtime`,
+              so deployments that are active for longer than expected are still simulated until the end.
+    """
+    order = np.argsort(times, kind="stable")
+    ends = np.maximum.accumulate(times[order] + durations[order])
+    # a group ends where the next deployment is after every deployment so far has ended
+    last_in_group = np.append(times[order][1:] > ends[:-1], True)
+    window_ends = np.minimum(ends[last_in_group], endtime)
+    window_ends[-1] = endtime
+    return window_ends
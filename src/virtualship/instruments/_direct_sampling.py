@@ -0,0 +1,346 @@
+"""sample_fields and sample_fields_at functions."""
+
+import numpy as np
+from parcels import Field, FieldOutOfBoundError, FieldSet, RectilinearZGrid
+
+# interpolation methods that direct sampling reproduces
+_INTERP_METHODS = {"linear", "linear_invdist_land_tracer"}
+
+# maximum number of points sampled at once, which bounds memory use of the interpolation weights and corner values
+_MAX_POINTS = 10_000
+
+
+def sample_fields(
+    fieldset: FieldSet,
+    names: list[str],
+    times: np.ndarray,
+    depths: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Sample fields at every depth below every point, interpolating their gridded data directly instead of executing Parcels.
+
+    Values are interpolated the way Parcels interpolates them, linearly in time and space,
+    leaving out land for `linear_invdist_land_tracer` fields.
+    Interpolation weights are computed once for every point and once for every depth,
+    and shared by all fields on the same grid.
+    Positions are rounded to float32 first, as Parcels particles hold them.
+    Fields that are loaded deferred are loaded time step by time step, as Parcels loads them.
+
+    :param fieldset: The fieldset holding the fields, on rectilinear z-grids.
+    :param names: Names of the fields to sample.
+    :param times: Times of the points, as seconds since the time origin of the fieldset, sorted.
+    :param depths: Depths to sample at. 0 is water surface, negative is into the water.
+    :param lats: Latitudes of the points.
+    :param lons: Longitudes of the points.
+    :returns: Per field, the sampled values as float32 indexed as [depth, point].
+    :raises ValueError: If a field is not on a rectilinear z-grid or is interpolated in a way that is not supported.
+    :raises FieldOutOfBoundError: If a point or depth is outside a field.
+    """
+    return _sample(fieldset, names, times, depths, lats, lons, per_point=False)
+
+
+def sample_fields_at(
+    fieldset: FieldSet,
+    names: list[str],
+    times: np.ndarray,
+    depths: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Sample fields at points that each have their own depth, interpolating their gridded data directly instead of executing Parcels.
+
+    Fields are interpolated as by `sample_fields`.
+
+    :param fieldset: The fieldset holding the fields, on rectilinear z-grids.
+    :param names: Names of the fields to sample.
+    :param times: Times of the points, as seconds since the time origin of the fieldset, in any order.
+    :param depths: Depths of the points. 0 is water surface, negative is into the water.
+    :param lats: Latitudes of the points.
+    :param lons: Longitudes of the points.
+    :returns: Per field, the sampled values as float32 indexed as [point].
+    :raises ValueError: If a field is not on a rectilinear z-grid or is interpolated in a way that is not supported.
+    :raises FieldOutOfBoundError: If a point is outside a field.
+    """
+    # sample in order of time, so deferred fields load every time step once
+    order = np.argsort(times, kind="stable")
+    samples = _sample(
+        fieldset,
+        names,
+        np.asarray(times)[order],
+        np.asarray(depths)[order],
+        np.asarray(lats)[order],
+        np.asarray(lons)[order],
+        per_point=True,
+    )
+    for name, values in samples.items():
+        samples[name] = np.empty_like(values)
+        samples[name][order] = values
+    return samples
+
+
+def _sample(
+    fieldset: FieldSet,
+    names: list[str],
+    times: np.ndarray,
+    depths: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    per_point: bool,
+) -> dict[str, np.ndarray]:
+    """Sample fields at points sorted by time, at every depth or at a depth per point."""
+    fields = [getattr(fieldset, name) for name in names]
+    for field in fields:
+        _check_supported(field)
+
+    depths = np.asarray(depths, dtype=np.float32).astype(np.float64)
+    lats = np.asarray(lats, dtype=np.float32).astype(np.float64)
+    lons = np.asarray(lons, dtype=np.float32).astype(np.float64)
+
+    shape = (len(times),) if per_point else (len(depths), len(times))
+    samples = {name: np.empty(shape, dtype=np.float32) for name in names}
+
+    start = 0
+    while start < len(times):
+        fieldset.computeTimeChunk(times[start], 1)
+        # sample every point up to the last time step loaded for all fields, at least the first point
+        stop = min(_loaded_until(field, times) for field in fields)
+        stop = min(max(stop, start + 1), start + _MAX_POINTS)
+
+        weights = {}
+        for name, field in zip(names, fields, strict=True):
+            if id(field.grid) not in weights:
+                weights[id(field.grid)] = _weights(
+                    field,
+                    times[start:stop],
+                    # depth along the first axis, points along the second
+                    depths[start:stop] if per_point else depths[:, np.newaxis],
+                    lats[start:stop],
+                    lons[start:stop],
+                )
+            samples[name][..., start:stop] = _interpolate(
+                field, *weights[id(field.grid)]
+            )
+
+        start = stop
+
+    return samples
+
+
+def _check_supported(field: Field) -> None:
+    """Check that a field can be sampled directly."""
+    if not isinstance(field.grid, RectilinearZGrid):
+        raise ValueError(
+            f"Field '{field.name}' is not on a rectilinear z-grid, which direct sampling requires."
+        )
+    if field.interp_method not in _INTERP_METHODS:
+        raise ValueError(
+            f"Field '{field.name}' is interpolated with '{field.interp_method}', which direct sampling does not support."
+        )
+    if np.any(np.diff(field.grid.lon) <= 0) or np.any(np.diff(field.grid.lat) <= 0):
+        raise ValueError(
+            f"Field '{field.name}' has longitudes or latitudes that are not increasing, which direct sampling requires."
+        )
+
+
+def _loaded_until(field: Field, times: np.ndarray) -> int:
+    """Get the index of the first time that is after the time steps of a field loaded now, or the number of times if all are loaded."""
+    grid = field.grid
+    if grid.time[-1] >= grid.time_full[-1]:
+        return len(times)
+    return int(np.searchsorted(times, grid.time[-1], side="right"))
+
+
+def _weights(
+    field: Field,
+    times: np.ndarray,
+    depths: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+) -> tuple[np.ndarray, ...]:
+    """
+    Find the cells holding points and depths in the loaded time steps of a field, and where in those cells they are.
+
+    Depths are indexed as [depth, 1] or as [point], and so are their indices and relative positions.
+
+    :returns: Index and relative position in time, depth, latitude and longitude, as Parcels finds them.
+    """
+    grid = field.grid
+    # like Parcels, fields are the same everywhere along axes with a single coordinate, and at every depth if 2D
+    if grid.xdim > 1 and (np.any(lons < grid.lon[0]) or np.any(lons > grid.lon[-1])):
+        raise FieldOutOfBoundError(f"Field '{field.name}' sampled out-of-bound in lon.")
+    if grid.ydim > 1 and (np.any(lats < grid.lat[0]) or np.any(lats > grid.lat[-1])):
+        raise FieldOutOfBoundError(f"Field '{field.name}' sampled out-of-bound in lat.")
+    if grid.zdim > 1 and (
+        np.any(depths < np.min(grid.depth)) or np.any(depths > np.max(grid.depth))
+    ):
+        raise FieldOutOfBoundError(
+            f"Field '{field.name}' sampled out-of-bound in depth."
+        )
+
+    # times outside the loaded time steps take the nearest one, without interpolating
+    ti = np.clip(np.searchsorted(grid.time, times, side="right") - 1, 0, None)
+    interpolate_time = (ti < len(grid.time) - 1) & (times > grid.time[ti])
+    next_ti = np.where(interpolate_time, ti + 1, ti)
+    tau = np.zeros_like(times)
+    np.divide(
+        times - grid.time[ti],
+        grid.time[next_ti] - grid.time[ti],
+        out=tau,
+        where=interpolate_time,
+    )
+
+    if grid.zdim > 1:
+        zi, zeta = _cells(grid.depth, depths)
+    else:
+        zi, zeta = np.zeros(depths.shape, dtype=int), np.zeros_like(depths)
+    yi, eta = _cells(grid.lat, lats)
+    xi, xsi = _cells(grid.lon, lons)
+    return ti, next_ti, tau, interpolate_time, zi, zeta, yi, eta, xi, xsi
+
+
+def _cells(
+    coordinates: np.ndarray, values: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the index of the cell holding every value along an increasing or decreasing axis, and the relative position in it."""
+    if len(coordinates) == 1:
+        return np.zeros(values.shape, dtype=int), np.zeros_like(values)
+    if coordinates[-1] < coordinates[0]:
+        # negative depths decrease downwards
+        index = np.searchsorted(-coordinates, -values) - 1
+    else:
+        index = np.searchsorted(coordinates, values) - 1
+    index = np.clip(index, 0, len(coordinates) - 2)
+    return index, (values - coordinates[index]) / (
+        coordinates[index + 1] - coordinates[index]
+    )
+
+
+def _interpolate(
+    field: Field,
+    ti: np.ndarray,
+    next_ti: np.ndarray,
+    tau: np.ndarray,
+    interpolate_time: np.ndarray,
+    zi: np.ndarray,
+    zeta: np.ndarray,
+    yi: np.ndarray,
+    eta: np.ndarray,
+    xi: np.ndarray,
+    xsi: np.ndarray,
+) -> np.ndarray:
+    """Interpolate a field at every point, given the weights found for its grid, which are either per point or per depth along the first axis."""
+    # read only the block of data around the points, so chunked data is read only where it is sampled
+    t0, z0, y0, x0 = ti.min(), zi.min(), yi.min(), xi.min()
+    times = slice(t0, next_ti.max() + 1)
+    lats, lons = slice(y0, yi.max() + 2), slice(x0, xi.max() + 2)
+    if field.grid.zdim > 1:
+        block = np.asarray(field.data[times, z0 : zi.max() + 2, lats, lons])
+    else:
+        # 2D data has no depth axis, and is the same at every depth
+        block = np.asarray(field.data[times, lats, lons])[:, np.newaxis]
+
+    zi, yi, xi = zi - z0, yi - y0, xi - x0
+
+    levels = 2 if field.grid.zdim > 1 else 1
+    value = _interpolate_space(
+        field.interp_method, block, levels, ti - t0, zi, zeta, yi, eta, xi, xsi
+    )
+    if interpolate_time.any():
+        next_value = _interpolate_space(
+            field.interp_method,
+            block,
+            levels,
+            next_ti - t0,
+            zi,
+            zeta,
+            yi,
+            eta,
+            xi,
+            xsi,
+        )
+        value = np.where(interpolate_time, value + (next_value - value) * tau, value)
+    return value
+
+
+def _interpolate_space(
+    interp_method: str,
+    data: np.ndarray,
+    levels: int,
+    ti: np.ndarray,
+    zi: np.ndarray,
+    zeta: np.ndarray,
+    yi: np.ndarray,
+    eta: np.ndarray,
+    xi: np.ndarray,
+    xsi: np.ndarray,
+) -> np.ndarray:
+    """
+    Interpolate data in space at one time step per point, in the same order of operations as Parcels.
+
+    Indices and relative positions of points are indexed as [point], those of depths as [depth, 1] or also as [point].
+    Between two depth levels data is interpolated in 3D, on a single level in 2D.
+    """
+    # corners of the cells, indexed as [k, j, i] by offset in depth, lat and lon
+    # along an axis with a single coordinate both corners are that coordinate, with the second weighted zero
+    last_y, last_x = data.shape[2] - 1, data.shape[3] - 1
+    corners = [
+        [
+            [
+                data[ti, zi + k, np.minimum(yi + j, last_y), np.minimum(xi + i, last_x)]
+                for i in range(2)
+            ]
+            for j in range(2)
+        ]
+        for k in range(levels)
+    ]
+
+    value, *next_level = (
+        (1 - xsi) * (1 - eta) * corners[k][0][0]
+        + xsi * (1 - eta) * corners[k][0][1]
+        + xsi * eta * corners[k][1][1]
+        + (1 - xsi) * eta * corners[k][1][0]
+        for k in range(levels)
+    )
+    if next_level:
+        value = (1 - zeta) * value + zeta * next_level[0]
+    if interp_method == "linear":
+        return value
+
+    # near land, tracers are weighted by inverse squared distance to the ocean corners only
+    land = [[[np.isclose(c, 0.0) for c in row] for row in plane] for plane in corners]
+    num_land = sum(
+        land[k][j][i] for k in range(levels) for j in range(2) for i in range(2)
+    )
+    near_land = np.zeros_like(value)
+    weight_sum = np.zeros_like(value)
+    on_corner = np.zeros(value.shape, dtype=bool)
+    on_corner_value = np.zeros_like(value)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in range(levels):
+            for j in range(2):
+                for i in range(2):
+                    distance = (eta - j) ** 2 + (xsi - i) ** 2
+                    if levels > 1:
+                        distance = (zeta - k) ** 2 + distance
+                    # the first corner the point is on gives the value, zero if it is land
+                    exact = np.isclose(distance, 0)
+                    on_corner_value = np.where(
+                        exact & ~on_corner,
+                        np.where(land[k][j][i], 0.0, corners[k][j][i]),
+                        on_corner_value,
+                    )
+                    on_corner |= exact
+                    ocean = ~land[k][j][i] & ~exact
+                    near_land = np.where(
+                        ocean, near_land + corners[k][j][i] / distance, near_land
+                    )
+                    weight_sum = np.where(ocean, weight_sum + 1 / distance, weight_sum)
+        near_land = np.where(on_corner, on_corner_value, near_land / weight_sum)
+
+    num_corners = 4 * levels
+    return np.where(
+        num_land == num_corners, 0.0, np.where(num_land > 0, near_land, value)
+    )
@@ -0,0 +1,221 @@
+"""Vertical profiles of casts that do not move horizontally, computed without Parcels."""
+
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+from parcels import FieldSet
+
+from virtualship.models import SpacetimeArray
+
+from ._direct_sampling import sample_fields_at
+from ._sample_file import write_samples
+
+
+def output_step(dt: float, outputdt: timedelta) -> tuple[float, int]:
+    """
+    Find the step Parcels makes with a cast, and every how many steps it writes an observation.
+
+    Parcels shortens steps to end at output times, so casts step by the output interval if it is shorter than `dt`.
+
+    :param dt: Time step of the cast in seconds.
+    :param outputdt: Interval at which observations are written.
+    :returns: The step in seconds, and the number of steps between observations.
+    :raises ValueError: If the output interval is longer than `dt` but not a multiple of it, so steps are irregular.
+    """
+    output_seconds = outputdt / timedelta(seconds=1)
+    if output_seconds <= dt:
+        return output_seconds, 1
+    if output_seconds % dt != 0:
+        raise ValueError(
+            f"Output interval {outputdt} is not a multiple of the time step {dt} s, which profiles without Parcels do not support."
+        )
+    return dt, int(output_seconds // dt)
+
+
+def ctd_cast_depths(
+    min_depth: float, max_depths: np.ndarray, winch_speed: float, step: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the depth of every CTD cast at every step, as the cast kernel lowers and raises it.
+
+    A CTD is lowered at the winch speed until the next step would take it below its maximum depth,
+    and then raised the same way until it is back at its minimum depth.
+
+    :param min_depth: Depth at which every cast starts and ends.
+    :param max_depths: Maximum depth of every cast.
+    :param winch_speed: Lowering and raising speed in m/s.
+    :param step: Time step in seconds.
+    :returns: Depths at the start of every step, and whether the CTD is raising after it, indexed as [cast, step].
+              Depths after the end of a cast are NaN.
+    """
+    # depths are float32 particle variables
+    min_depth = np.float64(np.float32(min_depth))
+    max_depths = np.asarray(max_depths, dtype=np.float32).astype(np.float64)
+    ddepth = np.float64(np.float32(winch_speed)) * step
+    # step at which the cast turns, because lowering further would pass the maximum depth
+    bottom_steps = np.floor((min_depth - max_depths) / ddepth).astype(int)
+
+    steps = np.arange(2 * bottom_steps.max() + 1)
+    # steps away from the start while lowering, back from the bottom while raising
+    from_start = np.minimum(steps, 2 * bottom_steps[:, np.newaxis] - steps)
+    depths = np.where(
+        from_start >= 0, np.float32(min_depth - ddepth * from_start), np.nan
+    )
+    raising = (steps >= bottom_steps[:, np.newaxis]).astype(np.int8)
+    return depths, raising
+
+
+def xbt_cast_depths(
+    min_depth: float,
+    max_depths: np.ndarray,
+    fall_speed: float,
+    deceleration_coefficient: float,
+    step: float,
+    max_steps: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the depth of every XBT cast at every step, as the cast kernel lets it fall.
+
+    The fall speed slows down following the quadratic fall-rate equation, and the XBT stops at its maximum depth.
+    All casts are stepped at once in float32, as the kernel does, so depths are the same as with Parcels.
+
+    :param min_depth: Depth at which every cast starts.
+    :param max_depths: Maximum depth of every cast.
+    :param fall_speed: Initial fall speed in m/s.
+    :param deceleration_coefficient: Deceleration coefficient of the quadratic fall-rate equation.
+    :param step: Time step in seconds.
+    :param max_steps: Number of steps after which to stop casts that have not reached their maximum depth.
+    :returns: Depths at the start of every step, and fall speeds after it, indexed as [cast, step].
+              Both are NaN after the end of a cast.
+    """
+    max_depths = np.asarray(max_depths, dtype=np.float32)
+    depth = np.full(len(max_depths), min_depth, dtype=np.float32)
+    speed = np.full(len(max_depths), fall_speed, dtype=np.float32)
+    deceleration = np.float32(deceleration_coefficient)
+    falling = np.ones(len(max_depths), dtype=bool)
+
+    depths = []
+    fall_speeds = []
+    while np.any(falling) and len(depths) < max_steps:
+        depths.append(np.where(falling, depth, np.nan))
+        ddepth = -speed.astype(np.float64) * step
+        speed = (speed.astype(np.float64) - 2 * np.float64(deceleration) * step).astype(
+            np.float32
+        )
+        fall_speeds.append(np.where(falling, speed, np.nan))
+        # the cast ends at the step that starts at the maximum depth
+        falling &= depth != max_depths
+        ddepth = np.where(depth + ddepth < max_depths, max_depths - depth, ddepth)
+        depth = (depth + ddepth).astype(np.float32)
+    return np.stack(depths, axis=1), np.stack(fall_speeds, axis=1)
+
+
+def max_cast_steps(fieldset: FieldSet, casts: SpacetimeArray, step: float) -> int:
+    """
+    Find the number of steps after which every cast has run past the end of the fieldset.
+
+    :param fieldset: The fieldset the casts are simulated in.
+    :param casts: Locations and times of the casts.
+    :param step: Time step in seconds.
+    :returns: The number of steps.
+    """
+    first_time = fieldset.time_origin.reltime(casts.times).min()
+    return int(np.ceil((fieldset.U.grid.time_full[-1] - first_time) / step)) + 1
+
+
+def check_casts_end(
+    fieldset: FieldSet,
+    casts: SpacetimeArray,
+    depths: np.ndarray,
+    step: float,
+    message: str,
+) -> None:
+    """
+    Verify every cast ends before Parcels would stop simulating, at the end of the fieldset.
+
+    :param fieldset: The fieldset the casts are simulated in.
+    :param casts: Locations and times of the casts.
+    :param depths: Depths of the casts at every step, NaN after their end.
+    :param step: Time step in seconds.
+    :param message: Message of the error.
+    :raises ValueError: If a cast does not end before the end of the fieldset.
+    """
+    num_steps = np.count_nonzero(~np.isnan(depths), axis=1)
+    # the step in which a cast ends must start before the end of the simulation
+    last_times = fieldset.time_origin.reltime(casts.times) + (num_steps - 1) * step
+    if np.any(last_times >= fieldset.U.grid.time_full[-1]):
+        raise ValueError(message)
+
+
+def write_profiles(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    casts: SpacetimeArray,
+    depths: np.ndarray,
+    step: float,
+    every: int,
+    samples: dict[str, str],
+    variables: dict[str, np.ndarray],
+) -> None:
+    """
+    Sample fields along the profiles of casts and write them in the same layout as Parcels would.
+
+    Fields are sampled at the start of every step, at every `every`-th step.
+    Casts are written in order of deployment time, identified by their index in `casts`.
+
+    :param fieldset: The fieldset to sample.
+    :param out_path: The path to write the results to.
+    :param casts: Locations and times of the casts.
+    :param depths: Depths of the casts at the start of every step indexed as [cast, step], NaN after their end.
+    :param step: Time step in seconds.
+    :param every: Number of steps between observations.
+    :param samples: Names of the fields to sample, by name of the variable to write them to.
+    :param variables: Other variables to write indexed as [cast, step], or as [cast, 1] if constant during a cast, by name.
+    """
+    variables = {
+        name: np.broadcast_to(values, depths.shape)
+        for name, values in variables.items()
+    }
+    order = np.argsort(casts.times, kind="stable")
+    depths = depths[order, ::every]
+    cast_steps = np.arange(depths.shape[1]) * step * every
+    times = casts.times[order, np.newaxis] + (cast_steps * 1e6).astype(
+        "timedelta64[us]"
+    )
+    valid = ~np.isnan(depths)
+    lons = np.broadcast_to(casts.lons[order, np.newaxis], depths.shape)
+    lats = np.broadcast_to(casts.lats[order, np.newaxis], depths.shape)
+
+    sampled = sample_fields_at(
+        fieldset,
+        list(samples.values()),
+        times=fieldset.time_origin.reltime(times[valid]),
+        depths=depths[valid],
+        lats=lats[valid],
+        lons=lons[valid],
+    )
+
+    profiles = {}
+    for variable, name in samples.items():
+        profiles[variable] = np.full(depths.shape, np.nan, dtype=np.float32)
+        profiles[variable][valid] = sampled[name]
+    for variable, values in variables.items():
+        values = values[order, ::every]
+        if np.issubdtype(values.dtype, np.integer):
+            profiles[variable] = np.where(valid, values, np.iinfo(values.dtype).max)
+        else:
+            profiles[variable] = np.where(valid, values, np.nan)
+
+    write_samples(
+        out_path,
+        fieldset=fieldset,
+        kernel_name=sample_fields_at.__name__,
+        trajectory=order,
+        times=np.where(valid, times, np.datetime64("NaT")),
+        lons=np.where(valid, lons, np.nan),
+        lats=np.where(valid, lats, np.nan),
+        depths=depths,
+        variables=profiles,
+        append=False,
+    )
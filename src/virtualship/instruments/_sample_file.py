@@ -0,0 +1,133 @@
+"""write_samples function."""
+
+from pathlib import Path
+
+import numpy as np
+import parcels
+import xarray as xr
+from parcels import FieldSet
+
+
+def write_samples(
+    out_path: str | Path,
+    fieldset: FieldSet,
+    kernel_name: str,
+    trajectory: np.ndarray,
+    times: np.ndarray,
+    lons: np.ndarray,
+    lats: np.ndarray,
+    depths: np.ndarray,
+    variables: dict[str, np.ndarray],
+    append: bool,
+) -> None:
+    """
+    Write samples taken without a Parcels particle file, in the same layout as Parcels would write them.
+
+    Samples are indexed as [trajectory, obs]. Every trajectory is a particle that samples at every observation.
+    Observations a particle did not make are NaN, or for integer variables the maximum value of their type, as Parcels fills them.
+
+    :param out_path: The path to write the zarr store to.
+    :param fieldset: The fieldset that was sampled, which gives the time origin and mesh.
+    :param kernel_name: Name of the kernel that sampled, as Parcels names it, or of the function that sampled without Parcels.
+    :param trajectory: Identifier of every trajectory.
+    :param times: Times of the samples as datetime64.
+    :param lons: Longitudes of the samples.
+    :param lats: Latitudes of the samples.
+    :param depths: Depths of the samples.
+    :param variables: Sampled values, by name.
+    :param append: Whether to add the samples as observations after the ones written before, instead of creating the store.
+    """
+    start_obs = xr.open_zarr(out_path).sizes["obs"] if append else 0
+    dims = ["trajectory", "obs"]
+    # Parcels stores time as seconds since the time origin of the fieldset
+    time_origin = np.datetime64(fieldset.time_origin.time_origin, "ns")
+    ds = xr.Dataset(
+        {
+            "time": (
+                dims,
+                (times - time_origin) / np.timedelta64(1, "s"),
+                {
+                    "long_name": "",
+                    "standard_name": "time",
+                    "units": f"seconds since {np.datetime_as_string(time_origin)}",
+                    "axis": "T",
+                    "calendar": "standard",
+                },
+            ),
+            "lon": (
+                dims,
+                lons.astype(np.float32),
+                {
+                    "long_name": "",
+                    "standard_name": "longitude",
+                    "units": "degrees_east",
+                    "axis": "X",
+                },
+            ),
+            "lat": (
+                dims,
+                lats.astype(np.float32),
+                {
+                    "long_name": "",
+                    "standard_name": "latitude",
+                    "units": "degrees_north",
+                    "axis": "Y",
+                },
+            ),
+            "z": (
+                dims,
+                depths.astype(np.float32),
+                {
+                    "long_name": "",
+                    "standard_name": "depth",
+                    "units": "m",
+                    "positive": "down",
+                },
+            ),
+            **{
+                name: (
+                    dims,
+                    values
+                    if np.issubdtype(values.dtype, np.integer)
+                    else values.astype(np.float32),
+                    {"long_name": "", "standard_name": name, "units": "unknown"},
+                )
+                for name, values in variables.items()
+            },
+        },
+        coords={
+            "trajectory": ("trajectory", trajectory.astype(np.int64)),
+            "obs": (
+                "obs",
+                np.arange(start_obs, start_obs + times.shape[1], dtype=np.int32),
+            ),
+        },
+        attrs={
+            "feature_type": "trajectory",
+            "Conventions": "CF-1.6/CF-1.7",
+            "ncei_template_version": "NCEI_NetCDF_Trajectory_Template_v2.0",
+            "parcels_version": parcels.__version__,
+            "parcels_mesh": fieldset.U.grid.mesh,
+            "parcels_kernels": kernel_name,
+        },
+    )
+
+    if append:
+        ds.to_zarr(out_path, append_dim="obs")
+        return
+
+    ds.to_zarr(
+        out_path,
+        mode="w",
+        encoding={
+            name: {"_FillValue": _fill_value(ds[name].dtype), "chunks": ds[name].shape}
+            for name in ds.data_vars
+        },
+    )
+
+
+def _fill_value(dtype: np.dtype) -> float | int:
+    """Get the value Parcels fills observations with that a particle did not make."""
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).max
+    return np.nan
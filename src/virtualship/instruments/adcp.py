@@ -3,9 +3,15 @@
 from pathlib import Path
 
 import numpy as np
-from parcels import FieldSet, ParticleSet, ScipyParticle, Variable
+from parcels import FieldSet, JITParticle, ParticleSet, ScipyParticle, Variable
 
-from virtualship.models import Spacetime
+from virtualship.models import SpacetimeArray
+
+from ._direct_sampling import sample_fields
+from ._sample_file import write_samples
+
+# number of sample points sampled by one particle set in batched mode, which bounds memory use
+_BATCH_SAMPLE_POINTS = 10_000
 
 # we specifically use ScipyParticle because we have many small calls to execute
 # there is some overhead with JITParticle and this ends up being significantly faster
@@ -16,6 +22,15 @@ _ADCPParticle = ScipyParticle.add_variables(
     ]
 )
 
+# in batched mode every particle samples once, in a single execution of compiled code
+_BatchedADCPParticle = JITParticle.add_variables(
+    [
+        Variable("U", dtype=np.float32, initial=np.nan),
+        Variable("V", dtype=np.float32, initial=np.nan),
+        Variable("sampled", dtype=np.int8, initial=0, to_write=False),  # bool
+    ]
+)
+
 
 def _sample_velocity(particle, fieldset, time):
     particle.U, particle.V = fieldset.UV.eval(
@@ -23,27 +38,51 @@ def _sample_velocity(particle, fieldset, time):
     )
 
 
+def _sample_velocity_once(particle, fieldset, time):
+    if particle.sampled == 0:
+        particle.U, particle.V = fieldset.UV.eval(
+            time, particle.depth, particle.lat, particle.lon, applyConversion=False
+        )
+        particle.sampled = 1
+
+
 def simulate_adcp(
     fieldset: FieldSet,
     out_path: str | Path,
     max_depth: float,
     min_depth: float,
     num_bins: int,
-    sample_points: list[Spacetime],
+    sample_points: SpacetimeArray,
+    batched: bool = False,
+    direct: bool = False,
 ) -> None:
     """
     Use Parcels to simulate an ADCP in a fieldset.
 
+    In batched mode, a particle is made for every bin at every sample point, at its own time and place,
+    and all of them sample in one execution of compiled code, writing the same output in far less time.
+    Otherwise one set of particles is moved to every sample point in turn, executing Parcels once per point.
+    With direct sampling, Parcels is not executed at all; the velocity is interpolated from the field data directly, see `sample_fields`.
+
     :param fieldset: The fieldset to simulate the ADCP in.
     :param out_path: The path to write the results to.
     :param max_depth: Maximum depth the ADCP can measure.
     :param min_depth: Minimum depth the ADCP can measure.
     :param num_bins: How many samples to take in the complete range between max_depth and min_depth.
     :param sample_points: The places and times to sample at.
+    :param batched: Whether to sample all points at once, which is much faster. Compiled sampling rounds differently than sampling in Python, so results can differ in the last bit of float32.
+    :param direct: Whether to sample without Parcels, which is faster still. Batched is then ignored. Results can differ in the last bit of float32 as well.
     """
-    sample_points.sort(key=lambda p: p.time)
+    sample_points = sample_points.sorted_by_time()
 
     bins = np.linspace(max_depth, min_depth, num_bins)
+    if direct:
+        _simulate_direct(fieldset, out_path, bins, sample_points)
+        return
+    if batched:
+        _simulate_batched(fieldset, out_path, bins, sample_points)
+        return
+
     num_particles = len(bins)
     particleset = ParticleSet.from_list(
         fieldset=fieldset,
@@ -60,12 +99,15 @@ def simulate_adcp(
     # outputdt set to infinite as we just want to write at the end of every call to 'execute'
     out_file = particleset.ParticleFile(name=out_path, outputdt=np.inf)
 
-    for point in sample_points:
-        particleset.lon_nextloop[:] = point.location.lon
-        particleset.lat_nextloop[:] = point.location.lat
-        particleset.time_nextloop[:] = fieldset.time_origin.reltime(
-            np.datetime64(point.time)
-        )
+    # convert all sample times to fieldset time at once rather than per sample
+    reltimes = fieldset.time_origin.reltime(sample_points.times)
+
+    for lon, lat, reltime in zip(
+        sample_points.lons, sample_points.lats, reltimes, strict=True
+    ):
+        particleset.lon_nextloop[:] = lon
+        particleset.lat_nextloop[:] = lat
+        particleset.time_nextloop[:] = reltime
 
         # perform one step using the particleset
         # dt and runtime are set so exactly one step is made.
@@ -76,3 +118,94 @@ def simulate_adcp(
             verbose_progress=False,
             output_file=out_file,
         )
+
+
+def _simulate_batched(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    bins: np.ndarray,
+    sample_points: SpacetimeArray,
+) -> None:
+    """Sample all bins at all sample points in batches of sample points, each batch in one execution."""
+    # trajectories are the bins, as if one particle per bin moved along the sample points
+    trajectory = np.arange(len(bins))
+
+    for start in range(0, len(sample_points), _BATCH_SAMPLE_POINTS):
+        stop = start + _BATCH_SAMPLE_POINTS
+        batch = SpacetimeArray(
+            lons=sample_points.lons[start:stop],
+            lats=sample_points.lats[start:stop],
+            times=sample_points.times[start:stop],
+        )
+        reltimes = fieldset.time_origin.reltime(batch.times)
+
+        # particles ordered by sample point, then bin
+        particleset = ParticleSet(
+            fieldset=fieldset,
+            pclass=_BatchedADCPParticle,
+            lon=np.repeat(batch.lons, len(bins)),
+            lat=np.repeat(batch.lats, len(bins)),
+            depth=np.tile(bins, len(batch)),
+            time=np.repeat(reltimes, len(bins)),
+        )
+
+        # a single step from the earliest sample time takes every particle past its own time exactly once
+        endtime = reltimes.max() + 1
+        kernel = particleset.Kernel(_sample_velocity_once)
+        particleset.execute(
+            kernel,
+            endtime=endtime,
+            dt=endtime - reltimes.min(),
+            verbose_progress=False,
+        )
+
+        write_samples(
+            out_path,
+            fieldset=fieldset,
+            kernel_name=kernel.name,
+            trajectory=trajectory,
+            times=np.broadcast_to(batch.times, (len(bins), len(batch))),
+            lons=np.broadcast_to(batch.lons, (len(bins), len(batch))),
+            lats=np.broadcast_to(batch.lats, (len(bins), len(batch))),
+            depths=np.broadcast_to(bins[:, np.newaxis], (len(bins), len(batch))),
+            # execution keeps particles in order, so indexing by [bin, sample point] is a transpose
+            variables={
+                name: particleset.particledata.data[name]
+                .reshape(len(batch), len(bins))
+                .T
+                for name in ["U", "V"]
+            },
+            append=start > 0,
+        )
+
+
+def _simulate_direct(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    bins: np.ndarray,
+    sample_points: SpacetimeArray,
+) -> None:
+    """Sample all bins at all sample points by interpolating the field data directly."""
+    samples = sample_fields(
+        fieldset,
+        ["U", "V"],
+        times=fieldset.time_origin.reltime(sample_points.times),
+        depths=bins,
+        lats=sample_points.lats,
+        lons=sample_points.lons,
+    )
+
+    shape = (len(bins), len(sample_points))
+    write_samples(
+        out_path,
+        fieldset=fieldset,
+        kernel_name=sample_fields.__name__,
+        # trajectories are the bins, as if one particle per bin moved along the sample points
+        trajectory=np.arange(len(bins)),
+        times=np.broadcast_to(sample_points.times, shape),
+        lons=np.broadcast_to(sample_points.lons, shape),
+        lats=np.broadcast_to(sample_points.lats, shape),
+        depths=np.broadcast_to(bins[:, np.newaxis], shape),
+        variables=samples,
+        append=False,
+    )
@@ -1,7 +1,7 @@
 """Argo float instrument."""
 
 import math
-from dataclasses import dataclass
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -15,21 +15,7 @@ from parcels import (
     Variable,
 )
 
-from virtualship.models import Spacetime
-
-
-@dataclass
-class ArgoFloat:
-    """Configuration for a single Argo float."""
-
-    spacetime: Spacetime
-    min_depth: float
-    max_depth: float
-    drift_depth: float
-    vertical_speed: float
-    cycle_days: float
-    drift_days: float
-
+from virtualship.models import SpacetimeArray
 
 _ArgoParticle = JITParticle.add_variables(
     [
@@ -118,18 +104,32 @@ def _check_error(particle, fieldset, time):
 def simulate_argo_floats(
     fieldset: FieldSet,
     out_path: str | Path,
-    argo_floats: list[ArgoFloat],
+    argo_floats: SpacetimeArray,
+    min_depth: float,
+    max_depth: float,
+    drift_depth: float,
+    vertical_speed: float,
+    cycle_days: float,
+    drift_days: float,
     outputdt: timedelta,
     endtime: datetime | None,
+    callbacks: list[Callable[[], None]] | None = None,
 ) -> None:
     """
     Use Parcels to simulate a set of Argo floats in a fieldset.
 
     :param fieldset: The fieldset to simulate the Argo floats in.
     :param out_path: The path to write the results to.
-    :param argo_floats: A list of Argo floats to simulate.
+    :param argo_floats: Locations and times of the Argo floats to simulate.
+    :param min_depth: Depth at which every Argo float surfaces.
+    :param max_depth: Depth every Argo float sinks to before profiling.
+    :param drift_depth: Depth at which every Argo float drifts.
+    :param vertical_speed: Sinking speed of every Argo float in m/s (negative).
+    :param cycle_days: Length of a full cycle in days.
+    :param drift_days: Time spent drifting at drift_depth in days.
     :param outputdt: Interval which dictates the update frequency of file output during simulation
     :param endtime: Stop at this time, or if None, continue until the end of the fieldset.
+    :param callbacks: Functions to call after every iteration of the simulation, for example to prefetch input data.
     """
     DT = 10.0  # dt of Argo float simulation integrator
 
@@ -144,16 +144,16 @@ def simulate_argo_floats(
     argo_float_particleset = ParticleSet(
         fieldset=fieldset,
         pclass=_ArgoParticle,
-        lat=[argo.spacetime.location.lat for argo in argo_floats],
-        lon=[argo.spacetime.location.lon for argo in argo_floats],
-        depth=[argo.min_depth for argo in argo_floats],
-        time=[argo.spacetime.time for argo in argo_floats],
-        min_depth=[argo.min_depth for argo in argo_floats],
-        max_depth=[argo.max_depth for argo in argo_floats],
-        drift_depth=[argo.drift_depth for argo in argo_floats],
-        vertical_speed=[argo.vertical_speed for argo in argo_floats],
-        cycle_days=[argo.cycle_days for argo in argo_floats],
-        drift_days=[argo.drift_days for argo in argo_floats],
+        lat=argo_floats.lats,
+        lon=argo_floats.lons,
+        depth=np.full(len(argo_floats), min_depth),
+        time=argo_floats.times,
+        min_depth=np.full(len(argo_floats), min_depth),
+        max_depth=np.full(len(argo_floats), max_depth),
+        drift_depth=np.full(len(argo_floats), drift_depth),
+        vertical_speed=np.full(len(argo_floats), vertical_speed),
+        cycle_days=np.full(len(argo_floats), cycle_days),
+        drift_days=np.full(len(argo_floats), drift_days),
     )
 
     # define output file for the simulation
@@ -183,4 +183,5 @@ def simulate_argo_floats(
         dt=DT,
         output_file=out_file,
         verbose_progress=True,
+        postIterationCallbacks=callbacks,
     )
@@ -1,23 +1,15 @@
 """CTD instrument."""
 
-from dataclasses import dataclass
 from datetime import timedelta
 from pathlib import Path
 
 import numpy as np
 from parcels import FieldSet, JITParticle, ParticleSet, Variable
 
-from virtualship.models import Spacetime
-
-
-@dataclass
-class CTD:
-    """Configuration for a single CTD."""
-
-    spacetime: Spacetime
-    min_depth: float
-    max_depth: float
+from virtualship.models import SpacetimeArray
 
+from ._deployment_windows import deployment_windows
+from ._profiles import check_casts_end, ctd_cast_depths, output_step, write_profiles
 
 _CTDParticle = JITParticle.add_variables(
     [
@@ -56,16 +48,26 @@ def _ctd_cast(particle, fieldset, time):
 def simulate_ctd(
     fieldset: FieldSet,
     out_path: str | Path,
-    ctds: list[CTD],
+    ctds: SpacetimeArray,
+    min_depth: float,
+    max_depth: float,
     outputdt: timedelta,
+    direct: bool = False,
 ) -> None:
     """
     Use Parcels to simulate a set of CTDs in a fieldset.
 
+    With direct sampling, Parcels is not executed; the depths of every cast are computed up front,
+    and salinity and temperature are interpolated from the field data directly, see `sample_fields_at`.
+    Results can differ in the last bit of float32.
+
     :param fieldset: The fieldset to simulate the CTDs in.
     :param out_path: The path to write the results to.
-    :param ctds: A list of CTDs to simulate.
+    :param ctds: Locations and times of the CTDs to simulate.
+    :param min_depth: Depth at which every CTD starts and ends its cast.
+    :param max_depth: Maximum depth every CTD is lowered to.
     :param outputdt: Interval which dictates the update frequency of file output during simulation
+    :param direct: Whether to simulate without Parcels, which is much faster.
     :raises ValueError: Whenever provided CTDs, fieldset, are not compatible with this function.
     """
     WINCH_SPEED = 1.0  # sink and rise speed in m/s
@@ -79,59 +81,108 @@ def simulate_ctd(
         return
 
     fieldset_starttime = fieldset.time_origin.fulltime(fieldset.U.grid.time_full[0])
-    fieldset_endtime = fieldset.time_origin.fulltime(fieldset.U.grid.time_full[-1])
 
     # deploy time for all ctds should be later than fieldset start time
-    if not all(
-        [np.datetime64(ctd.spacetime.time) >= fieldset_starttime for ctd in ctds]
-    ):
+    if not np.all(ctds.times >= fieldset_starttime):
         raise ValueError("CTD deployed before fieldset starts.")
 
     # depth the ctd will go to. shallowest between ctd max depth and bathymetry.
-    max_depths = [
-        max(
-            ctd.max_depth,
-            fieldset.bathymetry.eval(
-                z=0, y=ctd.spacetime.location.lat, x=ctd.spacetime.location.lon, time=0
-            ),
-        )
-        for ctd in ctds
-    ]
+    max_depths = np.maximum(
+        max_depth,
+        [
+            fieldset.bathymetry.eval(z=0, y=lat, x=lon, time=0)
+            for lon, lat in zip(ctds.lons, ctds.lats, strict=True)
+        ],
+    )
 
     # CTD depth can not be too shallow, because kernel would break.
     # This shallow is not useful anyway, no need to support.
-    if not all([max_depth <= -DT * WINCH_SPEED for max_depth in max_depths]):
+    if not np.all(max_depths <= -DT * WINCH_SPEED):
         raise ValueError(
             f"CTD max_depth or bathymetry shallower than maximum {-DT * WINCH_SPEED}"
         )
 
+    if direct:
+        _simulate_direct(
+            fieldset, out_path, ctds, min_depth, max_depths, WINCH_SPEED, DT, outputdt
+        )
+        return
+
     # define parcel particles
     ctd_particleset = ParticleSet(
         fieldset=fieldset,
         pclass=_CTDParticle,
-        lon=[ctd.spacetime.location.lon for ctd in ctds],
-        lat=[ctd.spacetime.location.lat for ctd in ctds],
-        depth=[ctd.min_depth for ctd in ctds],
-        time=[ctd.spacetime.time for ctd in ctds],
+        lon=ctds.lons,
+        lat=ctds.lats,
+        depth=np.full(len(ctds), min_depth),
+        time=ctds.times,
         max_depth=max_depths,
-        min_depth=[ctd.min_depth for ctd in ctds],
-        winch_speed=[WINCH_SPEED for _ in ctds],
+        min_depth=np.full(len(ctds), min_depth),
+        winch_speed=np.full(len(ctds), WINCH_SPEED),
     )
 
     # define output file for the simulation
     out_file = ctd_particleset.ParticleFile(name=out_path, outputdt=outputdt)
 
-    # execute simulation
-    ctd_particleset.execute(
-        [_sample_salinity, _sample_temperature, _ctd_cast],
-        endtime=fieldset_endtime,
-        dt=DT,
-        verbose_progress=False,
-        output_file=out_file,
-    )
+    # build the kernel once, as Parcels compiles a new one for every list of functions it executes
+    kernel = ctd_particleset.Kernel([_sample_salinity, _sample_temperature, _ctd_cast])
+
+    # execute the casts group by group, skipping the time in between in which no cast is active
+    # a cast is lowered and raised at the winch speed
+    durations = 2 * (min_depth - max_depths) / WINCH_SPEED + DT
+    for window_end in deployment_windows(
+        fieldset.time_origin.reltime(ctds.times),
+        durations,
+        fieldset.U.grid.time_full[-1],
+    ):
+        ctd_particleset.execute(
+            kernel,
+            endtime=window_end,
+            dt=DT,
+            verbose_progress=False,
+            output_file=out_file,
+        )
 
     # there should be no particles left, as they delete themselves when they resurface
     if len(ctd_particleset.particledata) != 0:
         raise ValueError(
             "Simulation ended before CTD resurfaced. This most likely means the field time dimension did not match the simulation time span."
         )
+
+
+def _simulate_direct(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    ctds: SpacetimeArray,
+    min_depth: float,
+    max_depths: np.ndarray,
+    winch_speed: float,
+    dt: float,
+    outputdt: timedelta,
+) -> None:
+    """Compute the depths of all casts, and sample along them by interpolating the field data directly."""
+    step, every = output_step(dt, outputdt)
+    depths, raising = ctd_cast_depths(min_depth, max_depths, winch_speed, step)
+    check_casts_end(
+        fieldset,
+        ctds,
+        depths,
+        step,
+        "Simulation ended before CTD resurfaced. This most likely means the field time dimension did not match the simulation time span.",
+    )
+
+    write_profiles(
+        fieldset,
+        out_path,
+        ctds,
+        depths,
+        step,
+        every,
+        samples={"salinity": "S", "temperature": "T"},
+        variables={
+            "raising": raising,
+            "max_depth": np.float32(max_depths)[:, np.newaxis],
+            "min_depth": np.full((len(ctds), 1), min_depth, dtype=np.float32),
+            "winch_speed": np.full((len(ctds), 1), winch_speed, dtype=np.float32),
+        },
+    )
@@ -1,23 +1,15 @@
 """CTD_BGC instrument."""
 
-from dataclasses import dataclass
 from datetime import timedelta
 from pathlib import Path
 
 import numpy as np
 from parcels import FieldSet, JITParticle, ParticleSet, Variable
 
-from virtualship.models import Spacetime
-
-
-@dataclass
-class CTD_BGC:
-    """Configuration for a single BGC CTD."""
-
-    spacetime: Spacetime
-    min_depth: float
-    max_depth: float
+from virtualship.models import SpacetimeArray
 
+from ._deployment_windows import deployment_windows
+from ._profiles import check_casts_end, ctd_cast_depths, output_step, write_profiles
 
 _CTD_BGCParticle = JITParticle.add_variables(
     [
@@ -86,16 +78,26 @@ def _ctd_bgc_cast(particle, fieldset, time):
 def simulate_ctd_bgc(
     fieldset: FieldSet,
     out_path: str | Path,
-    ctd_bgcs: list[CTD_BGC],
+    ctd_bgcs: SpacetimeArray,
+    min_depth: float,
+    max_depth: float,
     outputdt: timedelta,
+    direct: bool = False,
 ) -> None:
     """
     Use Parcels to simulate a set of BGC CTDs in a fieldset.
 
+    With direct sampling, Parcels is not executed; the depths of every cast are computed up front,
+    and the biogeochemical fields are interpolated from the field data directly, see `sample_fields_at`.
+    Results can differ in the last bit of float32.
+
     :param fieldset: The fieldset to simulate the BGC CTDs in.
     :param out_path: The path to write the results to.
-    :param ctds: A list of BGC CTDs to simulate.
+    :param ctd_bgcs: Locations and times of the BGC CTDs to simulate.
+    :param min_depth: Depth at which every BGC CTD starts and ends its cast.
+    :param max_depth: Maximum depth every BGC CTD is lowered to.
     :param outputdt: Interval which dictates the update frequency of file output during simulation
+    :param direct: Whether to simulate without Parcels, which is much faster.
     :raises ValueError: Whenever provided BGC CTDs, fieldset, are not compatible with this function.
     """
     WINCH_SPEED = 1.0  # sink and rise speed in m/s
@@ -109,56 +111,58 @@ def simulate_ctd_bgc(
         return
 
     fieldset_starttime = fieldset.time_origin.fulltime(fieldset.U.grid.time_full[0])
-    fieldset_endtime = fieldset.time_origin.fulltime(fieldset.U.grid.time_full[-1])
 
     # deploy time for all ctds should be later than fieldset start time
-    if not all(
-        [
-            np.datetime64(ctd_bgc.spacetime.time) >= fieldset_starttime
-            for ctd_bgc in ctd_bgcs
-        ]
-    ):
+    if not np.all(ctd_bgcs.times >= fieldset_starttime):
         raise ValueError("BGC CTD deployed before fieldset starts.")
 
     # depth the bgc ctd will go to. shallowest between bgc ctd max depth and bathymetry.
-    max_depths = [
-        max(
-            ctd_bgc.max_depth,
-            fieldset.bathymetry.eval(
-                z=0,
-                y=ctd_bgc.spacetime.location.lat,
-                x=ctd_bgc.spacetime.location.lon,
-                time=0,
-            ),
-        )
-        for ctd_bgc in ctd_bgcs
-    ]
+    max_depths = np.maximum(
+        max_depth,
+        [
+            fieldset.bathymetry.eval(z=0, y=lat, x=lon, time=0)
+            for lon, lat in zip(ctd_bgcs.lons, ctd_bgcs.lats, strict=True)
+        ],
+    )
 
     # CTD depth can not be too shallow, because kernel would break.
     # This shallow is not useful anyway, no need to support.
-    if not all([max_depth <= -DT * WINCH_SPEED for max_depth in max_depths]):
+    if not np.all(max_depths <= -DT * WINCH_SPEED):
         raise ValueError(
             f"BGC CTD max_depth or bathymetry shallower than maximum {-DT * WINCH_SPEED}"
         )
 
+    if direct:
+        _simulate_direct(
+            fieldset,
+            out_path,
+            ctd_bgcs,
+            min_depth,
+            max_depths,
+            WINCH_SPEED,
+            DT,
+            outputdt,
+        )
+        return
+
     # define parcel particles
     ctd_bgc_particleset = ParticleSet(
         fieldset=fieldset,
         pclass=_CTD_BGCParticle,
-        lon=[ctd_bgc.spacetime.location.lon for ctd_bgc in ctd_bgcs],
-        lat=[ctd_bgc.spacetime.location.lat for ctd_bgc in ctd_bgcs],
-        depth=[ctd_bgc.min_depth for ctd_bgc in ctd_bgcs],
-        time=[ctd_bgc.spacetime.time for ctd_bgc in ctd_bgcs],
+        lon=ctd_bgcs.lons,
+        lat=ctd_bgcs.lats,
+        depth=np.full(len(ctd_bgcs), min_depth),
+        time=ctd_bgcs.times,
         max_depth=max_depths,
-        min_depth=[ctd_bgc.min_depth for ctd_bgc in ctd_bgcs],
-        winch_speed=[WINCH_SPEED for _ in ctd_bgcs],
+        min_depth=np.full(len(ctd_bgcs), min_depth),
+        winch_speed=np.full(len(ctd_bgcs), WINCH_SPEED),
     )
 
     # define output file for the simulation
     out_file = ctd_bgc_particleset.ParticleFile(name=out_path, outputdt=outputdt)
 
-    # execute simulation
-    ctd_bgc_particleset.execute(
+    # build the kernel once, as Parcels compiles a new one for every list of functions it executes
+    kernel = ctd_bgc_particleset.Kernel(
         [
             _sample_o2,
             _sample_chlorophyll,
@@ -169,15 +173,68 @@ def simulate_ctd_bgc(
             _sample_zooplankton,
             _sample_primary_production,
             _ctd_bgc_cast,
-        ],
-        endtime=fieldset_endtime,
-        dt=DT,
-        verbose_progress=False,
-        output_file=out_file,
+        ]
     )
 
+    # execute the casts group by group, skipping the time in between in which no cast is active
+    # a cast is lowered and raised at the winch speed
+    durations = 2 * (min_depth - max_depths) / WINCH_SPEED + DT
+    for window_end in deployment_windows(
+        fieldset.time_origin.reltime(ctd_bgcs.times),
+        durations,
+        fieldset.U.grid.time_full[-1],
+    ):
+        ctd_bgc_particleset.execute(
+            kernel,
+            endtime=window_end,
+            dt=DT,
+            verbose_progress=False,
+            output_file=out_file,
+        )
+
     # there should be no particles left, as they delete themselves when they resurface
     if len(ctd_bgc_particleset.particledata) != 0:
         raise ValueError(
             "Simulation ended before BGC CTD resurfaced. This most likely means the field time dimension did not match the simulation time span."
         )
+
+
+def _simulate_direct(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    ctd_bgcs: SpacetimeArray,
+    min_depth: float,
+    max_depths: np.ndarray,
+    winch_speed: float,
+    dt: float,
+    outputdt: timedelta,
+) -> None:
+    """Compute the depths of all casts, and sample along them by interpolating the field data directly."""
+    step, every = output_step(dt, outputdt)
+    depths, raising = ctd_cast_depths(min_depth, max_depths, winch_speed, step)
+    check_casts_end(
+        fieldset,
+        ctd_bgcs,
+        depths,
+        step,
+        "Simulation ended before BGC CTD resurfaced. This most likely means the field time dimension did not match the simulation time span.",
+    )
+
+    write_profiles(
+        fieldset,
+        out_path,
+        ctd_bgcs,
+        depths,
+        step,
+        every,
+        samples={
+            name: name
+            for name in ["o2", "chl", "no3", "po4", "ph", "phyc", "zooc", "nppv"]
+        },
+        variables={
+            "raising": raising,
+            "max_depth": np.float32(max_depths)[:, np.newaxis],
+            "min_depth": np.full((len(ctd_bgcs), 1), min_depth, dtype=np.float32),
+            "winch_speed": np.full((len(ctd_bgcs), 1), winch_speed, dtype=np.float32),
+        },
+    )
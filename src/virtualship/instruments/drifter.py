@@ -1,23 +1,13 @@
 """Drifter instrument."""
 
-from dataclasses import dataclass
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import numpy as np
 from parcels import AdvectionRK4, FieldSet, JITParticle, ParticleSet, Variable
 
-from virtualship.models import Spacetime
-
-
-@dataclass
-class Drifter:
-    """Configuration for a single Drifter."""
-
-    spacetime: Spacetime
-    depth: float  # depth at which it floats and samples
-    lifetime: timedelta | None  # if none, lifetime is infinite
-
+from virtualship.models import SpacetimeArray
 
 _DrifterParticle = JITParticle.add_variables(
     [
@@ -43,20 +33,26 @@ def _check_lifetime(particle, fieldset, time):
 def simulate_drifters(
     fieldset: FieldSet,
     out_path: str | Path,
-    drifters: list[Drifter],
+    drifters: SpacetimeArray,
+    depth: float,
+    lifetime: timedelta | None,
     outputdt: timedelta,
     dt: timedelta,
     endtime: datetime | None = None,
+    callbacks: list[Callable[[], None]] | None = None,
 ) -> None:
     """
     Use Parcels to simulate a set of drifters in a fieldset.
 
     :param fieldset: The fieldset to simulate the Drifters in.
     :param out_path: The path to write the results to.
-    :param drifters: A list of drifters to simulate.
+    :param drifters: Locations and times of the drifters to simulate.
+    :param depth: Depth at which every drifter floats and samples.
+    :param lifetime: Lifetime of every drifter. If None, lifetime is infinite.
     :param outputdt: Interval which dictates the update frequency of file output during simulation.
     :param dt: Dt for integration.
     :param endtime: Stop at this time, or if None, continue until the end of the fieldset or until all drifters ended. If this is earlier than the last drifter ended or later than the end of the fieldset, a warning will be printed.
+    :param callbacks: Functions to call after every iteration of the simulation, for example to prefetch input data.
     """
     if len(drifters) == 0:
         print(
@@ -69,15 +65,14 @@ def simulate_drifters(
     drifter_particleset = ParticleSet(
         fieldset=fieldset,
         pclass=_DrifterParticle,
-        lat=[drifter.spacetime.location.lat for drifter in drifters],
-        lon=[drifter.spacetime.location.lon for drifter in drifters],
-        depth=[drifter.depth for drifter in drifters],
-        time=[drifter.spacetime.time for drifter in drifters],
-        has_lifetime=[1 if drifter.lifetime is not None else 0 for drifter in drifters],
-        lifetime=[
-            0 if drifter.lifetime is None else drifter.lifetime.total_seconds()
-            for drifter in drifters
-        ],
+        lat=drifters.lats,
+        lon=drifters.lons,
+        depth=np.full(len(drifters), depth),
+        time=drifters.times,
+        has_lifetime=np.full(len(drifters), 1 if lifetime is not None else 0),
+        lifetime=np.full(
+            len(drifters), 0 if lifetime is None else lifetime.total_seconds()
+        ),
     )
 
     # define output file for the simulation
@@ -102,12 +97,11 @@ def simulate_drifters(
         dt=dt,
         output_file=out_file,
         verbose_progress=True,
+        postIterationCallbacks=callbacks,
     )
 
     # if there are more particles left than the number of drifters with an indefinite endtime, warn the user
-    if len(drifter_particleset.particledata) > len(
-        [d for d in drifters if d.lifetime is None]
-    ):
+    if lifetime is not None and len(drifter_particleset.particledata) > 0:
         print(
             "WARN: Some drifters had a life time beyond the end time of the fieldset or the requested end time."
         )
@@ -5,7 +5,13 @@ from pathlib import Path
 import numpy as np
 from parcels import FieldSet, ParticleSet, ScipyParticle, Variable
 
-from virtualship.models import Spacetime
+from virtualship.models import SpacetimeArray
+
+from ._direct_sampling import sample_fields
+from ._sample_file import write_samples
+
+DEPTH = -2.0
+"""Depth in meters at which the ship measures salinity and temperature. 0 is water surface, negative is into the water."""
 
 # we specifically use ScipyParticle because we have many small calls to execute
 # there is some overhead with JITParticle and this ends up being significantly faster
@@ -31,17 +37,26 @@ def simulate_ship_underwater_st(
     fieldset: FieldSet,
     out_path: str | Path,
     depth: float,
-    sample_points: list[Spacetime],
+    sample_points: SpacetimeArray,
+    direct: bool = False,
 ) -> None:
     """
     Use Parcels to simulate underway data, measuring salinity and temperature at the given depth along the ship track in a fieldset.
 
+    With direct sampling, Parcels is not executed; salinity and temperature are interpolated from the field data directly,
+    see `sample_fields`. Results can differ in the last bit of float32.
+
     :param fieldset: The fieldset to simulate the sampling in.
     :param out_path: The path to write the results to.
     :param depth: The depth at which to measure. 0 is water surface, negative is into the water.
     :param sample_points: The places and times to sample at.
+    :param direct: Whether to sample without Parcels, which is much faster.
     """
-    sample_points.sort(key=lambda p: p.time)
+    sample_points = sample_points.sorted_by_time()
+
+    if direct:
+        _simulate_direct(fieldset, out_path, depth, sample_points)
+        return
 
     particleset = ParticleSet.from_list(
         fieldset=fieldset,
@@ -58,12 +73,15 @@ def simulate_ship_underwater_st(
 
     # iterate over each point, manually set lat lon time, then
     # execute the particle set for one step, performing one set of measurement
-    for point in sample_points:
-        particleset.lon_nextloop[:] = point.location.lon
-        particleset.lat_nextloop[:] = point.location.lat
-        particleset.time_nextloop[:] = fieldset.time_origin.reltime(
-            np.datetime64(point.time)
-        )
+    # convert all sample times to fieldset time at once rather than per sample
+    reltimes = fieldset.time_origin.reltime(sample_points.times)
+
+    for lon, lat, reltime in zip(
+        sample_points.lons, sample_points.lats, reltimes, strict=True
+    ):
+        particleset.lon_nextloop[:] = lon
+        particleset.lat_nextloop[:] = lat
+        particleset.time_nextloop[:] = reltime
 
         # perform one step using the particleset
         # dt and runtime are set so exactly one step is made.
@@ -74,3 +92,34 @@ def simulate_ship_underwater_st(
             verbose_progress=False,
             output_file=out_file,
         )
+
+
+def _simulate_direct(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    depth: float,
+    sample_points: SpacetimeArray,
+) -> None:
+    """Sample at all sample points by interpolating the field data directly."""
+    samples = sample_fields(
+        fieldset,
+        ["S", "T"],
+        times=fieldset.time_origin.reltime(sample_points.times),
+        depths=np.array([depth]),
+        lats=sample_points.lats,
+        lons=sample_points.lons,
+    )
+
+    # a single trajectory, as if one particle moved along the sample points
+    write_samples(
+        out_path,
+        fieldset=fieldset,
+        kernel_name=sample_fields.__name__,
+        trajectory=np.array([0]),
+        times=sample_points.times[np.newaxis],
+        lons=sample_points.lons[np.newaxis],
+        lats=sample_points.lats[np.newaxis],
+        depths=np.full((1, len(sample_points)), depth),
+        variables=samples,
+        append=False,
+    )
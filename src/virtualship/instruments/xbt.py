@@ -1,25 +1,21 @@
 """XBT instrument."""
 
-from dataclasses import dataclass
 from datetime import timedelta
 from pathlib import Path
 
 import numpy as np
 from parcels import FieldSet, JITParticle, ParticleSet, Variable
 
-from virtualship.models import Spacetime
-
-
-@dataclass
-class XBT:
-    """Configuration for a single XBT."""
-
-    spacetime: Spacetime
-    min_depth: float
-    max_depth: float
-    fall_speed: float
-    deceleration_coefficient: float
+from virtualship.models import SpacetimeArray
 
+from ._deployment_windows import deployment_windows
+from ._profiles import (
+    check_casts_end,
+    max_cast_steps,
+    output_step,
+    write_profiles,
+    xbt_cast_depths,
+)
 
 _XBTParticle = JITParticle.add_variables(
     [
@@ -57,16 +53,30 @@ def _xbt_cast(particle, fieldset, time):
 def simulate_xbt(
     fieldset: FieldSet,
     out_path: str | Path,
-    xbts: list[XBT],
+    xbts: SpacetimeArray,
+    min_depth: float,
+    max_depth: float,
+    fall_speed: float,
+    deceleration_coefficient: float,
     outputdt: timedelta,
+    direct: bool = False,
 ) -> None:
     """
     Use Parcels to simulate a set of XBTs in a fieldset.
 
+    With direct sampling, Parcels is not executed; the depths of every cast are computed up front,
+    and temperature is interpolated from the field data directly, see `sample_fields_at`.
+    Results can differ in the last bit of float32.
+
     :param fieldset: The fieldset to simulate the XBTs in.
     :param out_path: The path to write the results to.
-    :param xbts: A list of XBTs to simulate.
+    :param xbts: Locations and times of the XBTs to simulate.
+    :param min_depth: Depth at which every XBT starts profiling.
+    :param max_depth: Maximum depth every XBT falls to.
+    :param fall_speed: Initial fall speed of every XBT in m/s.
+    :param deceleration_coefficient: Deceleration coefficient of the quadratic fall-rate equation.
     :param outputdt: Interval which dictates the update frequency of file output during simulation
+    :param direct: Whether to simulate without Parcels, which is much faster.
     :raises ValueError: Whenever provided XBTs, fieldset, are not compatible with this function.
     """
     DT = 10.0  # dt of XBT simulation integrator
@@ -79,63 +89,136 @@ def simulate_xbt(
         return
 
     fieldset_starttime = fieldset.time_origin.fulltime(fieldset.U.grid.time_full[0])
-    fieldset_endtime = fieldset.time_origin.fulltime(fieldset.U.grid.time_full[-1])
 
     # deploy time for all xbts should be later than fieldset start time
-    if not all(
-        [np.datetime64(xbt.spacetime.time) >= fieldset_starttime for xbt in xbts]
-    ):
+    if not np.all(xbts.times >= fieldset_starttime):
         raise ValueError("XBT deployed before fieldset starts.")
 
     # depth the xbt will go to. shallowest between xbt max depth and bathymetry.
-    max_depths = [
-        max(
-            xbt.max_depth,
-            fieldset.bathymetry.eval(
-                z=0, y=xbt.spacetime.location.lat, x=xbt.spacetime.location.lon, time=0
-            ),
-        )
-        for xbt in xbts
-    ]
-
-    # initial fall speeds
-    initial_fall_speeds = [xbt.fall_speed for xbt in xbts]
+    max_depths = np.maximum(
+        max_depth,
+        [
+            fieldset.bathymetry.eval(z=0, y=lat, x=lon, time=0)
+            for lon, lat in zip(xbts.lons, xbts.lats, strict=True)
+        ],
+    )
 
     # XBT depth can not be too shallow, because kernel would break.
     # This shallow is not useful anyway, no need to support.
-    for max_depth, fall_speed in zip(max_depths, initial_fall_speeds, strict=False):
-        if not max_depth <= -DT * fall_speed:
-            raise ValueError(
-                f"XBT max_depth or bathymetry shallower than maximum {-DT * fall_speed}"
-            )
+    if not np.all(max_depths <= -DT * fall_speed):
+        raise ValueError(
+            f"XBT max_depth or bathymetry shallower than maximum {-DT * fall_speed}"
+        )
+
+    if direct:
+        _simulate_direct(
+            fieldset,
+            out_path,
+            xbts,
+            min_depth,
+            max_depths,
+            fall_speed,
+            deceleration_coefficient,
+            DT,
+            outputdt,
+        )
+        return
 
     # define xbt particles
     xbt_particleset = ParticleSet(
         fieldset=fieldset,
         pclass=_XBTParticle,
-        lon=[xbt.spacetime.location.lon for xbt in xbts],
-        lat=[xbt.spacetime.location.lat for xbt in xbts],
-        depth=[xbt.min_depth for xbt in xbts],
-        time=[xbt.spacetime.time for xbt in xbts],
+        lon=xbts.lons,
+        lat=xbts.lats,
+        depth=np.full(len(xbts), min_depth),
+        time=xbts.times,
         max_depth=max_depths,
-        min_depth=[xbt.min_depth for xbt in xbts],
-        fall_speed=[xbt.fall_speed for xbt in xbts],
+        min_depth=np.full(len(xbts), min_depth),
+        fall_speed=np.full(len(xbts), fall_speed),
+        deceleration_coefficient=np.full(len(xbts), deceleration_coefficient),
     )
 
     # define output file for the simulation
     out_file = xbt_particleset.ParticleFile(name=out_path, outputdt=outputdt)
 
-    # execute simulation
-    xbt_particleset.execute(
-        [_sample_temperature, _xbt_cast],
-        endtime=fieldset_endtime,
-        dt=DT,
-        verbose_progress=False,
-        output_file=out_file,
+    # build the kernel once, as Parcels compiles a new one for every list of functions it executes
+    kernel = xbt_particleset.Kernel([_sample_temperature, _xbt_cast])
+
+    # execute the casts group by group, skipping the time in between in which no cast is active
+    # an xbt falls following the quadratic fall-rate equation until it reaches its maximum depth,
+    # or never if it stops falling before that
+    fall_depths = min_depth - max_depths
+    discriminant = fall_speed**2 - 4 * deceleration_coefficient * fall_depths
+    durations = np.where(
+        discriminant >= 0,
+        2 * fall_depths / (fall_speed + np.sqrt(np.maximum(discriminant, 0))) + DT,
+        np.inf,
     )
+    for window_end in deployment_windows(
+        fieldset.time_origin.reltime(xbts.times),
+        durations,
+        fieldset.U.grid.time_full[-1],
+    ):
+        xbt_particleset.execute(
+            kernel,
+            endtime=window_end,
+            # Parcels shortens steps to end at output times, and starts writing one step after the start of every execution,
+            # so step by the output interval if that is shorter to also write the start of every cast
+            dt=min(DT, outputdt / timedelta(seconds=1)),
+            verbose_progress=False,
+            output_file=out_file,
+        )
 
     # there should be no particles left, as they delete themselves when they finish profiling
     if len(xbt_particleset.particledata) != 0:
         raise ValueError(
             "Simulation ended before XBT finished profiling. This most likely means the field time dimension did not match the simulation time span."
         )
+
+
+def _simulate_direct(
+    fieldset: FieldSet,
+    out_path: str | Path,
+    xbts: SpacetimeArray,
+    min_depth: float,
+    max_depths: np.ndarray,
+    fall_speed: float,
+    deceleration_coefficient: float,
+    dt: float,
+    outputdt: timedelta,
+) -> None:
+    """Compute the depths of all casts, and sample along them by interpolating the field data directly."""
+    step, every = output_step(dt, outputdt)
+    depths, fall_speeds = xbt_cast_depths(
+        min_depth,
+        max_depths,
+        fall_speed,
+        deceleration_coefficient,
+        step,
+        max_steps=max_cast_steps(fieldset, xbts, step),
+    )
+    check_casts_end(
+        fieldset,
+        xbts,
+        depths,
+        step,
+        "Simulation ended before XBT finished profiling. This most likely means the field time dimension did not match the simulation time span.",
+    )
+
+    write_profiles(
+        fieldset,
+        out_path,
+        xbts,
+        depths,
+        step,
+        every,
+        samples={"temperature": "T"},
+        variables={
+            "max_depth": np.float32(max_depths)[:, np.newaxis],
+            "min_depth": np.full((len(xbts), 1), min_depth, dtype=np.float32),
+            "fall_speed": fall_speeds,
+            "deceleration_coefficient": np.full(
+                (len(xbts), 1), deceleration_coefficient, dtype=np.float32
+            ),
+        },
+    )
@@ -20,7 +20,9 @@ from .space_time_region import (
 )
 from .spacetime import (
     Spacetime,
+    SpacetimeArray,
 )
+from .timeline import Timeline
 
 __all__ = [  # noqa: RUF022
     "Location",
@@ -39,4 +41,6 @@ __all__ = [  # noqa: RUF022
     "TimeRange",
     "SpaceTimeRegion",
     "Spacetime",
+    "SpacetimeArray",
+    "Timeline",
 ]
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import itertools
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pydantic
 import pyproj
 import yaml
@@ -16,11 +17,13 @@ from virtualship.errors import ScheduleError
 from .location import Location
 from .ship_config import InstrumentType
 from .space_time_region import SpaceTimeRegion
+from .timeline import Timeline
 
 if TYPE_CHECKING:
-    from parcels import FieldSet
-
     from virtualship.expedition.input_data import InputData
+    from virtualship.expedition.land_mask import LandMask
+
+    from .ship_config import ShipConfig
 
 projection: pyproj.Geod = pyproj.Geod(ellps="WGS84")
 
@@ -97,11 +100,14 @@ class Schedule(pydantic.BaseModel):
 
     def verify(
         self,
-        ship_speed: float,
+        ship_config: ShipConfig,
         input_data: InputData | None,
         *,
         check_space_time_region: bool = False,
         ignore_missing_fieldsets: bool = False,
+        timeline: Timeline | None = None,
+        land_mask: LandMask | None = None,
+        check_arrival_times: bool = True,
     ) -> None:
         """
         Verify the feasibility and correctness of the schedule's waypoints.
@@ -110,13 +116,16 @@ class Schedule(pydantic.BaseModel):
         1. At least one waypoint is provided.
         2. The first waypoint has a specified time.
         3. Waypoint times are in ascending order.
-        4. All waypoints are in water (not on land).
-        5. The ship can arrive on time at each waypoint given its speed.
+        4. All waypoints are in water (not on land), and the route between them does not cross land.
+        5. The ship can arrive on time at each waypoint given its speed, if `check_arrival_times` is set.
 
-        :param ship_speed: The ship's speed in knots.
-        :param input_data: An InputData object containing fieldsets used to check if waypoints are on water.
+        :param ship_config: The ship configuration, providing ship speed and station-keeping times.
+        :param input_data: An InputData object containing fieldsets used to check if waypoints are on water, if no land mask is given.
         :param check_space_time_region: whether to check for missing space_time_region.
         :param ignore_missing_fieldsets: whether to ignore warning for missing field sets.
+        :param timeline: Timeline of this schedule, if already compiled. Otherwise it is compiled from the ship configuration.
+        :param land_mask: Land mask used to check if waypoints are on water. This does not require loading fieldsets.
+        :param check_arrival_times: Whether to check the ship arrives on time at each waypoint. Leave this to simulating the schedule if that follows, which reports the first late waypoint as a ScheduleProblem.
         :raises PlanningError: If any of the verification checks fail, indicating infeasible or incorrect waypoints.
         :raises NotImplementedError: If an instrument in the schedule is not implemented.
         :return: None. The method doesn't return a value but raises exceptions if verification fails.
@@ -146,91 +155,75 @@ class Schedule(pydantic.BaseModel):
                 f"Waypoint(s) {', '.join(f'#{i + 1}' for i in invalid_i)}: each waypoint should be timed after all previous waypoints",
             )
 
+        if timeline is None:
+            timeline = Timeline.compile(projection, ship_config, self)
+
         # check if all waypoints are in water
-        # this is done by picking an arbitrary provided fieldset and checking if UV is not zero
-
-        # get all available fieldsets
-        available_fieldsets = []
-        if input_data is not None:
-            fieldsets = [
-                input_data.adcp_fieldset,
-                input_data.argo_float_fieldset,
-                input_data.ctd_fieldset,
-                input_data.drifter_fieldset,
-                input_data.ship_underwater_st_fieldset,
-            ]
-            for fs in fieldsets:
-                if fs is not None:
-                    available_fieldsets.append(fs)
-
-        # check if there are any fieldsets, else it's an error
-        if len(available_fieldsets) == 0:
+        # this is done using the land mask if given, else using a land mask built from
+        # an arbitrary provided fieldset, by checking where UV is zero
+        if land_mask is None and input_data is not None:
+            # fieldsets are loaded on access, so stop at the first available one
+            for fieldset_name in [
+                "adcp_fieldset",
+                "argo_float_fieldset",
+                "ctd_fieldset",
+                "drifter_fieldset",
+                "ship_underwater_st_fieldset",
+            ]:
+                fieldset = getattr(input_data, fieldset_name)
+                if fieldset is not None:
+                    from virtualship.expedition.land_mask import LandMask
+
+                    land_mask = LandMask.from_fieldset(fieldset)
+                    break
+
+        # check if there is a land mask, else it's an error
+        if land_mask is None:
             if not ignore_missing_fieldsets:
                 print(
                     "Cannot verify because no fieldsets have been loaded. This is probably "
                     "because you are not using any instruments in your schedule. This is not a problem, "
                     "but carefully check your waypoint locations manually."
                 )
-
         else:
-            # pick any
-            fieldset = available_fieldsets[0]
-            # get waypoints with 0 UV
-            land_waypoints = [
-                (wp_i, wp)
-                for wp_i, wp in enumerate(self.waypoints)
-                if _is_on_land_zero_uv(fieldset, wp)
-            ]
-            # raise an error if there are any
-            if len(land_waypoints) > 0:
-                raise ScheduleError(
-                    f"The following waypoints are on land: {['#' + str(wp_i) + ' ' + str(wp) for (wp_i, wp) in land_waypoints]}"
-                )
+            self.verify_in_water(land_mask, timeline)
 
         # check that ship will arrive on time at each waypoint (in case no unexpected event happen)
-        time = self.waypoints[0].time
-        for wp_i, (wp, wp_next) in enumerate(
-            zip(self.waypoints, self.waypoints[1:], strict=False)
-        ):
-            if wp.instrument is InstrumentType.CTD:
-                time += timedelta(minutes=20)
-
-            geodinv: tuple[float, float, float] = projection.inv(
-                wp.location.lon,
-                wp.location.lat,
-                wp_next.location.lon,
-                wp_next.location.lat,
+        late_i = timeline.first_late_waypoint_i if check_arrival_times else None
+        if late_i is not None:
+            wp = self.waypoints[late_i]
+            raise ScheduleError(
+                f"Waypoint planning is not valid: would arrive too late at waypoint number {late_i + 1}. "
+                f"location: {wp.location} time: {wp.time} instrument: {wp.instrument}"
             )
-            distance = geodinv[2]
-
-            time_to_reach = timedelta(seconds=distance / ship_speed * 3600 / 1852)
-            arrival_time = time + time_to_reach
-
-            if wp_next.time is None:
-                time = arrival_time
-            elif arrival_time > wp_next.time:
-                raise ScheduleError(
-                    f"Waypoint planning is not valid: would arrive too late at waypoint number {wp_i + 2}. "
-                    f"location: {wp_next.location} time: {wp_next.time} instrument: {wp_next.instrument}"
-                )
-            else:
-                time = wp_next.time
 
         print("... All good to go!")
 
+    def verify_in_water(self, land_mask: LandMask, timeline: Timeline) -> None:
+        """
+        Verify all waypoints are in water and the route between them does not cross land.
+
+        :param land_mask: Land mask to check the waypoints and the route against.
+        :param timeline: Timeline of this schedule.
+        :raises ScheduleError: If a waypoint is on land or the route between two waypoints crosses land.
+        """
+        # check all waypoints at once
+        on_land = land_mask.is_on_land(
+            [wp.location.lon for wp in self.waypoints],
+            [wp.location.lat for wp in self.waypoints],
+        )
+        land_waypoints = [
+            (wp_i, self.waypoints[wp_i]) for wp_i in np.flatnonzero(on_land).tolist()
+        ]
+        # raise an error if there are any
+        if len(land_waypoints) > 0:
+            raise ScheduleError(
+                f"The following waypoints are on land: {['#' + str(wp_i) + ' ' + str(wp) for (wp_i, wp) in land_waypoints]}"
+            )
 
-def _is_on_land_zero_uv(fieldset: FieldSet, waypoint: Waypoint) -> bool:
-    """
-    Check if waypoint is on land by assuming zero velocity means land.
-
-    :param fieldset: The fieldset to sample the velocity from.
-    :param waypoint: The waypoint to check.
-    :returns: If the waypoint is on land.
-    """
-    return fieldset.UV.eval(
-        0,
-        fieldset.gridset.grids[0].depth[0],
-        waypoint.location.lat,
-        waypoint.location.lon,
-        applyConversion=False,
-    ) == (0.0, 0.0)
+        # check the ship does not sail across land between waypoints
+        land_legs = land_mask.legs_on_land(timeline)
+        if len(land_legs) > 0:
+            raise ScheduleError(
+                f"The route between the following waypoints crosses land: {['#' + str(leg_i) + ' -> #' + str(leg_i + 1) for leg_i in land_legs]}"
+            )
@@ -1,8 +1,13 @@
-"""Location class. See class description."""
+"""Spacetime and SpacetimeArray classes. See class descriptions."""
 
+from __future__ import annotations
+
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
 
+import numpy as np
+
 from .location import Location
 
 
@@ -12,3 +17,93 @@ class Spacetime:
 
     location: Location
     time: datetime
+
+
+@dataclass
+class SpacetimeArray:
+    """
+    Many locations and times, stored as columns.
+
+    Longitudes and latitudes are stored as float64 arrays, times as a datetime64[us] array.
+    """
+
+    lons: np.ndarray
+    lats: np.ndarray
+    times: np.ndarray
+
+    def __post_init__(self) -> None:
+        """
+        Convert columns to their expected data types and verify they have the same length.
+
+        :raises ValueError: If the columns are not one-dimensional or do not have the same length.
+        """
+        self.lons = np.asarray(self.lons, dtype=np.float64)
+        self.lats = np.asarray(self.lats, dtype=np.float64)
+        self.times = np.asarray(self.times, dtype="datetime64[us]")
+
+        if not self.lons.ndim == self.lats.ndim == self.times.ndim == 1:
+            raise ValueError("Longitudes, latitudes and times must be one-dimensional.")
+        if not len(self.lons) == len(self.lats) == len(self.times):
+            raise ValueError(
+                "Longitudes, latitudes and times must have the same length."
+            )
+
+    def __len__(self) -> int:
+        """
+        Get the number of locations and times.
+
+        :returns: The number of locations and times.
+        """
+        return len(self.times)
+
+    @classmethod
+    def empty(cls) -> SpacetimeArray:
+        """
+        Create an array without any locations and times.
+
+        :returns: The empty array.
+        """
+        return cls(lons=[], lats=[], times=[])
+
+    @classmethod
+    def from_spacetimes(cls, spacetimes: Iterable[Spacetime]) -> SpacetimeArray:
+        """
+        Create an array from individual locations and times.
+
+        :param spacetimes: The locations and times.
+        :returns: The array.
+        """
+        spacetimes = list(spacetimes)
+        return cls(
+            lons=[spacetime.location.lon for spacetime in spacetimes],
+            lats=[spacetime.location.lat for spacetime in spacetimes],
+            times=[np.datetime64(spacetime.time, "us") for spacetime in spacetimes],
+        )
+
+    @classmethod
+    def concatenate(cls, arrays: Iterable[SpacetimeArray]) -> SpacetimeArray:
+        """
+        Join arrays together, in the given order.
+
+        :param arrays: The arrays to join.
+        :returns: The joined array.
+        """
+        arrays = list(arrays)
+        if len(arrays) == 0:
+            return cls.empty()
+        return cls(
+            lons=np.concatenate([array.lons for array in arrays]),
+            lats=np.concatenate([array.lats for array in arrays]),
+            times=np.concatenate([array.times for array in arrays]),
+        )
+
+    def sorted_by_time(self) -> SpacetimeArray:
+        """
+        Get a copy of this array sorted by time. Entries with equal times keep their order.
+
+        :returns: The sorted array.
+        """
+        order = np.argsort(self.times, kind="stable")
+        return SpacetimeArray(
+            lons=self.lons[order], lats=self.lats[order], times=self.times[order]
+        )
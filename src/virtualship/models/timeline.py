@@ -0,0 +1,355 @@
+"""Timeline class. See class description."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pyproj
+
+from virtualship.errors import ScheduleError
+
+from .ship_config import InstrumentType
+
+if TYPE_CHECKING:
+    from .schedule import Schedule, Waypoint
+    from .ship_config import ShipConfig
+
+# change when compiling or storing timelines changes, to recompile stored timelines
+_TIMELINE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Timeline:
+    """
+    When the ship is where while sailing a schedule.
+
+    The ship sails along the geodesic between consecutive waypoints at constant speed.
+    At each waypoint it waits until the waypoint time, if any, and then stays while measurements are done.
+    If the ship arrives at a waypoint later than its time, it starts measuring on arrival, so the delay carries forward to the next waypoints.
+
+    All arrays are read-only. Times are stored as datetime64[us].
+    """
+
+    projection: pyproj.Geod
+    """Projection used for sailing."""
+    ship_speed: float
+    """Ship speed in meter per second."""
+
+    sailing_key: str
+    """Hash of the projection and ship speed the timeline was compiled with."""
+    waypoint_keys: np.ndarray
+    """Hash of every waypoint and the time spent at it, used to find which part of the timeline can be reused."""
+
+    waypoint_lons: np.ndarray
+    waypoint_lats: np.ndarray
+    waypoint_times: np.ndarray
+    """Time of every waypoint as scheduled, NaT if not specified."""
+
+    leg_azimuths: np.ndarray
+    """Azimuth at the start of the leg from every waypoint to the next, in degrees."""
+    leg_distances: np.ndarray
+    """Distance from every waypoint to the next, in meters."""
+
+    arrival_times: np.ndarray
+    """Moment the ship arrives at every waypoint."""
+    start_times: np.ndarray
+    """Moment measurements start at every waypoint, after waiting for the waypoint time."""
+    departure_times: np.ndarray
+    """Moment the ship leaves every waypoint, after measurements are done."""
+
+    def __post_init__(self) -> None:
+        """Make all arrays read-only."""
+        for array in [
+            self.waypoint_keys,
+            self.waypoint_lons,
+            self.waypoint_lats,
+            self.waypoint_times,
+            self.leg_azimuths,
+            self.leg_distances,
+            self.arrival_times,
+            self.start_times,
+            self.departure_times,
+        ]:
+            array.flags.writeable = False
+
+    @classmethod
+    def compile(
+        cls,
+        projection: pyproj.Geod,
+        ship_config: ShipConfig,
+        schedule: Schedule,
+        previous: Timeline | None = None,
+    ) -> Timeline:
+        """
+        Compute the timeline of a schedule.
+
+        Time spent at a waypoint is the longest station-keeping time of its instruments, as configured in the ship configuration.
+        Instruments without a configuration take no time.
+
+        :param projection: The projection to use for sailing.
+        :param ship_config: Ship configuration.
+        :param schedule: The schedule to compute the timeline of.
+        :param previous: A timeline compiled earlier, possibly for another schedule. Legs and times up to the first waypoint that differs are reused from it.
+        :returns: The timeline. This is the previous timeline itself if nothing changed.
+        :raises ScheduleError: If the schedule has no waypoints or the first waypoint has no time.
+        """
+        waypoints = schedule.waypoints
+        if len(waypoints) == 0:
+            raise ScheduleError("At least one waypoint must be provided.")
+        if waypoints[0].time is None:
+            raise ScheduleError("First waypoint must have a specified time.")
+
+        ship_speed = ship_config.ship_speed_knots * 1852 / 3600
+        sailing_key = _hash(f"{projection.initstring} {ship_speed!r}")
+        time_costs = [_time_cost(ship_config, wp) for wp in waypoints]
+        keys = np.array(
+            [
+                _hash(f"{wp.model_dump_json()} {time_cost}")
+                for wp, time_cost in zip(waypoints, time_costs, strict=True)
+            ]
+        )
+
+        # number of waypoints at the start for which the previous timeline still applies
+        reused = 0
+        if previous is not None and previous.sailing_key == sailing_key:
+            reused = _common_prefix_length(previous.waypoint_keys, keys)
+            if reused == len(previous) == len(keys):
+                return previous
+
+        lons = np.array([wp.location.lon for wp in waypoints], dtype=np.float64)
+        lats = np.array([wp.location.lat for wp in waypoints], dtype=np.float64)
+
+        # legs between reused waypoints are reused, the rest is computed
+        first_leg = max(reused - 1, 0)
+        azimuths, _, distances = _batched(
+            projection.inv,
+            lons[first_leg:-1],
+            lats[first_leg:-1],
+            lons[first_leg + 1 :],
+            lats[first_leg + 1 :],
+        )
+        if reused > 0:
+            azimuths = np.concatenate([previous.leg_azimuths[:first_leg], azimuths])
+            distances = np.concatenate([previous.leg_distances[:first_leg], distances])
+
+        arrival_times: list[datetime] = []
+        start_times: list[datetime] = []
+        departure_times: list[datetime] = []
+        if reused > 0:
+            arrival_times = previous.arrival_times[:reused].tolist()
+            start_times = previous.start_times[:reused].tolist()
+            departure_times = previous.departure_times[:reused].tolist()
+        for wp_i in range(reused, len(waypoints)):
+            waypoint = waypoints[wp_i]
+            if wp_i == 0:
+                arrival_time = waypoint.time
+            else:
+                arrival_time = departure_times[-1] + timedelta(
+                    seconds=distances[wp_i - 1].item() / ship_speed
+                )
+            start_time = (
+                arrival_time
+                if waypoint.time is None
+                else max(arrival_time, waypoint.time)
+            )
+            arrival_times.append(arrival_time)
+            start_times.append(start_time)
+            departure_times.append(start_time + time_costs[wp_i])
+
+        return cls(
+            projection=projection,
+            ship_speed=ship_speed,
+            sailing_key=sailing_key,
+            waypoint_keys=keys,
+            waypoint_lons=lons,
+            waypoint_lats=lats,
+            waypoint_times=np.array(
+                [
+                    np.datetime64("NaT")
+                    if wp.time is None
+                    else np.datetime64(wp.time, "us")
+                    for wp in waypoints
+                ],
+                dtype="datetime64[us]",
+            ),
+            leg_azimuths=np.asarray(azimuths, dtype=np.float64),
+            leg_distances=np.asarray(distances, dtype=np.float64),
+            arrival_times=np.array(arrival_times, dtype="datetime64[us]"),
+            start_times=np.array(start_times, dtype="datetime64[us]"),
+            departure_times=np.array(departure_times, dtype="datetime64[us]"),
+        )
+
+    def to_npz(self, file_path: str | Path) -> None:
+        """
+        Write timeline to a numpy npz file.
+
+        :param file_path: Path to the file to write to.
+        """
+        with open(file_path, "wb") as file:
+            np.savez(
+                file,
+                version=_TIMELINE_VERSION,
+                projection=self.projection.initstring,
+                **{
+                    field.name: getattr(self, field.name)
+                    for field in fields(self)
+                    if field.name != "projection"
+                },
+            )
+
+    @classmethod
+    def from_npz(cls, file_path: str | Path) -> Timeline:
+        """
+        Load timeline from a numpy npz file.
+
+        :param file_path: Path to the file to load from.
+        :returns: The timeline.
+        :raises ValueError: If the file was written in another format.
+        """
+        with np.load(file_path) as data:
+            if "version" not in data or data["version"].item() != _TIMELINE_VERSION:
+                raise ValueError(f"Timeline '{file_path}' is stored in another format.")
+            return cls(
+                projection=pyproj.Geod(data["projection"].item()),
+                ship_speed=data["ship_speed"].item(),
+                sailing_key=data["sailing_key"].item(),
+                **{
+                    field.name: data[field.name]
+                    for field in fields(cls)
+                    if field.name not in ["projection", "ship_speed", "sailing_key"]
+                },
+            )
+
+    def __len__(self) -> int:
+        """
+        Get the number of waypoints.
+
+        :returns: The number of waypoints.
+        """
+        return len(self.arrival_times)
+
+    @property
+    def first_late_waypoint_i(self) -> int | None:
+        """Index of the first waypoint the ship arrives at after its time, or None if the ship is on time everywhere."""
+        # comparisons with NaT are always False, so waypoints without a time are never late
+        late = np.flatnonzero(self.arrival_times > self.waypoint_times)
+        return None if len(late) == 0 else late[0].item()
+
+    def leg_points(self, spacing: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample points along the geodesic of every leg, all legs in one batch.
+
+        Every leg is split in equal parts no longer than the spacing and the middle of every part is sampled.
+
+        :param spacing: Maximum length in meters of the parts legs are split in.
+        :returns: Index of the leg, longitude and latitude of every point, where leg i goes from waypoint i to waypoint i + 1.
+        """
+        parts = np.maximum(np.ceil(self.leg_distances / spacing).astype(int), 1)
+        leg_i = np.repeat(np.arange(len(parts)), parts)
+        if len(leg_i) == 0:
+            return leg_i, np.empty(0), np.empty(0)
+
+        part_i = np.arange(len(leg_i)) - np.repeat(np.cumsum(parts) - parts, parts)
+        distances = self.leg_distances[leg_i] * (part_i + 0.5) / parts[leg_i]
+        lons, lats, _ = _batched(
+            self.projection.fwd,
+            self.waypoint_lons[leg_i],
+            self.waypoint_lats[leg_i],
+            self.leg_azimuths[leg_i],
+            distances,
+        )
+        return leg_i, lons, lats
+
+    def locations_at(self, times: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the ship locations at the given times.
+
+        Before the first arrival the ship is at the first waypoint, after the last departure at the last waypoint.
+
+        :param times: Times as datetime64[us].
+        :returns: Longitudes and latitudes of the ship.
+        """
+        times = np.asarray(times, dtype="datetime64[us]")
+
+        # last waypoint arrived at, at or before each time
+        waypoint_i = np.clip(
+            np.searchsorted(self.arrival_times, times, side="right") - 1,
+            0,
+            len(self) - 1,
+        )
+        sailing = (times > self.departure_times[waypoint_i]) & (
+            waypoint_i < len(self) - 1
+        )
+
+        lons = self.waypoint_lons[waypoint_i]
+        lats = self.waypoint_lats[waypoint_i]
+        if np.any(sailing):
+            leg_i = waypoint_i[sailing]
+            distances = self.ship_speed * (
+                (times[sailing] - self.departure_times[leg_i]) / np.timedelta64(1, "s")
+            )
+            lons[sailing], lats[sailing], _ = _batched(
+                self.projection.fwd,
+                lons[sailing],
+                lats[sailing],
+                self.leg_azimuths[leg_i],
+                distances,
+            )
+        return lons, lats
+
+
+def _batched(geodesic, *arrays: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Call a pyproj.Geod method on arrays of points, also if there is only a single point.
+
+    pyproj converts single-element arrays to scalars, which is deprecated in numpy, so a single point is passed as scalars.
+
+    :param geodesic: The method to call, such as pyproj.Geod.fwd or pyproj.Geod.inv.
+    :param arrays: The arguments of the method, as arrays of equal length.
+    :returns: The results of the method, as arrays.
+    """
+    if len(arrays[0]) == 1:
+        return tuple(
+            np.atleast_1d(result) for result in geodesic(*(a.item() for a in arrays))
+        )
+    return tuple(np.asarray(result) for result in geodesic(*arrays))
+
+
+def _time_cost(ship_config: ShipConfig, waypoint: Waypoint) -> timedelta:
+    """Time spent doing measurements at a waypoint. Measurements are done in parallel, so this is the time of the longest one."""
+    if waypoint.instrument is None:
+        return timedelta()
+
+    # make instruments a list even if it's only a single one
+    instruments = (
+        waypoint.instrument
+        if isinstance(waypoint.instrument, list)
+        else [waypoint.instrument]
+    )
+
+    time_costs = [timedelta()]
+    for instrument in instruments:
+        if instrument is InstrumentType.CTD and ship_config.ctd_config is not None:
+            time_costs.append(ship_config.ctd_config.stationkeeping_time)
+        elif (
+            instrument is InstrumentType.CTD_BGC
+            and ship_config.ctd_bgc_config is not None
+        ):
+            time_costs.append(ship_config.ctd_bgc_config.stationkeeping_time)
+    return max(time_costs)
+
+
+def _hash(s: str) -> str:
+    return hashlib.shake_128(s.encode("utf-8")).hexdigest(8)
+
+
+def _common_prefix_length(a: np.ndarray, b: np.ndarray) -> int:
+    """Number of elements at the start of both arrays that are equal."""
+    n = min(len(a), len(b))
+    differ = np.flatnonzero(a[:n] != b[:n])
+    return n if len(differ) == 0 else differ[0].item()
@@ -11,7 +11,9 @@ from typing import TYPE_CHECKING, TextIO
 from yaspin import Spinner
 
 if TYPE_CHECKING:
-    from virtualship.models import Schedule, ShipConfig
+    import pyproj
+
+    from virtualship.models import Schedule, ShipConfig, Timeline
 
 import pandas as pd
 import yaml
@@ -20,6 +22,7 @@ from pydantic import BaseModel
 SCHEDULE = "schedule.yaml"
 SHIP_CONFIG = "ship_config.yaml"
 CHECKPOINT = "checkpoint.yaml"
+TIMELINE = "timeline.npz"
 
 
 def load_static_file(name: str) -> str:
@@ -222,6 +225,36 @@ def _get_ship_config(expedition_dir: Path) -> ShipConfig:
         ) from e
 
 
+def _get_timeline(
+    expedition_dir: Path,
+    projection: pyproj.Geod,
+    ship_config: ShipConfig,
+    schedule: Schedule,
+) -> Timeline:
+    """
+    Compile the timeline of the schedule in `expedition_dir`, reusing the timeline cached there as far as it still applies, and cache the result.
+
+    :param expedition_dir: Directory of the expedition.
+    :param projection: The projection to use for sailing.
+    :param ship_config: Ship configuration.
+    :param schedule: The schedule to compile the timeline of.
+    :returns: The timeline.
+    """
+    from virtualship.models import Timeline
+
+    file_path = expedition_dir.joinpath(TIMELINE)
+    try:
+        cached = Timeline.from_npz(file_path)
+    except (FileNotFoundError, KeyError, ValueError):
+        # no cache, or written by a version of virtualship with another format
+        cached = None
+
+    timeline = Timeline.compile(projection, ship_config, schedule, previous=cached)
+    if timeline is not cached:
+        timeline.to_npz(file_path)
+    return timeline
+
+
 # custom ship spinner
 ship_spinner = Spinner(
     interval=240,
@@ -1,3 +1,4 @@
+import shutil
 from pathlib import Path
 
 import pytest
@@ -12,7 +13,16 @@ def copernicus_subset_no_download(monkeypatch):
     """Mock the download function."""
 
     def fake_download(output_filename, output_directory, **_):
-        Path(output_directory).joinpath(output_filename).touch()
+        if output_filename == "bathymetry.nc":
+            # bathymetry is read to check the route for land, so it must be valid
+            shutil.copyfile(
+                Path(__file__).parent.parent.joinpath(
+                    "expedition/expedition_dir/input_data/bathymetry.nc"
+                ),
+                Path(output_directory).joinpath(output_filename),
+            )
+        else:
+            Path(output_directory).joinpath(output_filename).touch()
 
     monkeypatch.setattr("virtualship.cli._fetch.copernicusmarine.subset", fake_download)
     yield
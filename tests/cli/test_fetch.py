@@ -1,3 +1,4 @@
+import shutil
 from pathlib import Path
 
 import pytest
@@ -16,7 +17,7 @@ from virtualship.cli._fetch import (
     hash_model,
     hash_to_filename,
 )
-from virtualship.models import Schedule, ShipConfig
+from virtualship.models import InstrumentType, Schedule, ShipConfig
 from virtualship.utils import get_example_config, get_example_schedule
 
 
@@ -25,7 +26,16 @@ def copernicus_subset_no_download(monkeypatch):
     """Mock the download function."""
 
     def fake_download(output_filename, output_directory, **_):
-        Path(output_directory).joinpath(output_filename).touch()
+        if output_filename == "bathymetry.nc":
+            # bathymetry is read to check the route for land, so it must be valid
+            shutil.copyfile(
+                Path(__file__).parent.parent.joinpath(
+                    "expedition/expedition_dir/input_data/bathymetry.nc"
+                ),
+                Path(output_directory).joinpath(output_filename),
+            )
+        else:
+            Path(output_directory).joinpath(output_filename).touch()
 
     monkeypatch.setattr("virtualship.cli._fetch.copernicusmarine.subset", fake_download)
     yield
@@ -61,6 +71,27 @@ def test_fetch(schedule, ship_config, tmpdir):
     _fetch(Path(tmpdir), "test", "test")
 
 
+def test_fetch_skips_unused_bathymetry(schedule, ship_config, tmpdir, monkeypatch):
+    """Test bathymetry is not downloaded for a schedule that only deploys drifters."""
+    downloaded = []
+
+    def fake_download(output_filename, output_directory, **_):
+        downloaded.append(output_filename)
+        Path(output_directory).joinpath(output_filename).touch()
+
+    monkeypatch.setattr("virtualship.cli._fetch.copernicusmarine.subset", fake_download)
+    for waypoint in schedule.waypoints:
+        waypoint.instrument = [InstrumentType.DRIFTER]
+    schedule.to_yaml(tmpdir.join("schedule.yaml"))
+    ship_config.adcp_config = None
+    ship_config.ship_underwater_st_config = None
+    ship_config.to_yaml(tmpdir.join("ship_config.yaml"))
+
+    _fetch(Path(tmpdir), "test", "test")
+
+    assert downloaded == ["drifter_uv.nc", "drifter_t.nc"]
+
+
 def test_create_hash():
     assert len(create_hash("correct-length")) == 8
     assert create_hash("same") == create_hash("same")
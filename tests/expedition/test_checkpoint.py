@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyproj
+
+from virtualship.expedition.checkpoint import Checkpoint
+from virtualship.expedition.simulate_schedule import ScheduleProblem, simulate_schedule
+from virtualship.models import InstrumentType, Location, Schedule, ShipConfig, Waypoint
+
+
+def test_checkpoint_schedule_state_roundtrip(tmp_path) -> None:
+    """Test the schedule state survives writing and loading a checkpoint, and is only resumed from for the same ship configuration."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(
+                location=Location(0, 0), time=base_time, instrument=InstrumentType.CTD
+            ),
+            Waypoint(location=Location(1.0, 0), time=base_time + timedelta(hours=1)),
+        ]
+    )
+    problem = simulate_schedule(pyproj.Geod(ellps="WGS84"), ship_config, schedule)
+    assert isinstance(problem, ScheduleProblem)
+
+    file_path = tmp_path / "checkpoint.yaml"
+    Checkpoint(
+        past_schedule=Schedule(waypoints=schedule.waypoints[:1]),
+        schedule_state=problem.resume_state,
+        ship_config_hash="abc",
+    ).to_yaml(file_path)
+    assert file_path.with_suffix(".npz").exists()
+
+    checkpoint = Checkpoint.from_yaml(file_path)
+    state = checkpoint.resume_state("abc")
+    assert state is not None
+    assert state.waypoint_i == 1
+    assert state.time == problem.resume_state.time
+    assert state.location == problem.resume_state.location
+    assert state.next_underway_times == problem.resume_state.next_underway_times
+    np.testing.assert_array_equal(
+        state.measurements_to_simulate.adcps.lons,
+        problem.resume_state.measurements_to_simulate.adcps.lons,
+    )
+    np.testing.assert_array_equal(
+        state.measurements_to_simulate.ctds.times,
+        problem.resume_state.measurements_to_simulate.ctds.times,
+    )
+    assert checkpoint.resume_state("other") is None
+
+    # a checkpoint without state removes the stale state file
+    Checkpoint(past_schedule=Schedule(waypoints=[])).to_yaml(file_path)
+    assert not file_path.with_suffix(".npz").exists()
+    assert Checkpoint.from_yaml(file_path).schedule_state is None
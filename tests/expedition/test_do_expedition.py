@@ -1,13 +1,57 @@
+import shutil
+from datetime import datetime
 from pathlib import Path
 
 from pytest import CaptureFixture
 
 from virtualship.expedition import do_expedition
+from virtualship.expedition.checkpoint import Checkpoint
+from virtualship.models import Schedule
+from virtualship.utils import CHECKPOINT, SCHEDULE
 
 
-def test_do_expedition(capfd: CaptureFixture) -> None:
-    do_expedition("expedition_dir", input_data=Path("expedition_dir/input_data"))
+def _copy_expedition_dir(tmp_path: Path) -> Path:
+    # work on a copy, as the expedition writes its results and caches next to its input
+    expedition_dir = tmp_path / "expedition_dir"
+    shutil.copytree(
+        "expedition_dir", expedition_dir, ignore=shutil.ignore_patterns("results")
+    )
+    return expedition_dir
+
+
+def test_do_expedition(capfd: CaptureFixture, tmp_path: Path) -> None:
+    expedition_dir = _copy_expedition_dir(tmp_path)
+
+    do_expedition(expedition_dir, input_data=expedition_dir / "input_data")
     out, _ = capfd.readouterr()
     assert "Your expedition has concluded successfully!" in out, (
         "Expedition did not complete successfully."
     )
+    assert (expedition_dir / "results").is_dir()
+
+
+def test_do_expedition_resumes(capfd: CaptureFixture, tmp_path: Path) -> None:
+    """Test a late waypoint stores a checkpoint, and the run after fixing the schedule resumes from it."""
+    expedition_dir = _copy_expedition_dir(tmp_path)
+    schedule = Schedule.from_yaml(expedition_dir / SCHEDULE)
+    fixed_time = schedule.waypoints[1].time
+    # the CTD at the first waypoint takes longer than this
+    schedule.waypoints[1].time = datetime(2023, 1, 1, 0, 5)
+    schedule.to_yaml(expedition_dir / SCHEDULE)
+
+    do_expedition(expedition_dir, input_data=expedition_dir / "input_data")
+    out, _ = capfd.readouterr()
+    assert "Waypoint 1 could not be reached in time" in out
+    assert not (expedition_dir / "results").exists()
+    checkpoint = Checkpoint.from_yaml(expedition_dir / CHECKPOINT)
+    assert len(checkpoint.past_schedule.waypoints) == 1
+    assert checkpoint.schedule_state is not None
+    assert len(checkpoint.schedule_state.measurements_to_simulate.ctds) == 1
+
+    schedule.waypoints[1].time = fixed_time
+    schedule.to_yaml(expedition_dir / SCHEDULE)
+
+    do_expedition(expedition_dir, input_data=expedition_dir / "input_data")
+    out, _ = capfd.readouterr()
+    assert "Resuming from the checkpoint at waypoint 1." in out
+    assert "Your expedition has concluded successfully!" in out
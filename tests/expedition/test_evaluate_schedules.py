@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from virtualship.errors import ConfigError, ScheduleError
+from virtualship.expedition import evaluate_schedules
+from virtualship.expedition.simulate_schedule import ScheduleOk, ScheduleProblem
+from virtualship.models import InstrumentType, Location, Schedule, ShipConfig, Waypoint
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_evaluate_schedules(max_workers: int) -> None:
+    """Test every schedule is evaluated and results are returned in input order."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    ship_config_without_ctd = ship_config.model_copy(update={"ctd_config": None})
+
+    feasible = Schedule(
+        waypoints=[
+            Waypoint(
+                location=Location(0, 0), time=base_time, instrument=[InstrumentType.CTD]
+            ),
+            Waypoint(location=Location(0.01, 0), time=base_time + timedelta(days=1)),
+        ]
+    )
+    empty = Schedule(waypoints=[])
+    late = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(1.0, 0), time=base_time + timedelta(minutes=1)),
+        ]
+    )
+
+    results = evaluate_schedules(
+        [
+            (ship_config, feasible),
+            (ship_config, empty),
+            (ship_config_without_ctd, feasible),
+            (ship_config, feasible),
+            (ship_config, late),
+        ],
+        max_workers=max_workers,
+    )
+
+    assert len(results) == 5
+    assert isinstance(results[0], ScheduleOk)
+    assert len(results[0].measurements_to_simulate.ctds) == 1
+    assert isinstance(results[1], ScheduleError)
+    assert isinstance(results[2], ConfigError)
+    assert isinstance(results[3], ScheduleOk)
+    assert not isinstance(results[3], ScheduleProblem)
+    assert isinstance(results[4], ScheduleProblem)
+    assert results[4].failed_waypoint_i == 1
+
+    # the given ship config is not modified by verification
+    assert ship_config.argo_float_config is not None
@@ -0,0 +1,467 @@
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyproj
+import xarray as xr
+
+from virtualship.expedition.do_expedition import _load_input_data
+from virtualship.expedition.input_data import (
+    PREPROCESSED,
+    TIME_STEPS,
+    InputData,
+    _fill_land,
+    _preprocessed,
+    _time_steps,
+)
+from virtualship.instruments import ship_underwater_st
+from virtualship.models import (
+    InstrumentType,
+    Location,
+    Schedule,
+    ShipConfig,
+    Timeline,
+    Waypoint,
+)
+
+
+def test_input_data_loads_on_access(tmp_path) -> None:
+    """Test nothing is read until a fieldset is accessed."""
+    input_data = InputData.load(
+        directory=tmp_path,
+        load_adcp=True,
+        load_argo_float=True,
+        load_ctd=True,
+        load_ctd_bgc=True,
+        load_drifter=True,
+        load_xbt=True,
+        load_ship_underwater_st=True,
+    )
+
+    # the directory is empty, so any actual loading would have failed
+    assert input_data.directory == tmp_path
+    assert "_ship_fieldset" not in vars(input_data)
+
+
+def test_load_input_data_only_for_used_instruments() -> None:
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(
+                location=Location(0, 0),
+                time=datetime(2023, 1, 1),
+                instrument=[InstrumentType.CTD],
+            ),
+        ]
+    )
+
+    input_data = _load_input_data(
+        Path("expedition_dir"),
+        schedule,
+        ship_config,
+        input_data=Path("expedition_dir/input_data"),
+    )
+
+    assert input_data.argo_float_fieldset is None
+    assert input_data.ctd_bgc_fieldset is None
+    assert input_data.drifter_fieldset is None
+    assert input_data.xbt_fieldset is None
+    assert input_data.ctd_fieldset is not None
+    # underway instruments share the fieldset, which is only loaded once
+    assert input_data.adcp_fieldset is input_data.ctd_fieldset
+    # including the ship underwater ST, as the ship fieldset is loaded anyway
+    assert input_data.ship_underwater_st_fieldset is input_data.ctd_fieldset
+
+
+def test_ship_underwater_st_fieldset() -> None:
+    """Test the ship underwater ST fieldset on its own holds only the depth levels around its depth, sampling the same values there."""
+    input_data = InputData.load(
+        directory="expedition_dir/input_data",
+        load_adcp=False,
+        load_argo_float=False,
+        load_ctd=False,
+        load_ctd_bgc=False,
+        load_drifter=False,
+        load_xbt=False,
+        load_ship_underwater_st=True,
+    )
+    st_fieldset = input_data.ship_underwater_st_fieldset
+    assert "ship_uv.nc" not in input_data._filenames()
+
+    ctd_fieldset = InputData.load(
+        directory="expedition_dir/input_data",
+        load_adcp=False,
+        load_argo_float=False,
+        load_ctd=True,
+        load_ctd_bgc=False,
+        load_drifter=False,
+        load_xbt=False,
+        load_ship_underwater_st=False,
+    ).ctd_fieldset
+
+    for name in ["U", "V", "S", "T"]:
+        depths = getattr(st_fieldset, name).grid.depth
+        assert len(depths) == 2
+        assert depths[0] >= ship_underwater_st.DEPTH >= depths[1]
+
+    for name in ["S", "T"]:
+        for time in [0.0, 3600.0]:
+            assert getattr(st_fieldset, name).eval(
+                time, ship_underwater_st.DEPTH, 0, 0
+            ) == getattr(ctd_fieldset, name).eval(time, ship_underwater_st.DEPTH, 0, 0)
+
+
+def test_input_data_shares_fields() -> None:
+    """Test fields from the same file are loaded once for all fieldsets that use them."""
+    input_data = InputData.load(
+        directory="expedition_dir/input_data",
+        load_adcp=False,
+        load_argo_float=False,
+        load_ctd=True,
+        load_ctd_bgc=True,
+        load_drifter=False,
+        load_xbt=False,
+        load_ship_underwater_st=False,
+    )
+
+    ctd_fieldset = input_data.ctd_fieldset
+    ctd_bgc_fieldset = input_data.ctd_bgc_fieldset
+
+    assert ctd_bgc_fieldset.U is ctd_fieldset.U
+    assert ctd_bgc_fieldset.V is ctd_fieldset.V
+    assert ctd_bgc_fieldset.bathymetry is ctd_fieldset.bathymetry
+    # depth of the shared grid is made negative only once
+    assert (ctd_bgc_fieldset.U.grid.depth <= 0).all()
+    assert (ctd_bgc_fieldset.bathymetry.data <= 0).all()
+
+
+def test_input_data_chunksize(tmp_path) -> None:
+    """Test fields are split in chunks no larger than the chunk memory, keeping all depths together."""
+    xr.Dataset(
+        {"uo": (("time", "depth", "latitude", "longitude"), np.zeros((2, 4, 10, 10)))},
+        coords={
+            "time": np.array(["2023-01-01", "2023-01-02"], dtype="datetime64[ns]"),
+            "depth": np.arange(4.0),
+            "latitude": np.arange(10.0),
+            "longitude": np.arange(10.0),
+        },
+    ).to_netcdf(tmp_path / "ship_uv.nc")
+
+    def chunksize(chunk_memory):
+        return InputData.load(
+            directory=tmp_path,
+            load_adcp=True,
+            load_argo_float=False,
+            load_ctd=False,
+            load_ctd_bgc=False,
+            load_drifter=False,
+            load_xbt=False,
+            load_ship_underwater_st=False,
+            chunk_memory=chunk_memory,
+        )._chunksize(tmp_path / "ship_uv.nc")
+
+    assert chunksize(None) is None
+    # 5 by 5 points of 4 depths of float64 fit exactly
+    assert chunksize(5 * 5 * 4 * 8) == {
+        "time": ("time", 1),
+        "depth": ("depth", 4),
+        "lat": ("latitude", 5),
+        "lon": ("longitude", 5),
+    }
+
+
+def test_input_data_crop_indices(tmp_path) -> None:
+    """Test fields are cropped to the track with one grid point to spare, and not at all without a track."""
+    xr.Dataset(
+        {"uo": (("latitude", "longitude"), np.zeros((10, 10)))},
+        coords={"latitude": np.arange(10.0), "longitude": np.arange(10.0)},
+    ).to_netcdf(tmp_path / "ship_uv.nc")
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(2.5, 3.5), time=datetime(2023, 1, 1)),
+            Waypoint(location=Location(4, 5.5)),
+        ]
+    )
+    track = Timeline.compile(pyproj.Geod(ellps="WGS84"), ship_config, schedule)
+
+    def crop_indices(track):
+        return InputData.load(
+            directory=tmp_path,
+            load_adcp=True,
+            load_argo_float=False,
+            load_ctd=False,
+            load_ctd_bgc=False,
+            load_drifter=False,
+            load_xbt=False,
+            load_ship_underwater_st=False,
+            track=track,
+        )._crop_indices(tmp_path / "ship_uv.nc")
+
+    assert crop_indices(None) is None
+    assert crop_indices(track) == {"lat": [2, 3, 4], "lon": [3, 4, 5, 6]}
+
+
+def test_preprocessed_cache(tmp_path) -> None:
+    """Test input files are preprocessed once and again when they change."""
+    source = tmp_path / "ship_uv.nc"
+    target = tmp_path / PREPROCESSED / "ship_uv.nc"
+
+    def write_source(value):
+        xr.Dataset(
+            {"uo": (("depth",), np.full(2, value))},
+            coords={"depth": [0.5, 1.5]},
+        ).to_netcdf(source)
+
+    write_source(1.0)
+    assert _preprocessed(source, target) == target
+    with xr.open_dataset(target) as ds:
+        np.testing.assert_array_equal(ds["depth"], [-0.5, -1.5])
+        np.testing.assert_array_equal(ds["uo"], [1.0, 1.0])
+
+    # unchanged source is not preprocessed again
+    made = target.stat().st_mtime_ns
+    _preprocessed(source, target)
+    assert target.stat().st_mtime_ns == made
+
+    # changed source is
+    write_source(2.0)
+    _preprocessed(source, target)
+    with xr.open_dataset(target) as ds:
+        np.testing.assert_array_equal(ds["uo"], [2.0, 2.0])
+
+
+def test_fill_land() -> None:
+    """Test land is filled from the nearest ocean, and depths without ocean from the depth above."""
+    nan = np.nan
+    data = np.array(
+        [
+            [[1.0, nan, nan], [3.0, 0.0, nan]],
+            [[nan, nan, nan], [nan, nan, nan]],
+        ]
+    )
+
+    filled = _fill_land(data, vertical=True)
+
+    np.testing.assert_array_equal(filled, [[[1.0, 1.0, 1.0], [3.0, 3.0, 3.0]]] * 2)
+    # the input is not changed
+    assert np.isnan(data[1]).all()
+
+
+def test_preprocessed_fill_land(tmp_path) -> None:
+    """Test land is filled in preprocessed copies only when asked, remaking the copy when that changes."""
+    source = tmp_path / "ship_t.nc"
+    target = tmp_path / PREPROCESSED / "ship_t.nc"
+    xr.Dataset(
+        {
+            "thetao": (
+                ("time", "depth", "latitude", "longitude"),
+                np.array([[[[1.0, np.nan]]], [[[np.nan, 2.0]]]]),
+            )
+        },
+        coords={
+            "time": np.array(["2023-01-01", "2023-01-02"], dtype="datetime64[ns]"),
+            "depth": [0.5],
+            "latitude": [0.0],
+            "longitude": [0.0, 1.0],
+        },
+    ).to_netcdf(source)
+
+    _preprocessed(source, target)
+    with xr.open_dataset(target) as ds:
+        assert ds["thetao"].isnull().sum() == 2
+
+    _preprocessed(source, target, fill_land=True)
+    with xr.open_dataset(target) as ds:
+        np.testing.assert_array_equal(
+            ds["thetao"].values, [[[[1.0, 1.0]]], [[[2.0, 2.0]]]]
+        )
+
+
+def test_preprocessed_compact(tmp_path) -> None:
+    """Test compact copies store tracers as packed integers and bathymetry in meters, decoding to float32 within the error bound."""
+    rng = np.random.default_rng(0)
+    thetao = rng.uniform(-2, 30, (2, 3, 4, 4))
+    thetao[:, :, 0, 0] = np.nan
+    thetao[:, :, 1, 1] = 0
+    xr.Dataset(
+        {
+            "thetao": (("time", "depth", "latitude", "longitude"), thetao),
+            "uo": (("time", "depth", "latitude", "longitude"), thetao / 100),
+        },
+        coords={
+            "time": np.array(["2023-01-01", "2023-01-02"], dtype="datetime64[ns]"),
+            "depth": [0.5, 1.5, 2.5],
+            "latitude": np.arange(4.0),
+            "longitude": np.arange(4.0),
+        },
+    ).to_netcdf(tmp_path / "ship_t.nc")
+    xr.Dataset(
+        {"deptho": (("latitude", "longitude"), [[np.nan, 10.4], [1000.6, 5000.0]])},
+        coords={"latitude": np.arange(2.0), "longitude": np.arange(2.0)},
+    ).to_netcdf(tmp_path / "bathymetry.nc")
+
+    target = _preprocessed(
+        tmp_path / "ship_t.nc", tmp_path / PREPROCESSED / "ship_t.nc", compact=True
+    )
+    with xr.open_dataset(target, decode_cf=False) as ds:
+        assert ds["thetao"].dtype == np.int16
+        assert ds["uo"].dtype == np.float32
+    with xr.open_dataset(target) as ds:
+        assert ds["thetao"].dtype == np.float32
+        np.testing.assert_allclose(ds["thetao"], thetao, rtol=0, atol=30 / 65534)
+        assert (ds["thetao"].values[:, :, 1, 1] == 0).all()
+        assert np.isnan(ds["thetao"].values[:, :, 0, 0]).all()
+
+    target = _preprocessed(
+        tmp_path / "bathymetry.nc",
+        tmp_path / PREPROCESSED / "bathymetry.nc",
+        compact=True,
+    )
+    with xr.open_dataset(target, decode_cf=False) as ds:
+        assert ds["deptho"].dtype == np.int16
+    with xr.open_dataset(target) as ds:
+        np.testing.assert_array_equal(ds["deptho"], [[np.nan, 10], [1001, 5000]])
+
+
+def test_input_data_mapped(tmp_path) -> None:
+    """Test mapped fields are memory-mapped with land as zero, and remapped when the input changes."""
+
+    def write_source(value):
+        uo = np.full((2, 4, 10, 10), value)
+        uo[:, :, 0, 0] = np.nan
+        xr.Dataset(
+            {"uo": (("time", "depth", "latitude", "longitude"), uo)},
+            coords={
+                "time": np.array(["2023-01-01", "2023-01-02"], dtype="datetime64[ns]"),
+                "depth": np.arange(4.0),
+                "latitude": np.arange(10.0),
+                "longitude": np.arange(10.0),
+            },
+        ).to_netcdf(tmp_path / "ship_uv.nc")
+
+    def mapped_field():
+        return InputData.load(
+            directory=tmp_path,
+            load_adcp=True,
+            load_argo_float=False,
+            load_ctd=False,
+            load_ctd_bgc=False,
+            load_drifter=False,
+            load_xbt=False,
+            load_ship_underwater_st=False,
+            mapped=True,
+        )._field("U", "ship_uv.nc", "uo")
+
+    write_source(1.0)
+    field = mapped_field()
+    assert isinstance(field.data, np.memmap)
+    assert field.data[:, :, 0, 0].tolist() == [[0.0] * 4] * 2
+    assert (field.data[:, :, 1:, 1:] == 1).all()
+    assert field.grid.depth.tolist() == [0.0, -1.0, -2.0, -3.0]
+
+    write_source(2.0)
+    assert (mapped_field().data[:, :, 1:, 1:] == 2).all()
+
+
+def _write_drifter_input(directory: Path) -> None:
+    times = np.array(
+        ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"], dtype="datetime64[ns]"
+    )
+    coords = {
+        "time": times,
+        "depth": [0.5, 1.5],
+        "latitude": [0.0, 1.0],
+        "longitude": [0.0, 1.0],
+    }
+    dims = ("time", "depth", "latitude", "longitude")
+    values = np.arange(4.0).reshape(4, 1, 1, 1) * np.ones((4, 2, 2, 2))
+    xr.Dataset({"uo": (dims, values), "vo": (dims, -values)}, coords=coords).to_netcdf(
+        directory / "drifter_uv.nc"
+    )
+    xr.Dataset({"thetao": (dims, values + 10)}, coords=coords).to_netcdf(
+        directory / "drifter_t.nc"
+    )
+
+
+def test_time_steps(tmp_path) -> None:
+    """Test input files are split in one file per time step, once."""
+    _write_drifter_input(tmp_path)
+
+    time_steps = _time_steps(tmp_path / "drifter_uv.nc", tmp_path / TIME_STEPS)
+
+    assert [path.name for path in time_steps] == [
+        f"drifter_uv_{time_i:05d}.nc" for time_i in range(4)
+    ]
+    for time_i, path in enumerate(time_steps):
+        with xr.open_dataset(path) as ds:
+            assert ds.sizes["time"] == 1
+            assert (ds["uo"] == time_i).all()
+
+    made = time_steps[0].stat().st_mtime_ns
+    _time_steps(tmp_path / "drifter_uv.nc", tmp_path / TIME_STEPS)
+    assert time_steps[0].stat().st_mtime_ns == made
+
+
+def test_time_step_prefetcher(tmp_path) -> None:
+    """Test the files of the time step after the loaded ones are prefetched, once."""
+    _write_drifter_input(tmp_path)
+    input_data = InputData.load(
+        directory=tmp_path,
+        load_adcp=False,
+        load_argo_float=False,
+        load_ctd=False,
+        load_ctd_bgc=False,
+        load_drifter=True,
+        load_xbt=False,
+        load_ship_underwater_st=False,
+        prefetch=True,
+    )
+    prefetcher = input_data.drifter_prefetcher
+
+    # the first two time steps are loaded
+    prefetcher()
+    assert prefetcher._prefetched_i == 2
+    assert [path.name for path in prefetcher._time_step_files[2]] == [
+        "drifter_uv_00002.nc",
+        "drifter_t_00002.nc",
+    ]
+    thread = prefetcher._thread
+    prefetcher()
+    assert prefetcher._thread is thread
+
+    input_data.drifter_fieldset.computeTimeChunk(86400 * 1.5, 1)
+    prefetcher()
+    assert prefetcher._prefetched_i == 3
+
+    # nothing is left to prefetch
+    input_data.drifter_fieldset.computeTimeChunk(86400 * 2.5, 1)
+    prefetcher()
+    assert prefetcher._prefetched_i == 3
+
+
+def test_input_data_preload() -> None:
+    """Test preloading loads every fieldset, sharing fields as when loading one by one."""
+    input_data = InputData.load(
+        directory="expedition_dir/input_data",
+        load_adcp=True,
+        load_argo_float=True,
+        load_ctd=True,
+        load_ctd_bgc=True,
+        load_drifter=True,
+        load_xbt=True,
+        load_ship_underwater_st=True,
+    )
+
+    input_data.preload()
+
+    for name in [
+        "_ship_fieldset",
+        "argo_float_fieldset",
+        "ctd_bgc_fieldset",
+        "drifter_fieldset",
+    ]:
+        assert name in vars(input_data)
+    assert input_data.ctd_bgc_fieldset.U is input_data.ctd_fieldset.U
+    assert input_data.ctd_bgc_fieldset.bathymetry is input_data.ctd_fieldset.bathymetry
+    assert input_data.ship_underwater_st_fieldset is input_data.ctd_fieldset
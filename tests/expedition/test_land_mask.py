@@ -0,0 +1,113 @@
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from virtualship.errors import ScheduleError
+from virtualship.expedition.land_mask import LAND_MASK, LandMask
+from virtualship.models import Location, Schedule, Timeline, Waypoint
+from virtualship.models.schedule import projection
+from virtualship.utils import _get_ship_config
+
+expedition_dir = Path("expedition_dir")
+
+
+def _land_mask() -> LandMask:
+    # land in the north-east corner only
+    return LandMask(
+        lons=np.array([0.0, 1.0, 2.0]),
+        lats=np.array([0.0, 1.0, 2.0]),
+        is_land=np.array(
+            [
+                [False, False, False],
+                [False, True, True],
+                [False, True, True],
+            ]
+        ),
+    )
+
+
+def test_is_on_land() -> None:
+    """Test locations are only on land if all grid points they are interpolated from are land."""
+    land_mask = _land_mask()
+
+    on_land = land_mask.is_on_land(
+        lons=[1.5, 1.0, 0.5, 1.0, 2.0, 5.0],
+        lats=[1.5, 1.0, 0.5, 0.5, 2.0, 5.0],
+    )
+
+    np.testing.assert_array_equal(on_land, [True, True, False, False, True, False])
+
+
+def test_load_builds_and_stores_land_mask(tmp_path) -> None:
+    shutil.copy(expedition_dir / "input_data" / "bathymetry.nc", tmp_path)
+
+    land_mask = LandMask.load(tmp_path)
+
+    assert (tmp_path / LAND_MASK).exists()
+    assert not land_mask.is_on_land([0.0], [0.0])[0]
+    np.testing.assert_array_equal(LandMask.load(tmp_path).is_land, land_mask.is_land)
+
+
+def test_verify_schedule_land_mask() -> None:
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=datetime(2022, 1, 1, 1, 0, 0)),
+            Waypoint(location=Location(1.5, 1.5), time=datetime(2022, 1, 3, 1, 0, 0)),
+        ]
+    )
+    ship_config = _get_ship_config(expedition_dir)
+
+    with pytest.raises(ScheduleError, match="The following waypoints are on land"):
+        schedule.verify(ship_config, None, land_mask=_land_mask())
+
+
+def test_legs_on_land() -> None:
+    """Test a leg between two waypoints in water is found when it crosses land."""
+    # land in the middle only
+    is_land = np.zeros((4, 4), dtype=bool)
+    is_land[1:3, 1:3] = True
+    land_mask = LandMask(lons=np.arange(4.0), lats=np.arange(4.0), is_land=is_land)
+    ship_config = _get_ship_config(expedition_dir)
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=datetime(2022, 1, 1, 1, 0, 0)),
+            Waypoint(location=Location(1.5, 0)),
+            Waypoint(location=Location(1.5, 3)),
+            Waypoint(location=Location(0, 3)),
+            Waypoint(location=Location(0, 0)),
+        ]
+    )
+    timeline = Timeline.compile(projection, ship_config, schedule)
+
+    assert land_mask.legs_on_land(timeline) == [1]
+
+    with pytest.raises(ScheduleError, match="crosses land"):
+        schedule.verify(ship_config, None, timeline=timeline, land_mask=land_mask)
+
+
+def test_load_rebuilds_outdated_land_mask(tmp_path) -> None:
+    """Test a stored land mask is rebuilt when the bathymetry changes or it was stored in another format."""
+    shutil.copy(expedition_dir / "input_data" / "bathymetry.nc", tmp_path)
+    LandMask(
+        lons=np.array([0.0, 1.0]),
+        lats=np.array([0.0, 1.0]),
+        is_land=np.ones((2, 2), dtype=bool),
+    ).to_npz(tmp_path / LAND_MASK)
+
+    land_mask = LandMask.load(tmp_path)
+
+    assert not land_mask.is_on_land([0.0], [0.0])[0]
+    assert LandMask.load(tmp_path).made_from == land_mask.made_from
+
+    # written without a version by an earlier format
+    np.savez(
+        tmp_path / LAND_MASK,
+        lons=land_mask.lons,
+        lats=land_mask.lats,
+        is_land=np.ones_like(land_mask.is_land),
+    )
+
+    assert not LandMask.load(tmp_path).is_on_land([0.0], [0.0])[0]
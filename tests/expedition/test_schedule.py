@@ -46,7 +46,7 @@ def test_verify_schedule() -> None:
 
     ship_config = _get_ship_config(expedition_dir)
 
-    schedule.verify(ship_config.ship_speed_knots, None)
+    schedule.verify(ship_config, None)
 
 
 def test_get_instruments() -> None:
@@ -154,7 +154,7 @@ def test_verify_schedule_errors(
 
     with pytest.raises(error, match=match):
         schedule.verify(
-            ship_config.ship_speed_knots,
+            ship_config,
             input_data,
             check_space_time_region=check_space_time_region,
         )
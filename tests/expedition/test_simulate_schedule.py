@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 
+import numpy as np
 import pyproj
 
 from virtualship.expedition.simulate_schedule import (
@@ -7,7 +8,7 @@ from virtualship.expedition.simulate_schedule import (
     ScheduleProblem,
     simulate_schedule,
 )
-from virtualship.models import Location, Schedule, ShipConfig, Waypoint
+from virtualship.models import InstrumentType, Location, Schedule, ShipConfig, Waypoint
 
 
 def test_simulate_schedule_feasible() -> None:
@@ -54,3 +55,182 @@ def test_time_in_minutes_in_ship_schedule() -> None:
     assert ship_config.ctd_config.stationkeeping_time == timedelta(minutes=20)
     assert ship_config.ctd_bgc_config.stationkeeping_time == timedelta(minutes=20)
     assert ship_config.ship_underwater_st_config.period == timedelta(minutes=5)
+
+
+def test_simulate_schedule_underway_sample_times() -> None:
+    """Test underway instruments sample periodically over the complete schedule, both while sailing and while stationary."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    projection = pyproj.Geod(ellps="WGS84")
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    ship_config.adcp_config.period = timedelta(minutes=7)
+    ship_config.ship_underwater_st_config.period = timedelta(minutes=3)
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(0.1, 0), time=base_time + timedelta(hours=2)),
+            Waypoint(location=Location(0.2, 0), time=base_time + timedelta(hours=4)),
+        ]
+    )
+
+    result = simulate_schedule(projection, ship_config, schedule)
+
+    assert isinstance(result, ScheduleOk)
+    for samples, period in [
+        (result.measurements_to_simulate.adcps, timedelta(minutes=7)),
+        (result.measurements_to_simulate.ship_underwater_sts, timedelta(minutes=3)),
+    ]:
+        assert samples.times.tolist() == [
+            base_time + i * period for i in range(timedelta(hours=4) // period + 1)
+        ]
+
+
+def test_simulate_schedule_resume() -> None:
+    """Test resuming from the state of a failed simulation gives the same result as simulating the fixed schedule from the start."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    projection = pyproj.Geod(ellps="WGS84")
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    past_waypoints = [
+        Waypoint(
+            location=Location(0, 0), time=base_time, instrument=InstrumentType.CTD
+        ),
+        Waypoint(
+            location=Location(0.1, 0.1),
+            time=base_time + timedelta(hours=2),
+            instrument=[InstrumentType.DRIFTER, InstrumentType.CTD],
+        ),
+    ]
+    infeasible_schedule = Schedule(
+        waypoints=past_waypoints
+        + [Waypoint(location=Location(1.0, 0), time=base_time + timedelta(hours=3))]
+    )
+    fixed_schedule = Schedule(
+        waypoints=past_waypoints
+        + [Waypoint(location=Location(1.0, 0), time=base_time + timedelta(days=1))]
+    )
+
+    problem = simulate_schedule(projection, ship_config, infeasible_schedule)
+    assert isinstance(problem, ScheduleProblem)
+    assert problem.resume_state.waypoint_i == problem.failed_waypoint_i == 2
+
+    resumed = simulate_schedule(
+        projection, ship_config, fixed_schedule, resume_from=problem.resume_state
+    )
+    full = simulate_schedule(projection, ship_config, fixed_schedule)
+
+    assert isinstance(resumed, ScheduleOk)
+    assert isinstance(full, ScheduleOk)
+    assert resumed.time == full.time
+    for name in ["adcps", "ship_underwater_sts", "ctds", "drifters"]:
+        resumed_measurements = getattr(resumed.measurements_to_simulate, name)
+        full_measurements = getattr(full.measurements_to_simulate, name)
+        np.testing.assert_array_equal(resumed_measurements.lons, full_measurements.lons)
+        np.testing.assert_array_equal(resumed_measurements.lats, full_measurements.lats)
+        np.testing.assert_array_equal(
+            resumed_measurements.times, full_measurements.times
+        )
+
+
+class _CountingGeod(pyproj.Geod):
+    """Geod that counts how often positions along geodesics are computed."""
+
+    fwd_calls: int = 0
+
+    def fwd(self, *args, **kwargs):
+        self.fwd_calls += 1
+        return super().fwd(*args, **kwargs)
+
+
+def test_simulate_schedule_underway_locations_batched() -> None:
+    """Test underway sample locations of all legs are computed in one batch, on the geodesic from the waypoint the ship left."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    projection = _CountingGeod(ellps="WGS84")
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(0.1, 0.1), time=base_time + timedelta(hours=3)),
+            Waypoint(location=Location(0.2, 0), time=base_time + timedelta(hours=6)),
+        ]
+    )
+
+    result = simulate_schedule(projection, ship_config, schedule)
+
+    assert isinstance(result, ScheduleOk)
+    assert projection.fwd_calls == 1
+
+    adcps = result.measurements_to_simulate.adcps
+    ship_speed = ship_config.ship_speed_knots * 1852 / 3600
+    azimuth, _, distance = projection.inv(0, 0, 0.1, 0.1)
+    leg_duration = timedelta(seconds=distance / ship_speed)
+    sailing = adcps.times < base_time + leg_duration
+    expected_lons, expected_lats, _ = projection.fwd(
+        np.zeros(np.count_nonzero(sailing)),
+        np.zeros(np.count_nonzero(sailing)),
+        np.full(np.count_nonzero(sailing), azimuth),
+        ship_speed
+        * ((adcps.times[sailing] - np.datetime64(base_time)) / np.timedelta64(1, "s")),
+    )
+    np.testing.assert_array_equal(adcps.lons[sailing], expected_lons)
+    np.testing.assert_array_equal(adcps.lats[sailing], expected_lats)
+
+
+def test_simulate_schedule_ship_track() -> None:
+    """Test the ship sails the geodesic between waypoints and reaches every waypoint, so it is there while waiting and deploying."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    projection = pyproj.Geod(ellps="WGS84")
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(
+                location=Location(0.1, 0.1),
+                time=base_time + timedelta(hours=2),
+                instrument=InstrumentType.CTD,
+            ),
+            Waypoint(location=Location(0.2, 0.1), time=base_time + timedelta(hours=5)),
+        ]
+    )
+
+    result = simulate_schedule(projection, ship_config, schedule)
+
+    assert isinstance(result, ScheduleOk)
+    measurements = result.measurements_to_simulate
+    assert measurements.ctds.lons.tolist() == [0.1]
+    assert measurements.ctds.lats.tolist() == [0.1]
+    assert measurements.ctds.times.tolist() == [base_time + timedelta(hours=2)]
+
+    ship_speed = ship_config.ship_speed_knots * 1852 / 3600
+    departure = np.datetime64(
+        base_time + timedelta(hours=2) + ship_config.ctd_config.stationkeeping_time
+    )
+    for samples in [measurements.adcps, measurements.ship_underwater_sts]:
+        # waiting and measuring at the second waypoint
+        at_waypoint = (
+            samples.times >= np.datetime64(base_time + timedelta(hours=1))
+        ) & (samples.times <= departure)
+        assert np.all(samples.lons[at_waypoint] == 0.1)
+        assert np.all(samples.lats[at_waypoint] == 0.1)
+
+        # sailing the last leg, from the second waypoint itself
+        azimuth, _, distance = projection.inv(0.1, 0.1, 0.1, 0.2)
+        arrival = departure + np.timedelta64(int(distance / ship_speed * 1e6), "us")
+        sailing = (samples.times > departure) & (samples.times < arrival)
+        sailed = ship_speed * (
+            (samples.times[sailing] - departure) / np.timedelta64(1, "s")
+        )
+        expected_lons, expected_lats, _ = projection.fwd(
+            np.full(len(sailed), 0.1),
+            np.full(len(sailed), 0.1),
+            np.full(len(sailed), azimuth),
+            sailed,
+        )
+        np.testing.assert_array_equal(samples.lons[sailing], expected_lons)
+        np.testing.assert_array_equal(samples.lats[sailing], expected_lats)
+
+        # reached the last waypoint
+        assert np.all(samples.lons[samples.times > arrival] == 0.1)
+        assert np.all(samples.lats[samples.times > arrival] == 0.2)
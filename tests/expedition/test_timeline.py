@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyproj
+import pytest
+
+from virtualship.errors import ScheduleError
+from virtualship.models import (
+    InstrumentType,
+    Location,
+    Schedule,
+    ShipConfig,
+    Timeline,
+    Waypoint,
+)
+
+projection = pyproj.Geod(ellps="WGS84")
+
+
+def test_timeline_times() -> None:
+    """Test arrival, start and departure times account for sailing, waiting and station-keeping."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    ship_config.ctd_config.stationkeeping_time = timedelta(minutes=30)
+    ship_config.ctd_bgc_config.stationkeeping_time = timedelta(minutes=45)
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(
+                location=Location(0, 0),
+                time=base_time,
+                instrument=[InstrumentType.CTD, InstrumentType.CTD_BGC],
+            ),
+            Waypoint(location=Location(0, 1), instrument=[InstrumentType.DRIFTER]),
+            Waypoint(location=Location(0, 2), time=base_time + timedelta(days=2)),
+        ]
+    )
+
+    timeline = Timeline.compile(projection, ship_config, schedule)
+
+    leg_duration = timedelta(
+        seconds=projection.inv(0, 0, 1, 0)[2]
+        / (ship_config.ship_speed_knots * 1852 / 3600)
+    )
+    assert len(timeline) == 3
+    assert timeline.arrival_times.tolist() == [
+        base_time,
+        base_time + timedelta(minutes=45) + leg_duration,
+        base_time + timedelta(minutes=45) + 2 * leg_duration,
+    ]
+    assert timeline.start_times.tolist() == [
+        base_time,
+        base_time + timedelta(minutes=45) + leg_duration,
+        base_time + timedelta(days=2),
+    ]
+    assert timeline.departure_times.tolist() == [
+        base_time + timedelta(minutes=45),
+        base_time + timedelta(minutes=45) + leg_duration,
+        base_time + timedelta(days=2),
+    ]
+    assert timeline.first_late_waypoint_i is None
+    assert not timeline.arrival_times.flags.writeable
+
+
+def test_timeline_late_waypoint() -> None:
+    """Test a waypoint that cannot be reached in time is found."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(0, 1), time=base_time + timedelta(days=1)),
+            Waypoint(location=Location(0, 2), time=base_time + timedelta(days=1)),
+        ]
+    )
+
+    timeline = Timeline.compile(projection, ship_config, schedule)
+
+    assert timeline.first_late_waypoint_i == 2
+
+
+def test_timeline_locations_at() -> None:
+    """Test the ship follows the geodesic between waypoints and stays at waypoints while waiting."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(10, 0), time=base_time),
+            Waypoint(location=Location(20, 10), time=base_time + timedelta(days=10)),
+        ]
+    )
+
+    timeline = Timeline.compile(projection, ship_config, schedule)
+
+    halfway = (
+        timeline.departure_times[0]
+        + (timeline.arrival_times[1] - timeline.departure_times[0]) / 2
+    )
+    lons, lats = timeline.locations_at(
+        np.array(
+            [
+                timeline.departure_times[0],
+                halfway,
+                timeline.arrival_times[1],
+                timeline.arrival_times[1] + np.timedelta64(1, "D"),
+            ]
+        )
+    )
+
+    (mid_lon, mid_lat), *_ = projection.npts(0, 10, 10, 20, 1)
+    np.testing.assert_allclose(lons, [0, mid_lon, 10, 10], atol=1e-6)
+    np.testing.assert_allclose(lats, [10, mid_lat, 20, 20], atol=1e-6)
+
+
+def test_timeline_leg_points() -> None:
+    """Test legs are sampled in the middle of equal parts no longer than the spacing."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(0, 1)),
+            Waypoint(location=Location(0, 1)),
+        ]
+    )
+    timeline = Timeline.compile(projection, ship_config, schedule)
+
+    leg_i, lons, lats = timeline.leg_points(timeline.leg_distances[0] / 3)
+
+    assert leg_i.tolist() == [0, 0, 0, 1]
+    np.testing.assert_allclose(lons, [1 / 6, 1 / 2, 5 / 6, 1], atol=1e-6)
+    np.testing.assert_allclose(lats, 0, atol=1e-6)
+
+
+def test_timeline_requires_first_waypoint_time() -> None:
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(waypoints=[Waypoint(location=Location(0, 0))])
+
+    with pytest.raises(
+        ScheduleError, match="First waypoint must have a specified time"
+    ):
+        Timeline.compile(projection, ship_config, schedule)
+
+
+def test_timeline_reuses_previous() -> None:
+    """Test compiling against a previous timeline reuses the unchanged start and gives the same result as compiling from scratch."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    waypoints = [
+        Waypoint(location=Location(0, 0), time=base_time),
+        Waypoint(location=Location(0, 1), instrument=[InstrumentType.CTD]),
+        Waypoint(location=Location(0, 2), time=base_time + timedelta(days=3)),
+    ]
+    previous = Timeline.compile(projection, ship_config, Schedule(waypoints=waypoints))
+
+    assert (
+        Timeline.compile(
+            projection, ship_config, Schedule(waypoints=waypoints), previous=previous
+        )
+        is previous
+    )
+
+    changed = Schedule(
+        waypoints=waypoints[:2]
+        + [
+            Waypoint(location=Location(1, 2), time=base_time + timedelta(days=3)),
+            Waypoint(location=Location(1, 3)),
+        ]
+    )
+    reused = Timeline.compile(projection, ship_config, changed, previous=previous)
+    scratch = Timeline.compile(projection, ship_config, changed)
+
+    for name in [
+        "waypoint_keys",
+        "leg_azimuths",
+        "leg_distances",
+        "arrival_times",
+        "start_times",
+        "departure_times",
+    ]:
+        np.testing.assert_array_equal(getattr(reused, name), getattr(scratch, name))
+
+
+def test_timeline_npz_roundtrip(tmp_path) -> None:
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(0, 1)),
+        ]
+    )
+    timeline = Timeline.compile(projection, ship_config, schedule)
+
+    timeline.to_npz(tmp_path / "timeline.npz")
+    loaded = Timeline.from_npz(tmp_path / "timeline.npz")
+
+    assert loaded.projection == projection
+    assert loaded.ship_speed == timeline.ship_speed
+    np.testing.assert_array_equal(loaded.arrival_times, timeline.arrival_times)
+    assert (
+        Timeline.compile(projection, ship_config, schedule, previous=loaded) is loaded
+    )
+
+
+def test_timeline_npz_other_format(tmp_path) -> None:
+    """Test a timeline stored in another format is not loaded, so it is recompiled instead."""
+    base_time = datetime.strptime("2022-01-01T00:00:00", "%Y-%m-%dT%H:%M:%S")
+
+    ship_config = ShipConfig.from_yaml("expedition_dir/ship_config.yaml")
+    schedule = Schedule(
+        waypoints=[
+            Waypoint(location=Location(0, 0), time=base_time),
+            Waypoint(location=Location(0, 1)),
+        ]
+    )
+    timeline = Timeline.compile(projection, ship_config, schedule)
+    timeline.to_npz(tmp_path / "timeline.npz")
+
+    with np.load(tmp_path / "timeline.npz") as data:
+        stored = dict(data)
+    stored["version"] = stored["version"] + 1
+    np.savez(tmp_path / "timeline.npz", **stored)
+
+    with pytest.raises(ValueError, match="another format"):
+        Timeline.from_npz(tmp_path / "timeline.npz")
@@ -3,14 +3,19 @@
 import datetime
 
 import numpy as np
+import pytest
 import xarray as xr
 from parcels import FieldSet
 
+from virtualship.instruments import adcp
 from virtualship.instruments.adcp import simulate_adcp
-from virtualship.models import Location, Spacetime
+from virtualship.models import Location, Spacetime, SpacetimeArray
 
 
-def test_simulate_adcp(tmpdir) -> None:
+@pytest.mark.parametrize(
+    ("batched", "direct"), [(True, False), (False, False), (False, True)]
+)
+def test_simulate_adcp(tmpdir, batched: bool, direct: bool) -> None:
     # maximum depth the ADCP can measure
     MAX_DEPTH = -1000  # -1000
     # minimum depth the ADCP can measure
@@ -86,7 +91,9 @@ def test_simulate_adcp(tmpdir) -> None:
         max_depth=MAX_DEPTH,
         min_depth=MIN_DEPTH,
         num_bins=NUM_BINS,
-        sample_points=sample_points,
+        sample_points=SpacetimeArray.from_spacetimes(sample_points),
+        batched=batched,
+        direct=direct,
     )
 
     results = xr.open_zarr(out_path)
@@ -116,3 +123,59 @@ def test_simulate_adcp(tmpdir) -> None:
                 assert np.isclose(obs_value, exp_value), (
                     f"Observation incorrect {vert_loc=} {i=} {var=} {obs_value=} {exp_value=}."
                 )
+
+
+def test_simulate_adcp_layout(tmpdir, monkeypatch) -> None:
+    # one sample point per batch, so the output is appended to
+    monkeypatch.setattr(adcp, "_BATCH_SAMPLE_POINTS", 1)
+
+    base_time = np.datetime64("1950-01-01")
+    fieldset = FieldSet.from_data(
+        {
+            "U": np.arange(16, dtype=np.float32).reshape(2, 2, 2, 2),
+            "V": np.arange(16, 32, dtype=np.float32).reshape(2, 2, 2, 2),
+        },
+        {
+            "lon": np.array([0.0, 1.0]),
+            "lat": np.array([0.0, 1.0]),
+            "depth": np.array([-100.0, 0.0]),
+            "time": np.array([base_time, base_time + np.timedelta64(10, "s")]),
+        },
+    )
+    sample_points = SpacetimeArray(
+        lons=np.array([0.2, 0.5, 0.8]),
+        lats=np.array([0.3, 0.6, 0.9]),
+        times=base_time + np.array([0, 4, 8]).astype("timedelta64[s]"),
+    )
+
+    modes = {
+        "default": {},
+        "unbatched": {"batched": False},
+        "batched": {"batched": True},
+        "direct": {"direct": True},
+    }
+    results = {}
+    for mode, kwargs in modes.items():
+        out_path = tmpdir.join(f"out_{mode}.zarr")
+        simulate_adcp(
+            fieldset=fieldset,
+            out_path=out_path,
+            max_depth=-80,
+            min_depth=-5,
+            num_bins=4,
+            sample_points=sample_points,
+            **kwargs,
+        )
+        # Parcels numbers particles per process, so only the trajectory count is stable
+        results[mode] = xr.open_zarr(out_path).load().drop_vars("trajectory")
+
+    expected = results["unbatched"]
+    # the default samples one point at a time, exactly as before batching was added
+    for name in ["obs", "time", "lon", "lat", "z", "U", "V"]:
+        assert results["default"][name].identical(expected[name])
+    for mode in ["batched", "direct"]:
+        assert results[mode].attrs.keys() == expected.attrs.keys()
+        for name in ["obs", "time", "lon", "lat", "z"]:
+            assert results[mode][name].identical(expected[name])
+        for name in ["U", "V"]:
+            np.testing.assert_allclose(results[mode][name], expected[name], rtol=1e-6)
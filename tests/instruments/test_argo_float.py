@@ -6,8 +6,8 @@ import numpy as np
 import xarray as xr
 from parcels import FieldSet
 
-from virtualship.instruments.argo_float import ArgoFloat, simulate_argo_floats
-from virtualship.models import Location, Spacetime
+from virtualship.instruments.argo_float import simulate_argo_floats
+from virtualship.models import SpacetimeArray
 
 
 def test_simulate_argo_floats(tmpdir) -> None:
@@ -41,17 +41,9 @@ def test_simulate_argo_floats(tmpdir) -> None:
     )
 
     # argo floats to deploy
-    argo_floats = [
-        ArgoFloat(
-            spacetime=Spacetime(location=Location(latitude=0, longitude=0), time=0),
-            min_depth=0.0,
-            max_depth=MAX_DEPTH,
-            drift_depth=DRIFT_DEPTH,
-            vertical_speed=VERTICAL_SPEED,
-            cycle_days=CYCLE_DAYS,
-            drift_days=DRIFT_DAYS,
-        )
-    ]
+    argo_floats = SpacetimeArray(
+        lons=[0.0], lats=[0.0], times=[np.datetime64(base_time)]
+    )
 
     # perform simulation
     out_path = tmpdir.join("out.zarr")
@@ -60,6 +52,12 @@ def test_simulate_argo_floats(tmpdir) -> None:
         fieldset=fieldset,
         out_path=out_path,
         argo_floats=argo_floats,
+        min_depth=0.0,
+        max_depth=MAX_DEPTH,
+        drift_depth=DRIFT_DEPTH,
+        vertical_speed=VERTICAL_SPEED,
+        cycle_days=CYCLE_DAYS,
+        drift_days=DRIFT_DAYS,
         outputdt=timedelta(minutes=5),
         endtime=None,
     )
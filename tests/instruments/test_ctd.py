@@ -8,36 +8,28 @@ import datetime
 from datetime import timedelta
 
 import numpy as np
+import pytest
 import xarray as xr
 from parcels import Field, FieldSet
 
-from virtualship.instruments.ctd import CTD, simulate_ctd
-from virtualship.models import Location, Spacetime
+from virtualship.instruments.ctd import simulate_ctd
+from virtualship.models import SpacetimeArray
 
 
-def test_simulate_ctds(tmpdir) -> None:
+@pytest.mark.parametrize("direct", [False, True])
+def test_simulate_ctds(tmpdir, direct: bool) -> None:
     # arbitrary time offset for the dummy fieldset
     base_time = datetime.datetime.strptime("1950-01-01", "%Y-%m-%d")
 
     # where to cast CTDs
-    ctds = [
-        CTD(
-            spacetime=Spacetime(
-                location=Location(latitude=0, longitude=1),
-                time=base_time + datetime.timedelta(hours=0),
-            ),
-            min_depth=0,
-            max_depth=float("-inf"),
-        ),
-        CTD(
-            spacetime=Spacetime(
-                location=Location(latitude=1, longitude=0),
-                time=base_time,
-            ),
-            min_depth=0,
-            max_depth=float("-inf"),
-        ),
-    ]
+    ctds = SpacetimeArray(
+        lons=[1, 0],
+        lats=[0, 1],
+        times=[
+            np.datetime64(base_time + datetime.timedelta(hours=0)),
+            np.datetime64(base_time),
+        ],
+    )
 
     # expected observations for ctds at surface and at maximum depth
     ctd_exp = [
@@ -45,28 +37,28 @@ def test_simulate_ctds(tmpdir) -> None:
             "surface": {
                 "salinity": 5,
                 "temperature": 6,
-                "lat": ctds[0].spacetime.location.lat,
-                "lon": ctds[0].spacetime.location.lon,
+                "lat": ctds.lats[0],
+                "lon": ctds.lons[0],
             },
             "maxdepth": {
                 "salinity": 7,
                 "temperature": 8,
-                "lat": ctds[0].spacetime.location.lat,
-                "lon": ctds[0].spacetime.location.lon,
+                "lat": ctds.lats[0],
+                "lon": ctds.lons[0],
             },
         },
         {
             "surface": {
                 "salinity": 5,
                 "temperature": 6,
-                "lat": ctds[1].spacetime.location.lat,
-                "lon": ctds[1].spacetime.location.lon,
+                "lat": ctds.lats[1],
+                "lon": ctds.lons[1],
             },
             "maxdepth": {
                 "salinity": 7,
                 "temperature": 8,
-                "lat": ctds[1].spacetime.location.lat,
-                "lon": ctds[1].spacetime.location.lon,
+                "lat": ctds.lats[1],
+                "lon": ctds.lons[1],
             },
         },
     ]
@@ -107,9 +99,12 @@ def test_simulate_ctds(tmpdir) -> None:
 
     simulate_ctd(
         ctds=ctds,
+        min_depth=0,
+        max_depth=float("-inf"),
         fieldset=fieldset,
         out_path=out_path,
         outputdt=timedelta(seconds=10),
+        direct=direct,
     )
 
     # test if output is as expected
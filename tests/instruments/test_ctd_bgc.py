@@ -8,36 +8,28 @@ import datetime
 from datetime import timedelta
 
 import numpy as np
+import pytest
 import xarray as xr
 from parcels import Field, FieldSet
 
-from virtualship.instruments.ctd_bgc import CTD_BGC, simulate_ctd_bgc
-from virtualship.models import Location, Spacetime
+from virtualship.instruments.ctd_bgc import simulate_ctd_bgc
+from virtualship.models import SpacetimeArray
 
 
-def test_simulate_ctd_bgcs(tmpdir) -> None:
+@pytest.mark.parametrize("direct", [False, True])
+def test_simulate_ctd_bgcs(tmpdir, direct: bool) -> None:
     # arbitrary time offset for the dummy fieldset
     base_time = datetime.datetime.strptime("1950-01-01", "%Y-%m-%d")
 
     # where to cast CTD_BGCs
-    ctd_bgcs = [
-        CTD_BGC(
-            spacetime=Spacetime(
-                location=Location(latitude=0, longitude=1),
-                time=base_time + datetime.timedelta(hours=0),
-            ),
-            min_depth=0,
-            max_depth=float("-inf"),
-        ),
-        CTD_BGC(
-            spacetime=Spacetime(
-                location=Location(latitude=1, longitude=0),
-                time=base_time,
-            ),
-            min_depth=0,
-            max_depth=float("-inf"),
-        ),
-    ]
+    ctd_bgcs = SpacetimeArray(
+        lons=[1, 0],
+        lats=[0, 1],
+        times=[
+            np.datetime64(base_time + datetime.timedelta(hours=0)),
+            np.datetime64(base_time),
+        ],
+    )
 
     # expected observations for ctd_bgcs at surface and at maximum depth
     ctd_bgc_exp = [
@@ -51,8 +43,8 @@ def test_simulate_ctd_bgcs(tmpdir) -> None:
                 "phyc": 15,
                 "zooc": 16,
                 "nppv": 17,
-                "lat": ctd_bgcs[0].spacetime.location.lat,
-                "lon": ctd_bgcs[0].spacetime.location.lon,
+                "lat": ctd_bgcs.lats[0],
+                "lon": ctd_bgcs.lons[0],
             },
             "maxdepth": {
                 "o2": 11,
@@ -63,8 +55,8 @@ def test_simulate_ctd_bgcs(tmpdir) -> None:
                 "phyc": 20,
                 "zooc": 21,
                 "nppv": 22,
-                "lat": ctd_bgcs[0].spacetime.location.lat,
-                "lon": ctd_bgcs[0].spacetime.location.lon,
+                "lat": ctd_bgcs.lats[0],
+                "lon": ctd_bgcs.lons[0],
             },
         },
         {
@@ -77,8 +69,8 @@ def test_simulate_ctd_bgcs(tmpdir) -> None:
                 "phyc": 15,
                 "zooc": 16,
                 "nppv": 17,
-                "lat": ctd_bgcs[1].spacetime.location.lat,
-                "lon": ctd_bgcs[1].spacetime.location.lon,
+                "lat": ctd_bgcs.lats[1],
+                "lon": ctd_bgcs.lons[1],
             },
             "maxdepth": {
                 "o2": 11,
@@ -89,8 +81,8 @@ def test_simulate_ctd_bgcs(tmpdir) -> None:
                 "phyc": 20,
                 "zooc": 21,
                 "nppv": 22,
-                "lat": ctd_bgcs[1].spacetime.location.lat,
-                "lon": ctd_bgcs[1].spacetime.location.lon,
+                "lat": ctd_bgcs.lats[1],
+                "lon": ctd_bgcs.lons[1],
             },
         },
     ]
@@ -179,9 +171,12 @@ def test_simulate_ctd_bgcs(tmpdir) -> None:
 
     simulate_ctd_bgc(
         ctd_bgcs=ctd_bgcs,
+        min_depth=0,
+        max_depth=float("-inf"),
         fieldset=fieldset,
         out_path=out_path,
         outputdt=timedelta(seconds=10),
+        direct=direct,
     )
 
     # test if output is as expected
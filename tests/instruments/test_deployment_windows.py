@@ -0,0 +1,24 @@
+"""Test grouping deployments in windows in which they are active."""
+
+import numpy as np
+
+from virtualship.instruments._deployment_windows import deployment_windows
+
+
+def test_deployment_windows() -> None:
+    # two overlapping deployments, one on its own, and one that never ends
+    times = np.array([500.0, 0.0, 100.0, 1000.0])
+    durations = np.array([50.0, 200.0, 50.0, np.inf])
+
+    window_ends = deployment_windows(times, durations, endtime=2000.0)
+
+    np.testing.assert_array_equal(window_ends, [200.0, 550.0, 2000.0])
+
+
+def test_deployment_windows_last_ends_at_endtime() -> None:
+    # the last window runs until the end, even if its deployments are expected to end before
+    window_ends = deployment_windows(
+        np.array([0.0, 1000.0]), np.array([10.0, 10.0]), endtime=2000.0
+    )
+
+    np.testing.assert_array_equal(window_ends, [10.0, 2000.0])
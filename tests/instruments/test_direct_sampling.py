@@ -0,0 +1,133 @@
+"""Test sampling fields without Parcels."""
+
+import numpy as np
+import pytest
+from parcels import FieldOutOfBoundError, FieldSet
+
+from virtualship.instruments._direct_sampling import (
+    sample_fields,
+    sample_fields_at,
+)
+
+
+def _fieldset(interp_method: str, depths: bool) -> FieldSet:
+    rng = np.random.default_rng(0)
+    shape = (3, 4, 5, 6) if depths else (3, 5, 6)
+    tracer = rng.uniform(10, 20, shape)
+    # land, which is zero, in a corner and at the bottom
+    tracer[..., :2, :2] = 0
+    if depths:
+        tracer[:, -1] = 0
+
+    dimensions = {
+        "lon": np.linspace(0, 5, 6),
+        "lat": np.linspace(0, 2, 5),
+        "time": np.array([0.0, 100.0, 300.0]),
+    }
+    if depths:
+        dimensions["depth"] = np.array([0.0, -10.0, -30.0, -60.0])
+    fieldset = FieldSet.from_data(
+        {"U": np.zeros(shape), "V": np.zeros(shape), "T": tracer},
+        dimensions,
+        allow_time_extrapolation=True,
+    )
+    fieldset.T.interp_method = interp_method
+    return fieldset
+
+
+@pytest.mark.parametrize("interp_method", ["linear", "linear_invdist_land_tracer"])
+@pytest.mark.parametrize("depths", [True, False])
+def test_sample_fields(interp_method: str, depths: bool) -> None:
+    fieldset = _fieldset(interp_method, depths)
+
+    rng = np.random.default_rng(1)
+    num_points = 200
+    # times before, between and after the time steps, and at a time step
+    times = np.sort(np.append(rng.uniform(-50, 350, num_points - 1), 100.0))
+    lons = rng.uniform(0, 5, num_points)
+    lats = rng.uniform(0, 2, num_points)
+    # depths at, between and just above the bottom of the depth levels
+    sample_depths = np.array([0.0, -5.0, -10.0, -45.0, -59.0])
+
+    samples = sample_fields(fieldset, ["T"], times, sample_depths, lats, lons)
+
+    assert samples["T"].shape == (len(sample_depths), num_points)
+    assert samples["T"].dtype == np.float32
+    expected = np.array(
+        [
+            [
+                fieldset.T.eval(
+                    time,
+                    np.float32(depth),
+                    np.float32(lat),
+                    np.float32(lon),
+                    applyConversion=False,
+                )
+                for time, lat, lon in zip(times, lats, lons, strict=True)
+            ]
+            for depth in sample_depths
+        ],
+        dtype=np.float32,
+    )
+    np.testing.assert_allclose(samples["T"], expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize("interp_method", ["linear", "linear_invdist_land_tracer"])
+def test_sample_fields_at(interp_method: str) -> None:
+    fieldset = _fieldset(interp_method, depths=True)
+
+    rng = np.random.default_rng(1)
+    num_points = 200
+    # unsorted times, to sample as profiles of several casts do
+    times = rng.uniform(-50, 350, num_points)
+    depths = rng.uniform(-60, 0, num_points)
+    lons = rng.uniform(0, 5, num_points)
+    lats = rng.uniform(0, 2, num_points)
+
+    samples = sample_fields_at(fieldset, ["T"], times, depths, lats, lons)
+
+    assert samples["T"].shape == (num_points,)
+    assert samples["T"].dtype == np.float32
+    expected = np.array(
+        [
+            fieldset.T.eval(
+                time,
+                np.float32(depth),
+                np.float32(lat),
+                np.float32(lon),
+                applyConversion=False,
+            )
+            for time, depth, lat, lon in zip(times, depths, lats, lons, strict=True)
+        ],
+        dtype=np.float32,
+    )
+    np.testing.assert_allclose(samples["T"], expected, rtol=1e-6, atol=1e-5)
+
+
+def test_sample_fields_out_of_bound() -> None:
+    fieldset = _fieldset("linear", depths=True)
+
+    with pytest.raises(FieldOutOfBoundError):
+        sample_fields(fieldset, ["T"], np.array([0.0]), np.array([-100.0]), [1], [1])
+    with pytest.raises(FieldOutOfBoundError):
+        sample_fields(fieldset, ["T"], np.array([0.0]), np.array([-5.0]), [1], [6])
+
+
+def test_sample_fields_single_coordinate() -> None:
+    # a single latitude and longitude, so the field is the same everywhere horizontally
+    tracer = np.arange(6, dtype=np.float32).reshape(2, 3, 1, 1) + 1
+    fieldset = FieldSet.from_data(
+        {"U": np.zeros_like(tracer), "V": np.zeros_like(tracer), "T": tracer},
+        {
+            "lon": np.array([0.0]),
+            "lat": np.array([0.0]),
+            "depth": np.array([0.0, -10.0, -20.0]),
+            "time": np.array([0.0, 10.0]),
+        },
+    )
+
+    samples = sample_fields(
+        fieldset, ["T"], np.array([5.0]), np.array([-5.0, -20.0]), [3], [4]
+    )
+
+    np.testing.assert_allclose(samples["T"], [[3.0], [4.5]])
@@ -3,14 +3,22 @@
 import datetime
 
 import numpy as np
+import pytest
 import xarray as xr
 from parcels import FieldSet
 
-from virtualship.instruments.drifter import Drifter, simulate_drifters
-from virtualship.models import Location, Spacetime
+from virtualship.instruments.drifter import simulate_drifters
+from virtualship.models import SpacetimeArray
 
 
-def test_simulate_drifters(tmpdir) -> None:
+@pytest.mark.parametrize(
+    "lifetime",
+    [
+        pytest.param(datetime.timedelta(hours=2), id="FiniteLifetime"),
+        pytest.param(None, id="InfiniteLifetime"),
+    ],
+)
+def test_simulate_drifters(tmpdir, lifetime: datetime.timedelta | None) -> None:
     # arbitrary time offset for the dummy fieldset
     base_time = datetime.datetime.strptime("1950-01-01", "%Y-%m-%d")
 
@@ -33,24 +41,14 @@ def test_simulate_drifters(tmpdir) -> None:
     )
 
     # drifters to deploy
-    drifters = [
-        Drifter(
-            spacetime=Spacetime(
-                location=Location(latitude=0, longitude=0),
-                time=base_time + datetime.timedelta(days=0),
-            ),
-            depth=0.0,
-            lifetime=datetime.timedelta(hours=2),
-        ),
-        Drifter(
-            spacetime=Spacetime(
-                location=Location(latitude=1, longitude=1),
-                time=base_time + datetime.timedelta(hours=20),
-            ),
-            depth=0.0,
-            lifetime=None,
-        ),
-    ]
+    drifters = SpacetimeArray(
+        lons=[0, 1],
+        lats=[0, 1],
+        times=[
+            np.datetime64(base_time + datetime.timedelta(days=0)),
+            np.datetime64(base_time + datetime.timedelta(hours=20)),
+        ],
+    )
 
     # perform simulation
     out_path = tmpdir.join("out.zarr")
@@ -59,6 +57,8 @@ def test_simulate_drifters(tmpdir) -> None:
         fieldset=fieldset,
         out_path=out_path,
         drifters=drifters,
+        depth=0.0,
+        lifetime=lifetime,
         outputdt=datetime.timedelta(hours=1),
         dt=datetime.timedelta(minutes=5),
         endtime=None,
@@ -0,0 +1,52 @@
+"""Test computing vertical profiles of casts without Parcels."""
+
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from virtualship.instruments._profiles import (
+    ctd_cast_depths,
+    output_step,
+    xbt_cast_depths,
+)
+
+
+def test_output_step() -> None:
+    assert output_step(10.0, timedelta(seconds=1)) == (1.0, 1)
+    assert output_step(10.0, timedelta(seconds=30)) == (10.0, 3)
+    with pytest.raises(ValueError):
+        output_step(10.0, timedelta(seconds=15))
+
+
+def test_ctd_cast_depths() -> None:
+    depths, raising = ctd_cast_depths(
+        min_depth=-11, max_depths=np.array([-2000, -35]), winch_speed=1.0, step=10.0
+    )
+
+    # lowered until the next step would pass the maximum depth, then raised back
+    assert depths.shape == (2, 397)
+    assert depths[0, 198] == -1991
+    np.testing.assert_array_equal(depths[0, :3], [-11, -21, -31])
+    np.testing.assert_array_equal(depths[0, -3:], [-31, -21, -11])
+    np.testing.assert_array_equal(depths[1, :5], [-11, -21, -31, -21, -11])
+    assert np.all(np.isnan(depths[1, 5:]))
+    np.testing.assert_array_equal(raising[1, :5], [0, 0, 1, 1, 1])
+
+
+def test_xbt_cast_depths() -> None:
+    depths, fall_speeds = xbt_cast_depths(
+        min_depth=-2,
+        max_depths=np.array([-285, -20]),
+        fall_speed=6.7,
+        deceleration_coefficient=0.00225,
+        step=1.0,
+        max_steps=1000,
+    )
+
+    # depths at the start of every step, stopping exactly at the maximum depth
+    np.testing.assert_allclose(depths[0, :4], [-2, -8.7, -15.3955, -22.0865], rtol=1e-6)
+    assert depths[0, np.count_nonzero(~np.isnan(depths[0])) - 1] == -285
+    np.testing.assert_allclose(depths[1, :5], [-2, -8.7, -15.3955, -20, np.nan])
+    # fall speed slows down by twice the deceleration coefficient every second
+    np.testing.assert_allclose(fall_speeds[1, :2], [6.6955, 6.691], rtol=1e-6)
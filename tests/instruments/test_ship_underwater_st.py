@@ -3,14 +3,16 @@
 import datetime
 
 import numpy as np
+import pytest
 import xarray as xr
 from parcels import FieldSet
 
 from virtualship.instruments.ship_underwater_st import simulate_ship_underwater_st
-from virtualship.models import Location, Spacetime
+from virtualship.models import Location, Spacetime, SpacetimeArray
 
 
-def test_simulate_ship_underwater_st(tmpdir) -> None:
+@pytest.mark.parametrize("direct", [False, True])
+def test_simulate_ship_underwater_st(tmpdir, direct: bool) -> None:
     # depth at which the sampling will be done
     DEPTH = -2
 
@@ -77,7 +79,8 @@ def test_simulate_ship_underwater_st(tmpdir) -> None:
         fieldset=fieldset,
         out_path=out_path,
         depth=DEPTH,
-        sample_points=sample_points,
+        sample_points=SpacetimeArray.from_spacetimes(sample_points),
+        direct=direct,
     )
 
     # test if output is as expected
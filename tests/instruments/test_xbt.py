@@ -8,65 +8,53 @@ import datetime
 from datetime import timedelta
 
 import numpy as np
+import pytest
 import xarray as xr
 from parcels import Field, FieldSet
 
-from virtualship.instruments.xbt import XBT, simulate_xbt
-from virtualship.models import Location, Spacetime
+from virtualship.instruments.xbt import simulate_xbt
+from virtualship.models import SpacetimeArray
 
 
-def test_simulate_xbts(tmpdir) -> None:
+@pytest.mark.parametrize("direct", [False, True])
+def test_simulate_xbts(tmpdir, direct: bool) -> None:
     # arbitrary time offset for the dummy fieldset
     base_time = datetime.datetime.strptime("1950-01-01", "%Y-%m-%d")
 
     # where to cast XBTs
-    xbts = [
-        XBT(
-            spacetime=Spacetime(
-                location=Location(latitude=0, longitude=1),
-                time=base_time + datetime.timedelta(hours=0),
-            ),
-            min_depth=0,
-            max_depth=float("-inf"),
-            fall_speed=6.553,
-            deceleration_coefficient=0.00242,
-        ),
-        XBT(
-            spacetime=Spacetime(
-                location=Location(latitude=1, longitude=0),
-                time=base_time,
-            ),
-            min_depth=0,
-            max_depth=float("-inf"),
-            fall_speed=6.553,
-            deceleration_coefficient=0.00242,
-        ),
-    ]
+    xbts = SpacetimeArray(
+        lons=[1, 0],
+        lats=[0, 1],
+        times=[
+            np.datetime64(base_time + datetime.timedelta(hours=0)),
+            np.datetime64(base_time),
+        ],
+    )
 
     # expected observations for xbts at surface and at maximum depth
     xbt_exp = [
         {
             "surface": {
                 "temperature": 6,
-                "lat": xbts[0].spacetime.location.lat,
-                "lon": xbts[0].spacetime.location.lon,
+                "lat": xbts.lats[0],
+                "lon": xbts.lons[0],
             },
             "maxdepth": {
                 "temperature": 8,
-                "lat": xbts[0].spacetime.location.lat,
-                "lon": xbts[0].spacetime.location.lon,
+                "lat": xbts.lats[0],
+                "lon": xbts.lons[0],
             },
         },
         {
             "surface": {
                 "temperature": 6,
-                "lat": xbts[1].spacetime.location.lat,
-                "lon": xbts[1].spacetime.location.lon,
+                "lat": xbts.lats[1],
+                "lon": xbts.lons[1],
             },
             "maxdepth": {
                 "temperature": 8,
-                "lat": xbts[1].spacetime.location.lat,
-                "lon": xbts[1].spacetime.location.lon,
+                "lat": xbts.lats[1],
+                "lon": xbts.lons[1],
             },
         },
     ]
@@ -101,9 +89,14 @@ def test_simulate_xbts(tmpdir) -> None:
 
     simulate_xbt(
         xbts=xbts,
+        min_depth=0,
+        max_depth=float("-inf"),
+        fall_speed=6.553,
+        deceleration_coefficient=0.00242,
         fieldset=fieldset,
         out_path=out_path,
         outputdt=timedelta(seconds=10),
+        direct=direct,
     )
 
     # test if output is as expected
@@ -129,3 +122,57 @@ def test_simulate_xbts(tmpdir) -> None:
                 assert np.isclose(obs_value, exp_value), (
                     f"Observation incorrect {xbt_i=} {loc=} {var=} {obs_value=} {exp_value=}."
                 )
+
+
+@pytest.mark.parametrize("direct", [False, True])
+def test_simulate_xbts_deceleration(tmpdir, direct: bool) -> None:
+    """Test the fall speed of an XBT slows down following the quadratic fall-rate equation."""
+    base_time = datetime.datetime.strptime("1950-01-01", "%Y-%m-%d")
+
+    fieldset = FieldSet.from_data(
+        {
+            "U": np.zeros((2, 2, 2, 2)),
+            "V": np.zeros((2, 2, 2, 2)),
+            "T": np.zeros((2, 2, 2, 2)),
+        },
+        {
+            "time": [
+                np.datetime64(base_time),
+                np.datetime64(base_time + datetime.timedelta(hours=1)),
+            ],
+            "depth": [-1000, 0],
+            "lat": [0, 1],
+            "lon": [0, 1],
+        },
+    )
+    fieldset.add_field(Field("bathymetry", [-1000], lon=0, lat=0))
+
+    out_path = tmpdir.join("out.zarr")
+    fall_speed = 6.553
+    deceleration_coefficient = 0.00242
+    simulate_xbt(
+        xbts=SpacetimeArray(lons=[0.5], lats=[0.5], times=[np.datetime64(base_time)]),
+        min_depth=0,
+        max_depth=float("-inf"),
+        fall_speed=fall_speed,
+        deceleration_coefficient=deceleration_coefficient,
+        fieldset=fieldset,
+        out_path=out_path,
+        outputdt=timedelta(seconds=10),
+        direct=direct,
+    )
+
+    # the speed drops by 2 * deceleration_coefficient * dt after every step of dt
+    z = xr.open_zarr(out_path)["z"].isel(trajectory=0).values
+    steps = np.arange(10)
+    dt = 10.0
+    np.testing.assert_allclose(
+        z[steps],
+        -(
+            fall_speed * dt * steps
+            - deceleration_coefficient * dt**2 * steps * (steps - 1)
+        ),
+        rtol=1e-5,
+    )
+    # without deceleration the XBT would be more than a meter deeper after 90 seconds
+    assert z[9] > -fall_speed * dt * 9 + 1